@@ -9,9 +9,12 @@ Quick start:
     python3 fireflies_bulk_download.py
 """
 
-import os, pathlib, time, requests, re, sys
+import os, pathlib, time, re, sys
+
+# Shared pooled Fireflies transport lives with the sync scripts
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent / "scripts" / "sync"))
+from fireflies_transport import get_transport
 
-API_URL = "https://api.fireflies.ai/graphql"
 TOKEN = os.getenv("FIREFLIES_TOKEN")
 OUT_DIR = pathlib.Path("output")
 PAGE_SIZE = 50
@@ -19,7 +22,7 @@ PAGE_SIZE = 50
 if not TOKEN:
     sys.exit("❌  Set FIREFLIES_TOKEN first.")
 
-HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+TRANSPORT = get_transport(TOKEN)
 
 LIST_QUERY = """
 query ($skip:Int!, $limit:Int!){
@@ -39,18 +42,7 @@ query ($id:String!){
 
 
 def gql(query: str, variables: dict):
-    r = requests.post(API_URL,
-                      json={
-                          "query": query,
-                          "variables": variables
-                      },
-                      headers=HEADERS,
-                      timeout=30)
-    r.raise_for_status()
-    j = r.json()
-    if "errors" in j:
-        raise RuntimeError(j["errors"])
-    return j["data"]
+    return TRANSPORT.execute(query, variables, timeout=30)
 
 
 def clean(name: str) -> str:
@@ -98,6 +90,7 @@ def main():
         skip += PAGE_SIZE
 
     print(f"\n✅  Done! Transcripts in → {OUT_DIR.resolve()}")
+    print(f"   {TRANSPORT.describe_stats()}")
 
 
 if __name__ == "__main__":
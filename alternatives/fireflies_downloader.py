@@ -1,17 +1,19 @@
 import requests
 import json
 import os
-from datetime import datetime, timedelta
-import time
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Shared pooled Fireflies transport lives with the sync scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts" / "sync"))
+from fireflies_transport import get_transport
+from transcript_listing import TranscriptLister
 
 class FirefliesDownloader:
     def __init__(self, api_key):
         self.api_key = api_key
-        self.base_url = "https://api.fireflies.ai/graphql"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        self.transport = get_transport(api_key)
     
     def get_transcript_content(self, transcript_id):
         """
@@ -45,11 +47,7 @@ class FirefliesDownloader:
         
         try:
             print(f"Fetching content for transcript {transcript_id}...")
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={"query": query, "variables": variables}
-            )
+            response = self.transport.post(query, variables)
             
             if response.status_code != 200:
                 print(f"Error getting transcript content: {response.status_code}")
@@ -67,46 +65,18 @@ class FirefliesDownloader:
             print(f"Error fetching transcript content: {e}")
             return None
 
-    def get_transcripts(self, limit=25, to_date=None):
-        """
-        Fetch list of transcripts with date filtering
+    def get_transcripts(self, to_date=None):
         """
-        query = """
-        query GetTranscripts($limit: Int, $toDate: DateTime) {
-            transcripts(limit: $limit, toDate: $toDate) {
-                title
-                id
-                transcript_url
-                duration
-                date
-                participants
-            }
-        }
+        Fetch the list of all transcripts up to to_date, listing date windows in parallel
         """
+        print(f"Listing transcripts up to date {to_date if to_date else 'now'}...")
+        lister = TranscriptLister(self.transport)
+        transcripts = lister.list_all(to_date=int(to_date.timestamp() * 1000) if to_date else None)
         
-        variables = {
-            "limit": min(limit, 25),
-            "toDate": to_date.strftime("%Y-%m-%dT%H:%M:%S.000Z") if to_date else None
-        }
-        
-        try:
-            print(f"Making API request for transcripts up to date {to_date if to_date else 'now'}...")
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={"query": query, "variables": variables}
-            )
-            
-            data = response.json()
-            if "errors" in data:
-                print("API returned errors:", json.dumps(data["errors"], indent=2))
-                return None
-                
-            return data
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching transcripts: {e}")
-            return None
+        for window, e in lister.errors:
+            print(f"Error listing transcripts in window {window}: {e}")
+        print(f"Found {len(transcripts)} transcripts, {lister.describe()}")
+        return transcripts
 
     def save_transcripts(self, output_dir="transcripts", to_date=None):
         """
@@ -128,58 +98,30 @@ class FirefliesDownloader:
                 except:
                     pass
         
-        last_date = to_date or datetime.now()
-        while True:
-            result = self.get_transcripts(limit=25, to_date=last_date)
-            if not result or "data" not in result or "transcripts" not in result["data"]:
-                print("No more transcripts found or error in API response")
-                break
-                
-            transcripts = result["data"]["transcripts"]
-            if not transcripts:
-                print("No more transcripts found")
-                break
-                
-            print(f"\nFound {len(transcripts)} transcripts")
+        for transcript in self.get_transcripts(to_date=to_date):
+            # Skip if we already have this transcript
+            if transcript['id'] in existing_ids:
+                print(f"Skipping existing transcript: {transcript['title']}")
+                continue
             
-            earliest_date = None
-            for transcript in transcripts:
-                # Skip if we already have this transcript
-                if transcript['id'] in existing_ids:
-                    print(f"Skipping existing transcript: {transcript['title']}")
-                    continue
-                
-                print(f"\nProcessing: {transcript['title']}")
-                
-                # Get detailed content
-                content = self.get_transcript_content(transcript['id'])
-                if content:
-                    transcript = content  # Replace with full content
-                
-                # Save the file
-                date_obj = datetime.fromtimestamp(int(transcript["date"]) / 1000)
-                safe_title = ''.join(c for c in transcript['title'] if c.isalnum() or c in (' ', '-', '_', '.'))
-                filename = f"{date_obj.strftime('%Y-%m-%d')}_{safe_title[:50]}.json"
-                
-                filepath = os.path.join(output_dir, filename)
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(transcript, f, indent=2, ensure_ascii=False)
-                
-                print(f"Saved transcript: {filename}")
-                
-                # Track earliest date we've seen
-                if earliest_date is None or date_obj < earliest_date:
-                    earliest_date = date_obj
-                
-                time.sleep(1)  # Be nice to the API
+            print(f"\nProcessing: {transcript['title']}")
+            
+            # Get detailed content
+            content = self.get_transcript_content(transcript['id'])
+            if content:
+                transcript = content  # Replace with full content
+            
+            # Save the file
+            date_obj = datetime.fromtimestamp(int(transcript["date"]) / 1000)
+            safe_title = ''.join(c for c in transcript['title'] if c.isalnum() or c in (' ', '-', '_', '.'))
+            filename = f"{date_obj.strftime('%Y-%m-%d')}_{safe_title[:50]}.json"
+            
+            filepath = os.path.join(output_dir, filename)
+            
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(transcript, f, indent=2, ensure_ascii=False)
             
-            if earliest_date:
-                # Subtract 1 second to avoid getting the same transcript again
-                last_date = earliest_date - timedelta(seconds=1)
-                time.sleep(1)  # Extra pause between batches
-            else:
-                break
+            print(f"Saved transcript: {filename}")
 
 def main():
     api_key = os.getenv("FIREFLIES_API_KEY")
@@ -1,46 +1,31 @@
-import requests
 import os
-import time
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 from pathlib import Path
 import re
 
+# Shared pooled Fireflies transport lives with the sync scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts" / "sync"))
+from fireflies_transport import get_transport
+from transcript_listing import TranscriptLister
+
 class FirefliesMarkdownDownloader:
     def __init__(self, api_key, output_dir="fireflies_markdown"):
         self.api_key = api_key
-        self.base_url = "https://api.fireflies.ai/graphql"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        self.transport = get_transport(api_key)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
 
     def gql(self, query, variables):
-        response = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json={"query": query, "variables": variables}
-        )
-        response.raise_for_status()
-        result = response.json()
-        if "errors" in result:
-            raise RuntimeError(result["errors"])
-        return result["data"]
+        return self.transport.execute(query, variables)
 
-    def get_transcripts(self, to_date=None, limit=25):
-        query = """
-        query GetTranscripts($limit: Int, $toDate: DateTime) {
-            transcripts(limit: $limit, toDate: $toDate) {
-                id title date
-            }
-        }
-        """
-        variables = {
-            "limit": min(limit, 25),
-            "toDate": to_date.strftime("%Y-%m-%dT%H:%M:%S.000Z") if to_date else None
-        }
-        return self.gql(query, variables)["transcripts"]
+    def get_transcripts(self, to_date=None):
+        lister = TranscriptLister(self.transport)
+        transcripts = lister.list_all(to_date=int(to_date.timestamp() * 1000) if to_date else None)
+        for window, e in lister.errors:
+            print(f"⚠️ Error listing transcripts in window {window}: {e}")
+        print(f"📋 Found {len(transcripts)} transcripts, {lister.describe()}")
+        return transcripts
 
     def get_transcript_content(self, transcript_id):
         query = """
@@ -103,31 +88,12 @@ class FirefliesMarkdownDownloader:
 
     def run(self):
         seen_ids = {p.stem.split("_")[-1] for p in self.output_dir.glob("*.md")}
-        last_date = datetime.now()
-
-        while True:
-            transcripts = self.get_transcripts(to_date=last_date)
-            if not transcripts:
-                break
-
-            earliest = None
-            for t in transcripts:
-                tid = t["id"]
-                if tid in seen_ids:
-                    continue
-
-                full = self.get_transcript_content(tid)
-                self.save_as_markdown(full)
-
-                date_obj = datetime.utcfromtimestamp(full["date"] / 1000)
-                if earliest is None or date_obj < earliest:
-                    earliest = date_obj
-
-                time.sleep(1)
+        for t in self.get_transcripts():
+            if t["id"] in seen_ids:
+                continue
 
-            if not earliest:
-                break
-            last_date = earliest - timedelta(seconds=1)
+            full = self.get_transcript_content(t["id"])
+            self.save_as_markdown(full)
 
 # Run it
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import os
 import json
 import uuid
+import sys
 import time
 import tiktoken
 from datetime import datetime, timezone
@@ -8,6 +9,10 @@ from pathlib import Path
 from supabase import create_client, Client
 from openai import OpenAI
 
+# Shared token windowing lives with the sync scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts" / "sync"))
+from text_windows import chunk_text as token_windows
+
 # === ENV CONFIG ===
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -27,16 +32,7 @@ tokenizer = tiktoken.encoding_for_model(EMBED_MODEL)
 # === HELPERS ===
 
 def chunk_text(text: str):
-    tokens = tokenizer.encode(text)
-    chunks = []
-    start = 0
-    while start < len(tokens):
-        end = min(start + CHUNK_SIZE, len(tokens))
-        chunk_tokens = tokens[start:end]
-        chunk_text = tokenizer.decode(chunk_tokens)
-        chunks.append((start, end, chunk_text))
-        start += CHUNK_SIZE - CHUNK_OVERLAP
-    return chunks
+    return token_windows(text, tokenizer, CHUNK_SIZE, CHUNK_OVERLAP)
 
 def embed_chunk(text: str):
     for _ in range(3):
@@ -71,10 +67,11 @@ def ingest_markdown_file(file_path: Path):
 
     # Chunk and embed
     chunks = chunk_text(content)
-    for i, (start, end, chunk) in enumerate(chunks):
+    for i, (start, end, chunk, char_start, char_end) in enumerate(chunks):
         embedding = embed_chunk(chunk)
         metadata = {
             "loc": {"from": start, "to": end},
+            "chars": {"from": char_start, "to": char_end},
             "file": file_path.name,
             "chunk_index": i,
             "metadata_id": metadata_id
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Backfill chunk embeddings through the OpenAI Batch API.
+
+For historical backfills latency does not matter, and the Batch API embeds
+at half the price of synchronous requests, under its own, much larger limits.
+In backfill mode (`--batch-api` of reprocess_chunks.py and
+sync_remaining_transcripts.py) the uploaders store chunks whose text was
+never embedded before with a NULL embedding and their usual content_hash.
+`BatchBackfill.run()` then:
+
+1. finishes the batches an earlier run left pending (their ids are kept in
+   BATCH_DIR/pending.json),
+2. fills NULL embeddings whose text already has a vector (see chunk_dedup),
+3. writes one request per remaining distinct text to JSONL files under
+   BATCH_DIR, with custom_id "meeting_id:chunk_index", uploads them and
+   creates the batches,
+4. polls until every batch has ended and sets the returned vectors on the
+   rows named by custom_id, and
+5. fills the rows that share their text with an embedded one.
+
+Only the embedding column is written, and only while the row still holds
+the chunk the vector was made for (same content_hash, or still none for
+rows stored before hashes existed): a batch can end a day later, after the
+meeting was re-chunked or deleted.
+
+Only rows whose content_hash was made for the backfill's model and vector
+size are embedded; rows stored for another model are skipped, and rows
+without a hash (stored before hashes existed) are taken. Requests that fail
+leave their rows NULL for the next run. It also runs on its own, with the
+EMBEDDING_MODEL and EMBEDDING_DIMENSIONS the uploaders use, e.g. to collect
+batches submitted earlier:
+
+    python3 batch_backfill.py               # finish pending batches, then backfill NULL embeddings
+    python3 batch_backfill.py --no-wait     # submit (or check) and exit; run again to load the results
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python3 batch_backfill.py --poll 1   # tests/batch_api_stub.py
+"""
+import json
+import os
+import time
+from pathlib import Path
+from chunk_dedup import content_hash
+from embeddings import embedding_settings, native_dimensions, request_dimensions
+from rate_limiter import execute_with_limit
+
+BATCH_DIR = Path(os.getenv("EMBEDDING_BATCH_DIR", ".cache/embedding_batches"))
+POLL_SECONDS = float(os.getenv("EMBEDDING_BATCH_POLL_SECONDS", "60"))
+MAX_BATCH_REQUESTS = 50000  # Batch API limit on embedding inputs per batch
+MAX_BATCH_FILE_BYTES = 190 * 1024 * 1024  # under the 200 MB input file limit
+PAGE_SIZE = 1000  # NULL-embedding rows per request
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchBackfill:
+    """
+    Embeds the NULL embeddings of meeting_chunks through the Batch API.
+
+    Vectors are requested for `dedup.model` and `dedup.dimensions`, and every
+    vector obtained is handed to `dedup`, which caches it locally.
+    """
+
+    def __init__(self, supabase, dedup, client=None, batch_dir=BATCH_DIR, poll_seconds=POLL_SECONDS):
+        if not native_dimensions(dedup.model):
+            raise ValueError(f"The Batch API only embeds with OpenAI models, not {dedup.model}")
+        self.supabase = supabase
+        self.dedup = dedup
+        self.client = client
+        self.batch_dir = Path(batch_dir)
+        self.poll_seconds = poll_seconds
+        self._options = {}
+        reduced = request_dimensions(dedup.model, dedup.dimensions)
+        if reduced:
+            self._options["dimensions"] = reduced
+
+        self.filled = 0  # rows given a vector that was already known
+        self.submitted = 0  # requests sent in batches
+        self.batches = 0
+        self.loaded = 0  # rows given a vector from a batch
+        self.failed = 0  # requests that came back without a vector
+        self.stale = 0  # vectors whose row changed or was deleted meanwhile
+        self.skipped = 0  # NULL rows stored for another model or vector size
+
+    def _client(self):
+        if self.client is None:
+            from registry import get_openai
+
+            self.client = get_openai()
+        return self.client
+
+    def run(self, wait=True, keep_waiting=lambda: True):
+        """
+        Finish pending batches, then batch-embed every NULL embedding.
+
+        Without `wait`, or once `keep_waiting()` turns false, unfinished
+        batches are left pending for the next run.
+        """
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        for batch_id in self._pending():
+            self.finish(batch_id, wait, keep_waiting)
+        if self._pending():
+            print(f"   ⏳ {len(self._pending())} batches still running; run again to load them")
+            return
+
+        rows = self.fill_known(self.pending_rows())
+        if not rows:
+            return
+        for batch_id in self.submit(rows):
+            if not self.finish(batch_id, wait, keep_waiting):
+                break
+        if not self._pending():
+            # Rows sharing their text with an embedded one
+            self.fill_known(self.pending_rows())
+
+    def pending_rows(self):
+        """meeting_chunks rows without an embedding whose content_hash is for this backfill's model"""
+        rows = []
+        self.skipped = 0
+        start = 0
+        while True:
+            result = execute_with_limit(
+                self.supabase.table("meeting_chunks")
+                .select("meeting_id, chunk_index, content, content_hash:metadata->>content_hash")
+                .is_("embedding", "null")
+                .order("id")
+                .range(start, start + PAGE_SIZE - 1)
+            )
+            page = result.data or []
+            for row in page:
+                stored_hash = row["content_hash"]
+                if stored_hash and stored_hash != content_hash(row["content"], self.dedup.model, self.dedup.dimensions):
+                    self.skipped += 1
+                else:
+                    rows.append(row)
+            if len(page) < PAGE_SIZE:
+                if self.skipped:
+                    print(f"   ⚠️  Skipped {self.skipped} NULL embeddings stored for another model or vector size")
+                return rows
+            start += PAGE_SIZE
+
+    def fill_known(self, rows):
+        """Store the vectors already known for any of the rows; returns the rows still without one."""
+        remaining = []
+        for i in range(0, len(rows), PAGE_SIZE):
+            page = rows[i:i + PAGE_SIZE]
+            _, vectors = self.dedup.lookup([row["content"] for row in page])
+            for row, vector in zip(page, vectors):
+                if vector is None:
+                    remaining.append(row)
+                elif self._set_embedding(row["meeting_id"], row["chunk_index"], row["content_hash"], vector):
+                    self.filled += 1
+        return remaining
+
+    def submit(self, rows):
+        """Write, upload and start batches for the rows' distinct texts; returns the batch ids."""
+        requests = {}  # content hash -> request line
+        for row in rows:
+            h = content_hash(row["content"], self.dedup.model, self.dedup.dimensions)
+            if h not in requests:
+                requests[h] = json.dumps({
+                    "custom_id": f"{row['meeting_id']}:{row['chunk_index']}",
+                    "method": "POST",
+                    "url": "/v1/embeddings",
+                    "body": {"model": self.dedup.model, "input": row["content"], **self._options},
+                }) + "\n"
+
+        batch_ids = []
+        for lines in self._split(list(requests.values())):
+            path = self.batch_dir / f"embeddings-{time.strftime('%Y%m%d-%H%M%S')}-{len(batch_ids)}.jsonl"
+            path.write_text("".join(lines), encoding="utf-8")
+            with open(path, "rb") as f:
+                uploaded = self._client().files.create(file=f, purpose="batch")
+            batch = self._client().batches.create(
+                input_file_id=uploaded.id,
+                endpoint="/v1/embeddings",
+                completion_window="24h",
+                metadata={"description": f"meeting_chunks backfill ({len(lines)} chunks)"},
+            )
+            batch_ids.append(batch.id)
+            # Saved right away, so an interrupted run picks the batch up instead of paying for it twice
+            self._save_pending(self._pending() + [batch.id])
+            self.submitted += len(lines)
+            self.batches += 1
+            print(f"   📤 Submitted {len(lines)} chunk texts as batch {batch.id}")
+        return batch_ids
+
+    def _split(self, lines):
+        """Groups of lines within the per-batch request and file size limits"""
+        group = []
+        size = 0
+        for line in lines:
+            length = len(line.encode("utf-8"))
+            if group and (len(group) >= MAX_BATCH_REQUESTS or size + length > MAX_BATCH_FILE_BYTES):
+                yield group
+                group, size = [], 0
+            group.append(line)
+            size += length
+        if group:
+            yield group
+
+    def finish(self, batch_id, wait=True, keep_waiting=lambda: True):
+        """Wait for a batch to end and load its vectors; returns False if it is still running."""
+        while True:
+            batch = self._client().batches.retrieve(batch_id)
+            if batch.status in FINAL_STATUSES:
+                break
+            counts = batch.request_counts
+            progress = f", {counts.completed + counts.failed}/{counts.total} done" if counts and counts.total else ""
+            print(f"   ⏳ Batch {batch_id}: {batch.status}{progress}")
+            if not wait or not keep_waiting():
+                return False
+            time.sleep(self.poll_seconds)
+
+        self.load(batch)
+        self._save_pending([b for b in self._pending() if b != batch_id])
+        return True
+
+    def load(self, batch):
+        """Set the vectors of an ended batch on the meeting_chunks rows named by custom_id."""
+        if batch.status != "completed":
+            # Expired and cancelled batches still return the requests they finished
+            print(f"   ⚠️  Batch {batch.id} {batch.status}; loading whatever it finished")
+        if batch.error_file_id:
+            self.failed += len(self._read_lines(batch.error_file_id))
+        if not batch.output_file_id:
+            return
+
+        texts = {request["custom_id"]: request["body"]["input"] for request in self._read_lines(batch.input_file_id)}
+        loaded = 0
+        embedded = []
+        for result in self._read_lines(batch.output_file_id):
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                self.failed += 1
+                continue
+            meeting_id, chunk_index = result["custom_id"].rsplit(":", 1)
+            h = content_hash(texts[result["custom_id"]], self.dedup.model, self.dedup.dimensions)
+            vector = response["body"]["data"][0]["embedding"]
+            embedded.append((h, vector))
+            # Rows stored before hashes existed still have none
+            if self._set_embedding(meeting_id, int(chunk_index), h, vector) or \
+                    self._set_embedding(meeting_id, int(chunk_index), None, vector):
+                loaded += 1
+            else:
+                self.stale += 1
+
+        self.dedup.add_embedded(embedded)
+        self.loaded += loaded
+        print(f"   📥 Loaded {loaded} vectors from batch {batch.id}")
+
+    def _read_lines(self, file_id):
+        content = self._client().files.content(file_id)
+        return [json.loads(line) for line in content.text.splitlines() if line.strip()]
+
+    def _set_embedding(self, meeting_id, chunk_index, stored_hash, vector):
+        """Set a row's embedding if it still has `stored_hash` (None: no hash); returns whether it did."""
+        query = (
+            self.supabase.table("meeting_chunks")
+            .update({"embedding": vector})
+            .eq("meeting_id", meeting_id)
+            .eq("chunk_index", chunk_index)
+        )
+        if stored_hash:
+            query = query.eq("metadata->>content_hash", stored_hash)
+        else:
+            query = query.is_("metadata->>content_hash", "null")
+        return bool(execute_with_limit(query).data)
+
+    def _pending(self):
+        path = self.batch_dir / "pending.json"
+        return json.loads(path.read_text()) if path.exists() else []
+
+    def _save_pending(self, batch_ids):
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        (self.batch_dir / "pending.json").write_text(json.dumps(batch_ids))
+
+    def describe(self):
+        return (
+            f"batch backfill: {self.submitted} texts submitted in {self.batches} batches, "
+            f"{self.loaded} rows loaded from batches, {self.filled} filled from known vectors, {self.failed} failed, "
+            f"{self.skipped} skipped (another model), {self.stale} changed or deleted meanwhile"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from chunk_dedup import EmbeddingDedup
+    from registry import get_embedding_cache, get_supabase
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Embed NULL meeting_chunks embeddings through the OpenAI Batch API")
+    parser.add_argument("--model", help="Embedding model of the stored vectors (default: EMBEDDING_MODEL)")
+    parser.add_argument("--dimensions", type=int, help="Vector size (default: EMBEDDING_DIMENSIONS, or the model's native size)")
+    parser.add_argument("--no-wait", action="store_true", help="Submit or check batches and exit without waiting")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between status checks")
+
+    args = parser.parse_args()
+
+    model, dimensions = embedding_settings()
+    if args.model and args.model != model:
+        model, dimensions = args.model, None
+    dimensions = args.dimensions or dimensions
+
+    supabase = get_supabase()
+
+    def no_embedding(texts):
+        raise RuntimeError("batch backfill only embeds through the Batch API")
+
+    dedup = EmbeddingDedup(supabase, model, no_embedding, cache=get_embedding_cache(), dimensions=dimensions)
+    dedup.check_column()
+    backfill = BatchBackfill(supabase, dedup, poll_seconds=args.poll)
+    print(f"📦 Backfilling NULL embeddings with {model} ({dedup.dimensions} dimensions) through the Batch API...")
+    backfill.run(wait=not args.no_wait)
+    print(f"✅ {backfill.describe()}")
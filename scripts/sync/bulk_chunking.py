@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Corpus-wide token windowing across all CPU cores.
+
+Re-chunking every markdown transcript is the CPU-bound part of a full
+rebuild. `iter_chunked_texts` hands batches of texts to a process pool; each
+worker tokenizes its batch with `encode_ordinary_batch` (see text_windows).
+Results come back in input order while only a bounded number of batches is
+in flight. Throughput is reported in tokens/sec so CI runners can be sized
+from it.
+
+Usage:
+    python3 bulk_chunking.py                        # window every file in transcripts/
+    python3 bulk_chunking.py transcripts/ -p 8      # eight worker processes
+    python3 bulk_chunking.py notes.md -o chunks.jsonl
+"""
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from registry import get_tokenizer
+from text_windows import chunk_texts
+
+TOKENIZER_MODEL = "text-embedding-3-small"
+CHUNKING_PROCESSES = int(os.getenv("CHUNKING_PROCESSES", "0")) or os.cpu_count() or 1
+CHUNKING_BATCH_SIZE = 16  # texts per worker task
+
+_worker_tokenizer = None
+
+
+def default_tokenizer():
+    return get_tokenizer(TOKENIZER_MODEL)
+
+
+def _init_worker(tokenizer_factory):
+    global _worker_tokenizer
+    _worker_tokenizer = tokenizer_factory()
+
+
+def _chunk_batch(batch, chunk_size, overlap):
+    keys = [key for key, _ in batch]
+    windows = chunk_texts([text for _, text in batch], _worker_tokenizer, chunk_size, overlap)
+    return list(zip(keys, windows))
+
+
+class ChunkingStats:
+    """Counts for one bulk chunking run."""
+
+    def __init__(self):
+        self.texts = 0
+        self.tokens = 0
+        self.chunks = 0
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def record(self, windows):
+        self.texts += 1
+        self.chunks += len(windows)
+        # Consecutive windows overlap, so the last window's end is the text's token count
+        self.tokens += windows[-1].end if windows else 0
+        self.elapsed = time.monotonic() - self.started
+
+    @property
+    def tokens_per_sec(self):
+        return self.tokens / self.elapsed if self.elapsed else 0.0
+
+    def describe(self):
+        return (
+            f"{self.texts} texts, {self.tokens:,} tokens, {self.chunks} chunks in {self.elapsed:.1f}s "
+            f"({self.tokens_per_sec:,.0f} tokens/s)"
+        )
+
+
+def iter_chunked_texts(items, chunk_size=800, overlap=200, processes=CHUNKING_PROCESSES,
+                       batch_size=CHUNKING_BATCH_SIZE, tokenizer_factory=default_tokenizer, stats=None):
+    """
+    Yield (key, windows) for every (key, text) in `items`, in input order.
+
+    With `processes` <= 1 everything runs in this process. `tokenizer_factory`
+    must be picklable (a module-level function) since every worker calls it
+    once to build its own tokenizer.
+    """
+    items = iter(items)
+
+    def next_batch():
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                break
+        return batch
+
+    def record(results):
+        if stats is not None:
+            for _, windows in results:
+                stats.record(windows)
+        return results
+
+    if processes <= 1:
+        _init_worker(tokenizer_factory)
+        while batch := next_batch():
+            yield from record(_chunk_batch(batch, chunk_size, overlap))
+        return
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(tokenizer_factory,)) as executor:
+        # Two batches per worker keeps every core busy without queueing the whole corpus
+        while len(pending) < processes * 2 and (batch := next_batch()):
+            pending.append(executor.submit(_chunk_batch, batch, chunk_size, overlap))
+
+        while pending:
+            future = pending.popleft()
+            if batch := next_batch():
+                pending.append(executor.submit(_chunk_batch, batch, chunk_size, overlap))
+            yield from record(future.result())
+
+
+def iter_markdown_files(paths):
+    """Yield (path, text) for the given files and every .md file under the given directories."""
+    for path in map(Path, paths):
+        files = sorted(path.rglob("*.md")) if path.is_dir() else [path]
+        for file in files:
+            yield str(file), file.read_text(encoding="utf-8")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Window markdown transcripts into token chunks using every core')
+    parser.add_argument('paths', nargs='*', default=['transcripts'],
+                        help='Markdown files or directories to chunk (default: transcripts)')
+    parser.add_argument('--processes', '-p', type=int, default=CHUNKING_PROCESSES,
+                        help=f'Worker processes; 1 runs in-process (default: {CHUNKING_PROCESSES})')
+    parser.add_argument('--batch-size', type=int, default=CHUNKING_BATCH_SIZE,
+                        help=f'Texts per worker task (default: {CHUNKING_BATCH_SIZE})')
+    parser.add_argument('--chunk-size', type=int, default=800, help='Tokens per chunk (default: 800)')
+    parser.add_argument('--overlap', type=int, default=200, help='Tokens shared by consecutive chunks (default: 200)')
+    parser.add_argument('--output', '-o', help='Write chunks as JSON lines to this file')
+
+    args = parser.parse_args()
+
+    stats = ChunkingStats()
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for path, windows in iter_chunked_texts(iter_markdown_files(args.paths), args.chunk_size, args.overlap,
+                                                args.processes, args.batch_size, stats=stats):
+            if out:
+                for i, window in enumerate(windows):
+                    out.write(json.dumps({"file": path, "chunk_index": i, **window._asdict()}) + "\n")
+    finally:
+        if out:
+            out.close()
+
+    print(f"✅ Chunked {stats.describe()} with {max(args.processes, 1)} process(es)")
+    sys.exit(0 if stats.texts else 1)
@@ -0,0 +1,228 @@
+"""
+Content-hash deduplication of chunk embeddings.
+
+Recurring meetings repeat the same boilerplate, and overlapping windows repeat
+text across re-ingests. Every chunk text is normalized and hashed together with
+the embedding model (and the vector size, when it is not the model's native
+one). The hash is stored in `meeting_chunks.metadata.content_hash`,
+and before a chunk is sent to OpenAI its hash is looked up first among the
+vectors embedded earlier in this run, then in the local embedding cache (see
+embedding_cache) when one is given, and then in `meeting_chunks`. Only chunks
+that miss all of them are embedded.
+"""
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict
+from embeddings import native_dimensions, request_dimensions
+from rate_limiter import execute_with_limit
+
+# In-run vectors kept for reuse; float32 arrays take ~6KB each at 1536 dims
+DEDUP_MAX_ENTRIES = int(os.getenv("CHUNK_DEDUP_MAX_ENTRIES", "20000"))
+LOOKUP_BATCH_SIZE = 50  # hashes per meeting_chunks lookup
+CHECK_SAMPLE_SIZE = 20  # newest embedded rows compared by check_column
+
+
+def normalize_chunk_text(text):
+    """Collapse whitespace so re-wrapped copies of the same text hash alike."""
+    return " ".join(text.split())
+
+
+def content_hash(text, model, dimensions=None):
+    """Hash of the normalized chunk text for one embedding model and vector size."""
+    # Native-size hashes keep their original form, so rows stored before reduced sizes existed still match
+    if request_dimensions(model, dimensions):
+        model = f"{model}:{dimensions}"
+    return hashlib.sha256(f"{model}\n{normalize_chunk_text(text)}".encode("utf-8")).hexdigest()
+
+
+def _parse_vector(value):
+    # pgvector columns come back from PostgREST as "[0.1,0.2,...]"
+    return json.loads(value) if isinstance(value, str) else value
+
+
+class EmbeddingDedup:
+    """
+    Embeds chunk texts, reusing the vectors of identical chunks.
+
+    `embed_fn(texts)` returns vectors in input order and is only called with
+    texts that were neither embedded earlier in this run nor found in the
+    local `cache` or `meeting_chunks`. Vectors found in `meeting_chunks` or
+    embedded are written to the cache. Hashes and cache entries are keyed by
+    the model and `dimensions` (the model's native size by default), which
+    must match what embed_fn returns. Without `supabase`, only this run and
+    the cache are searched, for texts that are not stored in meeting_chunks.
+    """
+
+    def __init__(self, supabase, model, embed_fn, max_entries=DEDUP_MAX_ENTRIES, cache=None, dimensions=None):
+        self.supabase = supabase
+        self.model = model
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self.cache = cache
+        self.dimensions = dimensions or native_dimensions(model)
+        self._vectors = OrderedDict()  # hash -> float32 array, least recently used first
+
+        self.run_hits = 0
+        self.cache_hits = 0
+        self.stored_hits = 0
+        self.misses = 0
+
+    def check_column(self):
+        """
+        Fail fast unless the vectors in meeting_chunks are of this dedup's model and size.
+
+        Uploaders call this before storing anything, so a model or size that
+        does not match the column (e.g. after reduced_dimension_embeddings.sql)
+        stops the run instead of failing every insert. The model is read from
+        the content hashes of the newest embedded rows: vectors of two models
+        of the same size would fit the column but not be comparable.
+        """
+        result = execute_with_limit(
+            self.supabase.table("meeting_chunks").select("embedding").not_.is_("embedding", "null").limit(1)
+        )
+        rows = result.data or []
+        stored = len(_parse_vector(rows[0]["embedding"])) if rows else None
+        if stored and self.dimensions and stored != self.dimensions:
+            raise ValueError(
+                f"meeting_chunks.embedding holds {stored}-dimension vectors, not the {self.dimensions} of "
+                f"{self.model} (set EMBEDDING_MODEL and EMBEDDING_DIMENSIONS to match the column)"
+            )
+
+        result = execute_with_limit(
+            self.supabase.table("meeting_chunks")
+            .select("content, content_hash:metadata->>content_hash")
+            .not_.is_("embedding", "null")
+            .not_.is_("metadata->>content_hash", "null")
+            .order("created_at", desc=True)
+            .limit(CHECK_SAMPLE_SIZE)
+        )
+        for row in result.data or []:
+            if row["content_hash"] != content_hash(row["content"], self.model, self.dimensions):
+                raise ValueError(
+                    f"meeting_chunks.embedding holds vectors of another model than {self.model} "
+                    f"(set EMBEDDING_MODEL and EMBEDDING_DIMENSIONS to those of the stored vectors)"
+                )
+
+    def embed(self, texts):
+        """Return (content hashes, vectors) for the texts, in input order."""
+        hashes, vectors, source = self._find(texts)
+
+        to_embed = {}
+        for text, h in zip(texts, hashes):
+            if h not in vectors:
+                to_embed.setdefault(h, text)
+        if to_embed:
+            for h, vector in zip(to_embed, self.embed_fn(list(to_embed.values()))):
+                vectors[h] = vector
+                source[h] = "embedded"
+
+        self._record(hashes, vectors, source)
+        return hashes, [vectors[h] for h in hashes]
+
+    def lookup(self, texts):
+        """
+        Return (content hashes, vectors) for the texts without embedding any
+
+        Texts that were not embedded before get None as their vector; their
+        vectors can be handed back later with `add_embedded`.
+        """
+        hashes, vectors, source = self._find(texts)
+        self._record(hashes, vectors, source)
+        return hashes, [vectors.get(h) for h in hashes]
+
+    def add_embedded(self, items):
+        """Remember and cache (content hash, vector) pairs embedded elsewhere, e.g. by the Batch API."""
+        items = list(items)
+        for h, vector in items:
+            self._remember(h, vector)
+        if self.cache is not None:
+            self.cache.put_many(self.model, self.dimensions, items)
+
+    def _find(self, texts):
+        """Hashes of the texts, the vectors already known for them and where each came from."""
+        hashes = [content_hash(text, self.model, self.dimensions) for text in texts]
+        vectors = {}
+        source = {}  # hash -> "run", "cache", "stored" or "embedded"
+
+        for h in hashes:
+            if h not in vectors and h in self._vectors:
+                self._vectors.move_to_end(h)
+                vectors[h] = self._vectors[h].tolist()
+                source[h] = "run"
+
+        missing = list(dict.fromkeys(h for h in hashes if h not in vectors))
+        if missing and self.cache is not None:
+            for h, vector in self.cache.get_many(self.model, self.dimensions, missing).items():
+                vectors[h] = vector
+                source[h] = "cache"
+            missing = [h for h in missing if h not in vectors]
+        if missing and self.supabase is not None:
+            for h, vector in self._lookup_stored(missing).items():
+                vectors[h] = vector
+                source[h] = "stored"
+        return hashes, vectors, source
+
+    def _record(self, hashes, vectors, source):
+        """Cache new vectors, count where each text's vector came from and remember them for this run."""
+        if self.cache is not None:
+            self.cache.put_many(
+                self.model, self.dimensions,
+                [(h, vectors[h]) for h in source if source[h] in ("stored", "embedded")],
+            )
+
+        seen = set()
+        for h in hashes:
+            if (h in seen and h in vectors) or source.get(h) == "run":
+                self.run_hits += 1
+            elif source.get(h) == "cache":
+                self.cache_hits += 1
+            elif source.get(h) == "stored":
+                self.stored_hits += 1
+            else:
+                self.misses += 1
+            if h not in seen:
+                seen.add(h)
+                if h in vectors:
+                    self._remember(h, vectors[h])
+
+    def embed_one(self, text):
+        """Return (content hash, vector) for a single text."""
+        hashes, vectors = self.embed([text])
+        return hashes[0], vectors[0]
+
+    def _remember(self, h, vector):
+        self._vectors[h] = array("f", vector)
+        self._vectors.move_to_end(h)
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+
+    def _lookup_stored(self, hashes):
+        """Vectors already stored in meeting_chunks for any of the hashes."""
+        found = {}
+        for i in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            batch = hashes[i:i + LOOKUP_BATCH_SIZE]
+            result = execute_with_limit(
+                self.supabase.table("meeting_chunks")
+                .select("embedding, content_hash:metadata->>content_hash")
+                .in_("metadata->>content_hash", batch)
+                .not_.is_("embedding", "null")
+            )
+            for row in result.data or []:
+                found.setdefault(row["content_hash"], _parse_vector(row["embedding"]))
+        return found
+
+    def reset_counts(self):
+        """Start a new reporting period; remembered vectors are kept."""
+        self.run_hits = self.cache_hits = self.stored_hits = self.misses = 0
+
+    def describe(self):
+        total = self.run_hits + self.cache_hits + self.stored_hits + self.misses
+        reused = self.run_hits + self.cache_hits + self.stored_hits
+        hit_rate = reused / total * 100 if total else 0.0
+        return (
+            f"chunk dedup: {reused}/{total} embeddings reused ({hit_rate:.0f}% hit rate; "
+            f"{self.run_hits} from this run, {self.cache_hits} from the local cache, "
+            f"{self.stored_hits} from meeting_chunks), {self.misses} embedded"
+        )
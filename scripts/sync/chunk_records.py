@@ -0,0 +1,68 @@
+"""
+Compact records used while ChunkingStrategy cuts a transcript into chunks.
+
+A `Group` keeps only the texts and times of one speaker turn, not the raw
+API sentence dicts, so streamed sentences can be dropped as soon as they are
+grouped. The chunk under construction is a `ChunkBuffer`: its text is
+collected as parts and joined once when the chunk closes (instead of copying
+a growing string for every group).
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+
+def format_group(speaker_id: int, text: str) -> str:
+    """Group text with its speaker label"""
+    return f"[Speaker {speaker_id + 1}]: {text}"
+
+
+@dataclass(slots=True)
+class Group:
+    """Consecutive sentences of one speaker without a long pause"""
+    speaker_id: int
+    start_time: int
+    end_time: int
+    texts: List[str] = field(default_factory=list)
+
+    def add(self, text: Optional[str], end_time: int):
+        if text:
+            self.texts.append(text)
+        self.end_time = end_time
+
+    def format(self) -> str:
+        return format_group(self.speaker_id, " ".join(self.texts))
+
+
+@dataclass(slots=True)
+class ChunkBuffer:
+    """
+    Chunk being filled with groups; `tokens` excludes the separator newlines
+
+    `group_starts` holds the (character offset, token count) of each group
+    in the chunk text, so the overlap can be cut from its last groups.
+    """
+    start_time: Optional[int] = None
+    end_time: Optional[int] = None
+    tokens: int = 0
+    length: int = 0
+    parts: List[str] = field(default_factory=list)
+    speakers: Set[int] = field(default_factory=set)
+    group_starts: List[Tuple[int, int]] = field(default_factory=list)
+
+    @classmethod
+    def with_overlap(cls, text: str, tokens: int, start_time: int) -> "ChunkBuffer":
+        return cls(start_time=start_time, tokens=tokens, length=len(text), parts=[text] if text else [])
+
+    def add(self, group: Group, text: str, tokens: int):
+        self.group_starts.append((self.length, tokens))
+        self.length += len(text) + 1
+        self.parts.append(text)
+        self.parts.append("\n")
+        self.speakers.add(group.speaker_id)
+        if self.start_time is None:
+            self.start_time = group.start_time
+        self.end_time = group.end_time
+        self.tokens += tokens
+
+    def text(self) -> str:
+        return "".join(self.parts)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of ChunkingStrategy on the biggest transcripts.
+
+Runs the chunker under tracemalloc on cached raw transcripts (largest
+duration first), on JSON files, or on a synthetic transcript, and reports
+the peak memory allocated while chunking. The transcript itself is loaded
+before tracing starts, so only the chunker's own allocations are counted:
+`list` keeps every chunk like create_chunks, `stream` drops each chunk as
+iter_chunks yields it like the uploader does.
+
+Usage:
+    python3 chunker_memory.py                       # 5 largest cached transcripts
+    python3 chunker_memory.py --top 20
+    python3 chunker_memory.py transcript.json
+    python3 chunker_memory.py --synthetic 50000     # 50k generated sentences
+"""
+import json
+import random
+import sys
+import time
+import tracemalloc
+from fireflies_queries import selection_set
+from optimized_pipeline import ChunkingStrategy
+from transcript_cache import TranscriptCache, fields_fingerprint
+
+WORDS = ("the we they so and then project budget schedule site permit design cost review crew "
+         "concrete steel drawings client week monday friday next step decided follow up").split()
+
+
+def synthetic_transcript(sentence_count, seed=0):
+    """Meeting-shaped transcript with a few speakers taking turns"""
+    rng = random.Random(seed)
+    sentences = []
+    speaker = 0
+    for i in range(sentence_count):
+        if rng.random() < 0.3:
+            speaker = rng.randrange(4)
+        start = i * 4000
+        sentences.append({
+            "index": i,
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30))),
+            "raw_text": "",
+            "speaker_id": speaker,
+            "speaker_name": f"Speaker {speaker + 1}",
+            "start_time": start,
+            "end_time": start + 3500,
+        })
+    return {"id": f"synthetic-{sentence_count}", "title": "Synthetic", "sentences": sentences,
+            "summary": {"keywords": ["budget", "permit"]}}
+
+
+def largest_cached(top):
+    cache = TranscriptCache(fields_fingerprint(selection_set("full")))
+    listed = sorted(cache.list_transcripts(), key=lambda t: t.get("duration") or 0, reverse=True)
+    for entry in listed[:top]:
+        transcript = cache.get(entry["id"])
+        if transcript:
+            yield transcript
+
+
+def measure(chunker, transcript, keep):
+    """(chunks, seconds, peak bytes) for one chunking run"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    if keep:
+        count = len(chunker.create_chunks(transcript))
+    else:
+        count = sum(1 for _ in chunker.iter_chunks(transcript))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure the chunker\'s peak memory on large transcripts')
+    parser.add_argument('files', nargs='*', help='Raw transcript JSON files (default: largest cached transcripts)')
+    parser.add_argument('--top', type=int, default=5, help='Largest cached transcripts to measure (default: 5)')
+    parser.add_argument('--synthetic', type=int, metavar='SENTENCES',
+                        help='Measure a generated transcript with this many sentences instead')
+
+    args = parser.parse_args()
+
+    if args.synthetic:
+        transcripts = [synthetic_transcript(args.synthetic)]
+    elif args.files:
+        transcripts = (json.loads(open(path, encoding="utf-8").read()) for path in args.files)
+    else:
+        transcripts = largest_cached(args.top)
+
+    chunker = ChunkingStrategy()
+    measured = 0
+    for transcript in transcripts:
+        sentences = len(transcript.get("sentences") or [])
+        print(f"📄 {transcript.get('title') or transcript.get('id')} ({sentences:,} sentences)")
+        for mode, keep in (("list", True), ("stream", False)):
+            count, elapsed, peak = measure(chunker, transcript, keep)
+            print(f"   {mode:<6} {count} chunks in {elapsed:.2f}s, peak {peak / 1024 / 1024:.1f} MB "
+                  f"({peak / max(count, 1) / 1024:.1f} KB/chunk)")
+        measured += 1
+
+    if not measured:
+        print("❌ No transcripts to measure; pass JSON files or --synthetic N")
+    sys.exit(0 if measured else 1)
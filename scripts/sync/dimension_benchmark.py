@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Search recall and latency of reduced-dimension embeddings on our corpus.
+
+Samples chunks from meeting_chunks, embeds them (and the queries) at the
+model's native size, and compares each reduced size against that baseline:
+recall@k is the share of the native-size top k that the reduced vectors
+also return, latency is exact cosine search over the sample, and storage is
+what the vectors take in pgvector. Native vectors come from the local
+embedding cache or meeting_chunks whenever they were embedded before.
+
+Reduced vectors are the native ones cut to size and re-normalized, which is
+what a text-embedding-3 model returns for a smaller `dimensions`; `--from-api`
+embeds the sample again at every size instead. `--database` also times the
+deployed search_chunks function with queries of the configured
+EMBEDDING_DIMENSIONS.
+
+Queries are lines of a text file (`--queries`), or the opening words of
+randomly sampled chunks.
+
+Usage:
+    python3 dimension_benchmark.py
+    python3 dimension_benchmark.py --sample 5000 --sizes 256 512 768 --k 20
+    python3 dimension_benchmark.py --queries questions.txt --database
+"""
+import os
+import random
+import time
+import numpy as np
+from chunk_dedup import EmbeddingDedup
+from embeddings import native_dimensions
+from rate_limiter import execute_with_limit
+from registry import get_embedding_cache, get_embedding_service, get_supabase
+
+PAGE_SIZE = 500  # meeting_chunks rows per request
+QUERY_WORDS = 12  # words of a sampled chunk used as a query
+
+
+def load_chunks(supabase, sample, seed=0):
+    """Contents of up to `sample` chunks, spread over the whole table"""
+    contents = []
+    start = 0
+    while True:
+        result = execute_with_limit(
+            supabase.table("meeting_chunks").select("content").order("id").range(start, start + PAGE_SIZE - 1)
+        )
+        rows = result.data or []
+        contents.extend(row["content"] for row in rows if row["content"])
+        if len(rows) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+    if len(contents) > sample:
+        contents = random.Random(seed).sample(contents, sample)
+    return contents
+
+
+def sample_queries(contents, count, seed=0):
+    """Opening words of randomly chosen chunks"""
+    rng = random.Random(seed + 1)
+    picked = rng.sample(contents, min(count, len(contents)))
+    return [" ".join(text.split()[:QUERY_WORDS]) for text in picked]
+
+
+def shorten(vectors, dimensions):
+    """Cut vectors to `dimensions` and re-normalize them, as the API does for text-embedding-3 models"""
+    cut = vectors[:, :dimensions]
+    return cut / np.linalg.norm(cut, axis=1, keepdims=True)
+
+
+def normalized(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def search(corpus, queries, k):
+    """Top-k corpus rows per query by cosine similarity, and the seconds each query took"""
+    results = []
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        scores = corpus @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        results.append(set(top.tolist()))
+        timings.append(time.perf_counter() - started)
+    return results, timings
+
+
+def time_database(supabase, query_vectors, k):
+    """Seconds per search_chunks call with the given query vectors"""
+    timings = []
+    for vector in query_vectors:
+        started = time.perf_counter()
+        supabase.rpc("search_chunks", {"query_embedding": vector, "match_count": k}).execute()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def main(args):
+    supabase = get_supabase()
+    native = native_dimensions(args.model)
+    sizes = sorted({size for size in args.sizes if size < native}, reverse=True)
+
+    print(f"📥 Sampling up to {args.sample} chunks from meeting_chunks...")
+    contents = load_chunks(supabase, args.sample, args.seed)
+    if len(contents) <= args.k:
+        print(f"❌ Only {len(contents)} chunks found; need more than k={args.k}")
+        return
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = sample_queries(contents, args.query_count, args.seed)
+    print(f"📊 {len(contents)} chunks, {len(queries)} queries, {args.model} at {native} dimensions")
+
+    def embed(texts, dimensions=None):
+        service = get_embedding_service(args.model, dimensions=dimensions)
+        dedup = EmbeddingDedup(supabase, args.model, service, cache=get_embedding_cache(), dimensions=dimensions)
+        return normalized(dedup.embed(texts)[1])
+
+    print("🧮 Embedding (cached and stored vectors are reused)...")
+    corpus = embed(contents)
+    query_vectors = embed(queries)
+
+    baseline, timings = search(corpus, query_vectors, args.k)
+    rows = [(native, 1.0, timings)]
+    for size in sizes:
+        if args.from_api:
+            reduced_corpus, reduced_queries = embed(contents, size), embed(queries, size)
+        else:
+            reduced_corpus, reduced_queries = shorten(corpus, size), shorten(query_vectors, size)
+        found, timings = search(reduced_corpus, reduced_queries, args.k)
+        recall = np.mean([len(a & b) / args.k for a, b in zip(baseline, found)])
+        rows.append((size, recall, timings))
+
+    print(f"\n{'dims':>6} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8} {'vectors MB':>11}")
+    for size, recall, timings in rows:
+        # pgvector stores 4 bytes per dimension plus an 8-byte header per vector
+        megabytes = len(contents) * (4 * size + 8) / 1024 / 1024
+        print(f"{size:>6} {recall:>10.3f} {percentile(timings, 50):>8.3f} {percentile(timings, 95):>8.3f} "
+              f"{megabytes:>11.1f}")
+    print(f"   (exact search over {len(contents)} chunks; an ivfflat index scales with the same vector size)")
+
+    if args.database:
+        size = int(os.getenv("EMBEDDING_DIMENSIONS", native))
+        vectors = query_vectors if size == native else shorten(query_vectors, size)
+        timings = time_database(supabase, vectors.tolist(), args.k)
+        print(f"\n🗄️  search_chunks at {size} dimensions: p50 {percentile(timings, 50):.1f} ms, "
+              f"p95 {percentile(timings, 95):.1f} ms over {len(timings)} queries")
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Benchmark recall and search latency of reduced embedding sizes")
+    parser.add_argument("--model", default="text-embedding-3-small", help="Embedding model (a text-embedding-3 model)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[768, 512, 256], help="Reduced sizes to compare")
+    parser.add_argument("--sample", type=int, default=2000, help="Chunks to search over (default: 2000)")
+    parser.add_argument("--queries", help="Text file with one query per line (default: sampled chunk openings)")
+    parser.add_argument("--query-count", type=int, default=200, help="Sampled queries when --queries is not given")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--from-api", action="store_true", help="Embed at every size instead of shortening vectors")
+    parser.add_argument("--database", action="store_true", help="Also time the deployed search_chunks function")
+
+    main(parser.parse_args())
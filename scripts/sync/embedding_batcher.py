@@ -0,0 +1,105 @@
+"""
+Embedding requests packed up to the API's per-request limits.
+
+`pack_requests` splits a list of texts, in order, into requests of at most
+MAX_INPUTS_PER_REQUEST inputs and MAX_TOKENS_PER_REQUEST tokens; the
+EmbeddingService sends the texts that miss the dedup cache that way instead
+of one request per chunk.
+
+`EmbeddingBatcher` goes further for bulk runs: it collects texts from many
+transcripts, each with a callback, and sends them once a full batch has
+accumulated (or on `flush`). Batches run on a background thread while the
+caller keeps chunking; callbacks always run on the caller's thread, in the
+order the texts were added, inside `add` or `flush`. A backfill of tens of
+thousands of chunks makes a few hundred requests.
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_INPUTS_PER_REQUEST = 2048  # OpenAI embeddings input array limit
+MAX_TOKENS_PER_REQUEST = int(os.getenv("EMBEDDING_MAX_REQUEST_TOKENS", "300000"))  # summed over all inputs
+MAX_REQUESTS_IN_FLIGHT = 2  # batches queued behind the running one before `add` waits
+
+
+def count_tokens(texts, tokenizer=None):
+    """Token count of each text; bounded by the UTF-8 length (a token is at least one byte) without a tokenizer."""
+    if tokenizer is None:
+        return [len(text.encode("utf-8")) for text in texts]
+    return [len(ids) for ids in tokenizer.encode_ordinary_batch(texts)]
+
+
+def pack_requests(token_counts, max_inputs=MAX_INPUTS_PER_REQUEST, max_tokens=MAX_TOKENS_PER_REQUEST):
+    """Yield (start, end) ranges of consecutive inputs that each fit in one request."""
+    start = 0
+    tokens = 0
+    for i, count in enumerate(token_counts):
+        if i > start and (i - start >= max_inputs or tokens + count > max_tokens):
+            yield start, i
+            start, tokens = i, 0
+        tokens += count
+    if start < len(token_counts):
+        yield start, len(token_counts)
+
+
+class EmbeddingBatcher:
+    """
+    Packs texts from many transcripts into shared embedding requests.
+
+    `embed_fn(texts)` returns one result per text (whatever the callbacks
+    expect, e.g. (content hash, vector) pairs) and should not raise; it is
+    called with at most `max_inputs` texts of `max_tokens` tokens. Those
+    default to one request's worth; with a concurrent embed_fn, multiples
+    of it keep several requests in flight per batch. `add` takes the
+    text's token count when the caller knows it (chunks carry theirs),
+    otherwise it is bounded by the UTF-8 length.
+    """
+
+    def __init__(self, embed_fn, max_inputs=MAX_INPUTS_PER_REQUEST, max_tokens=MAX_TOKENS_PER_REQUEST):
+        self.embed_fn = embed_fn
+        self.max_inputs = max_inputs
+        self.max_tokens = max_tokens
+        self._pending = []  # (text, callback)
+        self._pending_tokens = 0
+        self._in_flight = deque()  # (callbacks, future), oldest first
+        self._executor = None
+        self.batches = 0
+
+    def add(self, text, callback, tokens=None):
+        """Queue a text; `callback(result)` runs once its batch has been embedded."""
+        if tokens is None:
+            tokens = len(text.encode("utf-8"))
+        if self._pending and (len(self._pending) >= self.max_inputs
+                              or self._pending_tokens + tokens > self.max_tokens):
+            self._submit()
+        self._pending.append((text, callback))
+        self._pending_tokens += tokens
+        self._deliver(wait=False)
+
+    def flush(self):
+        """Embed everything still queued and run all outstanding callbacks."""
+        if self._pending:
+            self._submit()
+        self._deliver(wait=True)
+
+    def _submit(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-batch")
+        texts = [text for text, _ in self._pending]
+        callbacks = [callback for _, callback in self._pending]
+        self._in_flight.append((callbacks, self._executor.submit(self.embed_fn, texts)))
+        self._pending = []
+        self._pending_tokens = 0
+        self.batches += 1
+        # Bound memory when chunking outpaces the API
+        while len(self._in_flight) > MAX_REQUESTS_IN_FLIGHT:
+            self._deliver_oldest()
+
+    def _deliver(self, wait):
+        while self._in_flight and (wait or self._in_flight[0][1].done()):
+            self._deliver_oldest()
+
+    def _deliver_oldest(self):
+        callbacks, future = self._in_flight.popleft()
+        for callback, result in zip(callbacks, future.result()):
+            callback(result)
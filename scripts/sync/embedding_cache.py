@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Local SQLite cache of embedding vectors.
+
+Vectors are keyed by (model, dimensions, content hash), where the content
+hash is chunk_dedup.content_hash of the text, and stored as packed float32
+blobs. EmbeddingDedup consults the cache after its in-run vectors and before
+`meeting_chunks`, and writes every vector it obtains back, so retries,
+reprocessing and re-ingests of text embedded before never pay OpenAI again,
+even across runs. When the database grows past its size cap, the least
+recently used vectors are evicted.
+
+The cache can be warm-started from the `content`/`embedding` rows already in
+`meeting_chunks`:
+
+    python3 embedding_cache.py --warm-start
+    python3 embedding_cache.py --warm-start --model text-embedding-ada-002 --trust-unhashed
+    python3 embedding_cache.py --stats
+"""
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from chunk_dedup import _parse_vector, content_hash
+from embeddings import native_dimensions
+from rate_limiter import execute_with_limit
+
+CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3"))
+CACHE_MAX_BYTES = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024)  # 0 disables the cache
+EVICT_TO = 0.9  # fraction of the cap kept after an eviction
+QUERY_BATCH_SIZE = 500  # hashes per SELECT, under SQLite's bound-parameter limit
+WARM_START_PAGE_SIZE = 500  # meeting_chunks rows per request
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, dimensions, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def _pack(vector):
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob):
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """Size-bounded LRU store of float32 vectors in one SQLite file."""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Used from the embedding thread as well as the main thread, always under the lock
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get_many(self, model, dimensions, hashes):
+        """Cached vectors for any of the hashes, as {hash: list of floats}."""
+        found = {}
+        now = time.time_ns()
+        with self._lock:
+            for i in range(0, len(hashes), QUERY_BATCH_SIZE):
+                batch = hashes[i:i + QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimensions = ? AND text_hash IN ({placeholders})",
+                    (model, dimensions, *batch),
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = _unpack(blob)
+            if found:
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND dimensions = ? AND text_hash = ?",
+                    [(now, model, dimensions, h) for h in found],
+                )
+                self._db.commit()
+        self.hits += len(found)
+        self.misses += len(set(hashes)) - len(found)
+        return found
+
+    def put_many(self, model, dimensions, items):
+        """Store (hash, vector) pairs; hashes already cached are left as they are."""
+        now = time.time_ns()
+        # Distinct ticks in insertion order, so eviction can stop between rows of one call
+        rows = [(model, dimensions, h, _pack(vector), now + i) for i, (h, vector) in enumerate(items)]
+        if not rows:
+            return
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, dimensions, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            inserted = self._db.total_changes - before
+            # Every vector of one call has the same size
+            self._bytes += inserted * len(rows[0][3])
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used vectors until the cache is back under EVICT_TO of its cap."""
+        excess = self._bytes - int(self.max_bytes * EVICT_TO)
+        freed = 0
+        cutoff = None
+        for last_used, size in self._db.execute(
+            "SELECT last_used, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            if freed >= excess:
+                break
+            cutoff = last_used
+            freed += size
+        if cutoff is None:
+            return
+        # Rows sharing the cutoff timestamp go together, so recount what was actually freed
+        freed, count = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0), COUNT(*) FROM embeddings WHERE last_used <= ?", (cutoff,)
+        ).fetchone()
+        self._db.execute("DELETE FROM embeddings WHERE last_used <= ?", (cutoff,))
+        self._bytes -= freed
+        self.evicted += count
+
+    def warm_start(self, supabase, model, dimensions=None, trust_unhashed=False, page_size=WARM_START_PAGE_SIZE):
+        """
+        Load the vectors stored in meeting_chunks for one model; returns the number added
+
+        Rows are only taken when their metadata.content_hash matches the
+        content hashed for `model` and `dimensions`, which proves which model
+        embedded them and at what size.
+        Older rows without a content_hash are skipped unless
+        `trust_unhashed` is set. Vectors of the wrong size are always skipped.
+        """
+        dimensions = dimensions or native_dimensions(model)
+        before = self.size()
+        start = 0
+        while True:
+            result = execute_with_limit(
+                supabase.table("meeting_chunks")
+                .select("content, embedding, content_hash:metadata->>content_hash")
+                .not_.is_("embedding", "null")
+                .order("id")
+                .range(start, start + page_size - 1)
+            )
+            rows = result.data or []
+            items = []
+            for row in rows:
+                text_hash = content_hash(row["content"] or "", model, dimensions)
+                stored_hash = row.get("content_hash")
+                if stored_hash != text_hash and (stored_hash or not trust_unhashed):
+                    continue
+                vector = _parse_vector(row["embedding"])
+                if len(vector) == dimensions:
+                    items.append((text_hash, vector))
+            self.put_many(model, dimensions, items)
+            if len(rows) < page_size:
+                break
+            start += page_size
+        return self.size() - before
+
+    def size(self):
+        """Number of cached vectors"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def describe(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        return (
+            f"embedding cache: {self.hits}/{total} hits ({hit_rate:.0f}% hit rate), "
+            f"{self._bytes / 1024 / 1024:.1f}/{self.max_bytes / 1024 / 1024:.0f} MB used, {self.evicted} evicted"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from registry import get_embedding_cache, get_supabase
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Inspect or warm-start the local embedding cache")
+    parser.add_argument("--warm-start", action="store_true", help="Load vectors already stored in meeting_chunks")
+    parser.add_argument("--model", default="text-embedding-3-small", help="Embedding model of the vectors to load")
+    parser.add_argument("--dimensions", type=int, help="Vector size of the vectors to load (default: the model's native size)")
+    parser.add_argument("--trust-unhashed", action="store_true",
+                        help="Also load rows without a content_hash, assuming they were embedded with --model")
+    parser.add_argument("--stats", action="store_true", help="Print the cache size")
+
+    args = parser.parse_args()
+
+    cache = get_embedding_cache()
+    if cache is None:
+        print("❌ The embedding cache is disabled (EMBEDDING_CACHE_MAX_MB=0)")
+        raise SystemExit(1)
+
+    if args.warm_start:
+        print(f"🔥 Warm-starting {cache.path} with {args.model} vectors from meeting_chunks...")
+        added = cache.warm_start(get_supabase(), args.model, args.dimensions, trust_unhashed=args.trust_unhashed)
+        print(f"✅ Added {added} vectors")
+    if args.stats or not args.warm_start:
+        print(f"📦 {cache.path}: {cache.size()} vectors")
+        print(f"   {cache.describe()}")
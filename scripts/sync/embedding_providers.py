@@ -0,0 +1,135 @@
+"""
+Pluggable embedding backends.
+
+Every uploader embeds through an `EmbeddingProvider`: called with a list of
+texts it returns one vector per text, in order. Its `model` names the
+vectors; content hashes and the local embedding cache are keyed by it, so
+vectors of different backends never stand in for each other. Pick the
+backend with EMBEDDING_PROVIDER (see registry.get_embedding_provider):
+
+    openai   EmbeddingService: concurrent OpenAI requests (the default)
+    local    LocalEmbedder: a sentence-transformers model (ONNX or PyTorch)
+             loaded from EMBEDDING_LOCAL_MODEL, on the CPU
+    hashing  HashingEmbedder: deterministic feature hashing, no model and no
+             network; for tests and offline dry runs, not for search
+
+The local model runs on every core. The vectors of both local backends must
+fit the `meeting_chunks.embedding` column: the hashing embedder produces
+whatever size is asked for, while a local model has a fixed size (e.g. 384
+or 768) that needs sql/reduced_dimension_embeddings.sql with that number.
+"""
+import math
+import os
+import time
+import zlib
+from pathlib import Path
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+EMBEDDING_LOCAL_MODEL = os.getenv("EMBEDDING_LOCAL_MODEL", "models/all-MiniLM-L6-v2")
+LOCAL_BATCH_SIZE = int(os.getenv("EMBEDDING_LOCAL_BATCH_SIZE", "64"))  # texts per forward pass
+CPU_COUNT = os.cpu_count() or 1
+
+
+class EmbeddingProvider:
+    """
+    Base class of the embedding backends.
+
+    Subclasses set `model` and `dimensions` and implement `_embed(texts)`.
+    `max_concurrency` is how many requests' worth of texts the backend
+    works on at once, which sizes the uploaders' EmbeddingBatcher batches.
+    """
+
+    model = None
+    dimensions = 0
+    max_concurrency = 1
+
+    texts = 0
+    seconds = 0.0
+
+    def __call__(self, texts):
+        """Vectors for the texts, in input order."""
+        texts = list(texts)
+        started = time.perf_counter()
+        vectors = self._embed(texts)
+        self.seconds += time.perf_counter() - started
+        self.texts += len(texts)
+        return vectors
+
+    def _embed(self, texts):
+        raise NotImplementedError
+
+    def reset_counts(self):
+        """Start a new reporting period."""
+        self.texts = 0
+        self.seconds = 0.0
+
+    def describe(self):
+        rate = self.texts / self.seconds if self.seconds else 0.0
+        return f"{self.model} embeddings: {self.texts} texts in {self.seconds:.1f}s ({rate:.0f}/s)"
+
+
+def hash_embedding(text, dimensions):
+    """
+    Unit vector of signed, hashed word and word-pair counts
+
+    Texts sharing words point in similar directions, so similarity search
+    behaves plausibly in tests. An empty text maps to the first unit vector.
+    """
+    vector = [0.0] * dimensions
+    words = text.lower().split()
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        value = zlib.crc32(feature.encode("utf-8"))
+        vector[value % dimensions] += 1.0 if value >> 31 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    if not norm:
+        vector[0] = 1.0
+        return vector
+    return [v / norm for v in vector]
+
+
+class HashingEmbedder(EmbeddingProvider):
+    """Deterministic embeddings from feature hashing, tens of thousands of chunks a minute on one core."""
+
+    def __init__(self, dimensions=1536):
+        self.dimensions = dimensions
+        self.model = f"hashing-{dimensions}"
+
+    def _embed(self, texts):
+        return [hash_embedding(text, self.dimensions) for text in texts]
+
+
+class LocalEmbedder(EmbeddingProvider):
+    """
+    A sentence-transformers model from a local directory, run on the CPU.
+
+    Nothing is downloaded: the directory must hold the saved model. When it
+    contains an exported ONNX model (e.g. onnx/model.onnx) that is used
+    through ONNX Runtime, otherwise the PyTorch weights. Either way inference
+    uses `threads` cores (all of them by default), in batches of
+    `batch_size` texts. Vectors are normalized for cosine search.
+    """
+
+    def __init__(self, path=EMBEDDING_LOCAL_MODEL, batch_size=LOCAL_BATCH_SIZE, threads=CPU_COUNT):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_PROVIDER=local needs sentence-transformers (pip install -r requirements-local-embeddings.txt)"
+            ) from e
+
+        path = Path(path)
+        if not path.is_dir():
+            raise RuntimeError(f"Local embedding model not found at {path} (set EMBEDDING_LOCAL_MODEL)")
+        torch.set_num_threads(threads)
+        backend = "onnx" if any(path.glob("**/*.onnx")) else "torch"
+        self._model = SentenceTransformer(str(path), device="cpu", backend=backend, local_files_only=True)
+        self.model = f"local/{path.name}"
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+
+    def _embed(self, texts):
+        vectors = self._model.encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+        )
+        return vectors.tolist()
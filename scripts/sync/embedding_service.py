@@ -0,0 +1,258 @@
+"""
+Asynchronous embedding client that keeps several requests in flight.
+
+`EmbeddingService.embed(texts)` packs the texts into requests within the
+API's per-request limits (see embedding_batcher) and sends them concurrently
+on an AsyncOpenAI client, at most `max_concurrency` at a time. Each request
+first reserves its tokens from a `RateBudget`, which models the
+requests-per-minute and tokens-per-minute limits as two continuously
+refilling buckets and is corrected by the x-ratelimit-* headers of every
+response. 429s and transient errors are retried with exponential backoff and
+full jitter, honouring Retry-After when the server sends one.
+
+Synchronous callers use `submit(texts)` (a concurrent.futures.Future) or
+call the service directly (`service(texts)` blocks for the vectors). Both run
+the coroutine on the service's own event loop thread, so the uploaders need
+no asyncio code. Use either that facade or `await embed()` from your own
+loop, not both on one service.
+
+The service does not take tokens from rate_limiter's blocking "openai"
+bucket, which would stall the event loop; its RateBudget plays that role.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+from embedding_batcher import MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST, count_tokens, pack_requests
+from embedding_providers import EmbeddingProvider
+from embeddings import native_dimensions, request_dimensions
+from rate_limiter import parse_reset_duration, parse_retry_after
+
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # requests in flight
+EMBEDDING_RPM = int(os.getenv("EMBEDDING_RPM", "3000"))  # starting budget; replaced by x-ratelimit-limit-requests
+EMBEDDING_TPM = int(os.getenv("EMBEDDING_TPM", "1000000"))  # starting budget; replaced by x-ratelimit-limit-tokens
+MAX_RETRIES = 6
+BACKOFF_BASE = 1.0  # seconds; the backoff cap doubles per attempt up to BACKOFF_MAX
+BACKOFF_MAX = 60.0
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry `attempt` (0-based): Retry-After, or full-jitter exponential backoff."""
+    if retry_after is not None:
+        # Spread clients that were told the same instant a little
+        return retry_after + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class RateBudget:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one event loop.
+
+    Both refill continuously at their per-minute rate. Responses correct
+    them: x-ratelimit-limit-* replaces the rates, x-ratelimit-remaining-*
+    lowers the levels to what the server counts, and an exhausted limit
+    blocks every request until its x-ratelimit-reset-* time.
+    """
+
+    def __init__(self, requests_per_minute=EMBEDDING_RPM, tokens_per_minute=EMBEDDING_TPM):
+        self.limits = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self._levels = dict(self.limits)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+        self.wait_seconds = 0.0
+        self.throttled_count = 0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        for kind, limit in self.limits.items():
+            self._levels[kind] = min(limit, self._levels[kind] + elapsed * limit / 60)
+        self._updated = now
+
+    async def reserve(self, tokens):
+        """Wait until one request of `tokens` tokens fits in both budgets, then take it."""
+        # A request larger than the whole minute's budget waits for a full bucket
+        tokens = min(tokens, self.limits["tokens"])
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+            elif self._levels["requests"] >= 1 and self._levels["tokens"] >= tokens:
+                self._levels["requests"] -= 1
+                self._levels["tokens"] -= tokens
+                self.wait_seconds += now - started
+                return
+            else:
+                delay = max(
+                    (1 - self._levels["requests"]) * 60 / self.limits["requests"],
+                    (tokens - self._levels["tokens"]) * 60 / self.limits["tokens"],
+                )
+            await asyncio.sleep(delay)
+
+    def observe(self, headers):
+        """Correct the budgets from the x-ratelimit-* headers of a response."""
+        if not headers:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        for kind in ("requests", "tokens"):
+            limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+            if limit and limit > 0:
+                self.limits[kind] = limit
+            remaining = _number(headers.get(f"x-ratelimit-remaining-{kind}"))
+            if remaining is None:
+                continue
+            # The server's count may not include requests still in flight, so never raise the level
+            self._levels[kind] = min(self._levels[kind], remaining)
+            if remaining <= 0:
+                reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+    def throttled(self, delay):
+        """Hold every request for `delay` seconds after a 429."""
+        self.throttled_count += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def describe(self):
+        return (
+            f"{self.limits['requests']:.0f} RPM / {self.limits['tokens']:.0f} TPM, "
+            f"throttled {self.throttled_count}x, waited {self.wait_seconds:.1f}s"
+        )
+
+
+class EmbeddingService(EmbeddingProvider):
+    """
+    Concurrent, budgeted embedding requests for one model.
+
+    `dimensions` asks a text-embedding-3 model for shorter vectors (e.g.
+    256, 512 or 768); other models only accept their native size. Tokens
+    are counted with the model's shared tokenizer unless one is given.
+    `client_factory()` builds the async client on the service's loop;
+    by default an AsyncOpenAI client with the SDK's own retries turned off.
+    """
+
+    def __init__(self, model, api_key=None, dimensions=None, tokenizer=None, max_concurrency=EMBEDDING_CONCURRENCY,
+                 budget=None, max_retries=MAX_RETRIES, max_inputs=MAX_INPUTS_PER_REQUEST,
+                 max_tokens=MAX_TOKENS_PER_REQUEST, client_factory=None):
+        self.model = model
+        self.api_key = api_key
+        # Raises ValueError for a size the model cannot return
+        reduced = request_dimensions(model, dimensions)
+        self.dimensions = reduced or native_dimensions(model)
+        self._options = {"dimensions": reduced} if reduced else {}
+        self.tokenizer = tokenizer
+        self.max_concurrency = max(1, max_concurrency)
+        self.budget = budget or RateBudget()
+        self.max_retries = max_retries
+        self.max_inputs = max_inputs
+        self.max_tokens = max_tokens
+        self.client_factory = client_factory or self._openai_client
+
+        self._client = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+        self.requests = 0
+        self.texts = 0
+        self.tokens = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _openai_client(self):
+        from openai import AsyncOpenAI  # imported on first use to keep startup fast
+
+        return AsyncOpenAI(api_key=self.api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+    def _get_tokenizer(self):
+        if self.tokenizer is None:
+            from registry import get_tokenizer
+
+            self.tokenizer = get_tokenizer(self.model)
+        return self.tokenizer
+
+    async def embed(self, texts):
+        """Vectors for the texts, in input order."""
+        texts = list(texts)
+        counts = count_tokens(texts, self._get_tokenizer())
+        parts = await asyncio.gather(*(
+            self._request(texts[start:end], sum(counts[start:end]))
+            for start, end in pack_requests(counts, self.max_inputs, self.max_tokens)
+        ))
+        return [vector for part in parts for vector in part]
+
+    async def _request(self, texts, tokens):
+        from openai import APIConnectionError, APIStatusError
+
+        if self._client is None:
+            self._client = self.client_factory()
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.budget.reserve(tokens)
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    raw = await self._client.embeddings.with_raw_response.create(
+                        model=self.model, input=texts, **self._options
+                    )
+                except (APIConnectionError, APIStatusError) as e:
+                    status = getattr(e, "status_code", None)
+                    # Connection errors and timeouts have no status; 4xx other than 429 will not improve
+                    if attempt == self.max_retries or (status is not None and status != 429 and status < 500):
+                        raise
+                    headers = e.response.headers if getattr(e, "response", None) is not None else {}
+                    delay = backoff_delay(attempt, parse_retry_after(headers.get("retry-after")))
+                    if status == 429:
+                        self.budget.throttled(delay)
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+                    continue
+                finally:
+                    self.in_flight -= 1
+
+                self.budget.observe(raw.headers)
+                self.requests += 1
+                self.texts += len(texts)
+                self.tokens += tokens
+                return [item.embedding for item in raw.parse().data]
+
+    def _event_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="embedding-service", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def submit(self, texts):
+        """Start embedding on the service's loop thread; returns a concurrent.futures.Future of the vectors."""
+        return asyncio.run_coroutine_threadsafe(self.embed(texts), self._event_loop())
+
+    def __call__(self, texts):
+        """Blocking embed for synchronous callers, e.g. as EmbeddingDedup's embed_fn."""
+        return self.submit(texts).result()
+
+    def reset_counts(self):
+        """Start a new reporting period."""
+        self.requests = self.texts = self.tokens = self.retries = self.peak_in_flight = 0
+
+    def describe(self):
+        per_request = self.texts / self.requests if self.requests else 0.0
+        return (
+            f"embedding requests: {self.requests} for {self.texts} texts ({per_request:.0f} per request, "
+            f"{self.tokens} tokens), up to {self.peak_in_flight} in flight, {self.retries} retried; "
+            f"budget {self.budget.describe()}"
+        )
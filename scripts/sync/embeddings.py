@@ -0,0 +1,87 @@
+"""
+OpenAI embedding requests shared by every uploader.
+
+Requests go through the process-wide OpenAI token bucket so the pipeline
+adapts to 429s and x-ratelimit-* headers instead of sleeping between calls.
+
+Every uploader stores vectors of one model and size in
+meeting_chunks.embedding: `embedding_settings()` reads them from
+EMBEDDING_MODEL and EMBEDDING_DIMENSIONS.
+"""
+import os
+from rate_limiter import get_limiter, parse_retry_after
+
+MAX_THROTTLE_RETRIES = 5
+
+# Output size of each model when no `dimensions` is requested
+MODEL_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+def native_dimensions(model):
+    """Vector size a model returns by default (0 if unknown)."""
+    return MODEL_DIMENSIONS.get(model, 0)
+
+
+def embedding_settings():
+    """
+    (model, dimensions) of the vectors stored in meeting_chunks.embedding
+
+    EMBEDDING_MODEL defaults to text-embedding-ada-002, the model of the
+    vectors the sync uploaders have always stored, and EMBEDDING_DIMENSIONS
+    to the model's native size. The column must have
+    that size; sql/reduced_dimension_embeddings.sql changes it for shorter
+    text-embedding-3 vectors. Read when called, so .env files loaded after
+    import still apply.
+    """
+    model = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    dimensions = int(os.getenv("EMBEDDING_DIMENSIONS") or native_dimensions(model))
+    if not dimensions:
+        raise ValueError(f"Set EMBEDDING_DIMENSIONS for {model}, whose vector size is unknown")
+    request_dimensions(model, dimensions)  # rejects sizes the model cannot return
+    return model, dimensions
+
+
+def request_dimensions(model, dimensions):
+    """
+    The `dimensions` argument to send for a vector size, or None for the model's native size
+
+    Only the text-embedding-3 models can shorten their vectors; asking
+    another known model for a size it does not return is a configuration
+    error. The size of unknown models is taken as given.
+    """
+    native = native_dimensions(model)
+    if not dimensions or dimensions == native:
+        return None
+    if not model.startswith("text-embedding-3"):
+        if not native:
+            return None
+        raise ValueError(f"{model} only returns {native}-dimension vectors, not {dimensions}")
+    if dimensions < 1 or (native and dimensions > native):
+        raise ValueError(f"{model} returns at most {native} dimensions, not {dimensions}")
+    return dimensions
+
+
+def create_embeddings(client, texts, model, **kwargs):
+    """Embed a string or a list of strings; returns the vectors in input order."""
+    from openai import RateLimitError  # imported on first use to keep startup fast
+
+    limiter = get_limiter("openai")
+    # The limiter owns 429 handling, so skip the SDK's own retry sleeps
+    client = client.with_options(max_retries=0)
+
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        limiter.acquire()
+        try:
+            raw = client.embeddings.with_raw_response.create(model=model, input=texts, **kwargs)
+        except RateLimitError as e:
+            limiter.on_throttled(parse_retry_after(e.response.headers.get("retry-after")))
+            if attempt == MAX_THROTTLE_RETRIES:
+                raise
+            continue
+
+        limiter.observe(raw.status_code, raw.headers)
+        return [item.embedding for item in raw.parse().data]
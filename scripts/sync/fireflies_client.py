@@ -2,8 +2,11 @@
 Fireflies API client for fetching meeting transcripts.
 """
 import os
-import requests
 from dotenv import load_dotenv
+from fireflies_transport import get_transport
+from sync_state import to_graphql_datetime
+from fireflies_queries import selection_set, transcript_query
+from transcript_listing import TranscriptLister, LISTING_PAGE_SIZE
 
 load_dotenv()
 
@@ -11,73 +14,45 @@ load_dotenv()
 class FirefliesClient:
     def __init__(self, api_key=None):
         self.api_key = api_key or os.getenv("FIREFLIES_API_KEY")
-        self.base_url = "https://api.fireflies.ai/graphql"
-        self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        self.transport = get_transport(self.api_key)
+        self.last_listing_complete = True  # False if the last paginated listing stopped on an error
     
-    def fetch_transcripts(self, limit=25, skip=0):
-        """Fetch list of transcript metadata with pagination support."""
-        query = """
-        query GetTranscripts($limit: Int, $skip: Int) {
-            transcripts(limit: $limit, skip: $skip) {
-                id title date
-            }
-        }
+    def fetch_transcripts(self, limit=25, skip=0, from_date=None):
+        """Fetch list of transcript metadata with pagination support.
+        
+        from_date: optional millisecond timestamp; only transcripts dated at or after it are listed.
+        """
+        query = f"""
+        query GetTranscripts($limit: Int, $skip: Int, $fromDate: DateTime) {{
+            transcripts(limit: $limit, skip: $skip, fromDate: $fromDate) {{{selection_set("listing")}}}
+        }}
         """
-        res = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json={"query": query, "variables": {"limit": limit, "skip": skip}},
-            timeout=30
-        )
+        variables = {
+            "limit": limit,
+            "skip": skip,
+            "fromDate": to_graphql_datetime(from_date) if from_date is not None else None
+        }
+        res = self.transport.post(query, variables, timeout=30)
         res.raise_for_status()
         return res.json()["data"]["transcripts"]
     
-    def fetch_all_transcripts_paginated(self, batch_size=50):
-        """Fetch ALL transcripts using pagination."""
-        all_transcripts = []
-        skip = 0
+    def fetch_all_transcripts_paginated(self, batch_size=LISTING_PAGE_SIZE, from_date=None):
+        """Fetch ALL transcripts (or all since from_date), listing date windows in parallel."""
+        print("   Listing transcripts in parallel date windows...")
         
-        print("   Using pagination to fetch all transcripts...")
+        lister = TranscriptLister(self.transport, page_size=batch_size)
+        all_transcripts = lister.list_all(from_date=from_date)
+        self.last_listing_complete = lister.complete
         
-        while True:
-            print(f"   Fetching batch: skip={skip}, limit={batch_size}...", end="")
-            try:
-                batch = self.fetch_transcripts(limit=batch_size, skip=skip)
-                
-                if not batch:
-                    print(" (empty batch, done)")
-                    break
-                
-                print(f" ✓ Got {len(batch)} transcripts")
-                all_transcripts.extend(batch)
-                skip += batch_size
-                
-                # Show progress
-                if skip % 200 == 0 and skip > 0:
-                    print(f"   📊 Progress: {len(all_transcripts)} transcripts fetched so far...")
-                    
-            except Exception as e:
-                print(f"\n   ❌ Error at skip={skip}: {str(e)}")
-                break
+        for (window_start, window_end), e in lister.errors:
+            print(f"   ❌ Error listing {to_graphql_datetime(window_start)} - {to_graphql_datetime(window_end)}: {str(e)}")
+        print(f"   ✓ Got {len(all_transcripts)} transcripts, {lister.describe()}")
         
         return all_transcripts
     
-    def fetch_transcript_detail(self, transcript_id):
-        """Fetch full transcript content and metadata."""
-        query = """
-        query GetTranscriptContent($id: String!) {
-            transcript(id: $id) {
-                title id transcript_url duration date participants
-                sentences { text speaker_id }
-            }
-        }
-        """
-        res = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json={"query": query, "variables": {"id": transcript_id}},
-            timeout=30
-        )
+    def fetch_transcript_detail(self, transcript_id, profile="sentences_only"):
+        """Fetch transcript content and metadata with the fields of a query profile (see fireflies_queries)."""
+        res = self.transport.post(transcript_query(profile), {"id": transcript_id}, timeout=30)
         res.raise_for_status()
         
         # Validate response structure
@@ -0,0 +1,95 @@
+"""
+Named field-projection profiles for Fireflies transcript queries.
+
+Each profile lists exactly the fields a job uses, and the GraphQL selection
+set is generated from it, so a job only downloads and parses what it needs:
+
+    listing         IDs, titles and dates (diffing against Supabase)
+    summary_only    the Fireflies summary block (summary refresh)
+    sentences_only  sentences with timings plus what markdown needs (re-chunking)
+    full            everything the sync pipeline stores
+
+`sentences` is always the last field so streamed responses deliver the
+metadata first (see transcript_stream).
+"""
+
+SENTENCE_FIELDS = ("text", "speaker_id", "start_time", "end_time")
+SUMMARY_FIELDS = ("keywords", "action_items", "outline", "shorthand_bullet", "overview", "notes")
+
+PROFILES = {
+    "listing": ("id", "title", "date", "duration"),
+    "summary_only": ("id", "title", "date", ("summary", SUMMARY_FIELDS)),
+    "sentences_only": (
+        "title", "id", "transcript_url", "duration", "date", "participants",
+        ("sentences", SENTENCE_FIELDS),
+    ),
+    "full": (
+        "title", "id", "transcript_url", "duration", "date", "participants",
+        ("summary", SUMMARY_FIELDS),
+        ("sentences", SENTENCE_FIELDS),
+    ),
+}
+
+
+def _fields(profile):
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown query profile {profile!r}; expected one of {', '.join(PROFILES)}") from None
+
+
+def _render(fields, indent):
+    pad = " " * indent
+    lines = []
+    for field in fields:
+        if isinstance(field, tuple):
+            name, children = field
+            lines.append(f"{pad}{name} {{")
+            lines.append(_render(children, indent + 4))
+            lines.append(f"{pad}}}")
+        else:
+            lines.append(f"{pad}{field}")
+    return "\n".join(lines)
+
+
+def selection_set(profile, indent=16):
+    """The generated GraphQL selection set (without outer braces) for a profile."""
+    return "\n" + _render(_fields(profile), indent) + "\n" + " " * (indent - 4)
+
+
+def transcript_query(profile="full"):
+    """Single-transcript query taking `$id`."""
+    return f"""
+        query GetTranscript($id: String!) {{
+            transcript(id: $id) {{{selection_set(profile)}}}
+        }}
+        """
+
+
+def bulk_transcript_query(profile, count):
+    """Aliased query `t0: transcript(id: $id0) {...} t1: ...` for `count` transcripts."""
+    variable_defs = ", ".join(f"$id{i}: String!" for i in range(count))
+    fields = selection_set(profile)
+    selections = "\n".join(f"            t{i}: transcript(id: $id{i}) {{{fields}}}" for i in range(count))
+    return f"query GetTranscriptsBulk({variable_defs}) {{\n{selections}\n        }}"
+
+
+def project(transcript, profile):
+    """Trim a transcript dict fetched with a wider profile down to `profile`'s fields."""
+
+    def trim(value, fields):
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return [trim(item, fields) for item in value]
+        trimmed = {}
+        for field in fields:
+            if isinstance(field, tuple):
+                name, children = field
+                if name in value:
+                    trimmed[name] = trim(value[name], children)
+            elif field in value:
+                trimmed[field] = value[field]
+        return trimmed
+
+    return trim(transcript, _fields(profile))
@@ -0,0 +1,120 @@
+"""
+Shared pooled HTTP transport for the Fireflies GraphQL API.
+
+Every Fireflies caller (sync pipelines, webhook pipeline, downloaders) posts
+through one keep-alive requests.Session per API key, so a large sync reuses
+its TLS connections instead of handshaking for every page and transcript.
+"""
+import os
+import threading
+from dotenv import load_dotenv
+from rate_limiter import get_limiter
+
+load_dotenv()
+
+FIREFLIES_API_URL = "https://api.fireflies.ai/graphql"
+DEFAULT_TIMEOUT = (10, 60)  # (connect, read) seconds
+MAX_THROTTLE_RETRIES = 5  # 429 responses retried after the bucket's pause
+POOL_SIZE = int(os.getenv("FIREFLIES_POOL_SIZE", "10"))
+
+# urllib3 decodes brotli transparently when the brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class FirefliesGraphQLError(RuntimeError):
+    """Raised when the Fireflies API answers with a GraphQL `errors` list."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class FirefliesTransport:
+    """Keep-alive session with connection pooling, compression and timeouts."""
+
+    def __init__(self, api_key=None, base_url=FIREFLIES_API_URL, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+        self.api_key = api_key or os.getenv("FIREFLIES_API_KEY")
+        self.base_url = base_url
+        self.timeout = timeout
+
+        # requests is imported here rather than at module level to keep CLI startup fast
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        })
+
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.limiter = get_limiter("fireflies")
+
+    def post(self, query, variables=None, timeout=None, **kwargs):
+        """POST a GraphQL document through the Fireflies rate limiter and return the raw response."""
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            self.limiter.acquire()
+            with self._lock:
+                self.request_count += 1
+
+            response = self.session.post(
+                self.base_url,
+                json={"query": query, "variables": variables or {}},
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+            self.limiter.observe(response.status_code, response.headers)
+
+            if response.status_code != 429 or attempt == MAX_THROTTLE_RETRIES:
+                return response
+            response.close()
+
+    def execute(self, query, variables=None, timeout=None):
+        """POST a GraphQL document and return its `data`, raising on HTTP or GraphQL errors."""
+        response = self.post(query, variables, timeout=timeout)
+        response.raise_for_status()
+
+        result = response.json()
+        if "errors" in result:
+            raise FirefliesGraphQLError(result["errors"])
+        return result["data"]
+
+    def connection_stats(self):
+        """Requests sent vs. TCP connections opened, i.e. how often keep-alive paid off."""
+        pools = self._adapter.poolmanager.pools
+        opened = sum(pools[key].num_connections for key in pools.keys())
+        return {
+            "requests": self.request_count,
+            "connections_opened": opened,
+            "connections_reused": max(self.request_count - opened, 0),
+        }
+
+    def describe_stats(self):
+        stats = self.connection_stats()
+        return (
+            f"{stats['requests']} Fireflies requests over {stats['connections_opened']} connections "
+            f"({stats['connections_reused']} reused); {self.limiter.describe()}"
+        )
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(api_key=None):
+    """Return the process-wide transport for an API key, creating it on first use."""
+    api_key = api_key or os.getenv("FIREFLIES_API_KEY")
+    with _transports_lock:
+        transport = _transports.get(api_key)
+        if transport is None:
+            transport = _transports[api_key] = FirefliesTransport(api_key=api_key)
+        return transport
@@ -3,16 +3,15 @@ import os
 import json
 import time
 import uuid
-import tiktoken
-import requests
 import re
 from datetime import datetime, timezone
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
-from openai import OpenAI
-from supabase import create_client
 import uvicorn
+from fireflies_transport import get_transport
+from registry import get_embedding_provider, get_supabase, get_tokenizer
+from text_windows import chunk_text
 
 # === Load env from .env ===
 load_dotenv()
@@ -23,9 +22,7 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 print("DEBUG: SUPABASE_URL=", SUPABASE_URL)
 print("DEBUG: SUPABASE_SERVICE_ROLE_KEY=", SUPABASE_SERVICE_ROLE_KEY)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-tokenizer = tiktoken.encoding_for_model("text-embedding-3-small")
+EMBED_MODEL = "text-embedding-3-small"
 
 TRANSCRIPT_DIR = Path("transcripts")
 TRANSCRIPT_DIR.mkdir(exist_ok=True)
@@ -42,11 +39,7 @@ def fetch_transcripts(limit=25):
         }
     }
     """
-    res = requests.post(
-        "https://api.fireflies.ai/graphql",
-        headers={"Authorization": f"Bearer {FF_API_KEY}"},
-        json={"query": query, "variables": {"limit": limit}},
-    )
+    res = get_transport(FF_API_KEY).post(query, {"limit": limit})
     res.raise_for_status()
     return res.json()["data"]["transcripts"]
 
@@ -59,11 +52,7 @@ def fetch_transcript_detail(tid):
         }
     }
     """
-    res = requests.post(
-        "https://api.fireflies.ai/graphql",
-        headers={"Authorization": f"Bearer {FF_API_KEY}"},
-        json={"query": query, "variables": {"id": tid}},
-    )
+    res = get_transport(FF_API_KEY).post(query, {"id": tid})
     res.raise_for_status()
     return res.json()["data"]["transcript"]
 
@@ -100,33 +89,17 @@ def to_markdown(transcript):
 # === Supabase Integration ===
 def upload_to_storage(filepath):
     with open(filepath, "rb") as f:
-        supabase.storage.from_(BUCKET).upload(filepath.name, f, {"cacheControl": "3600", "upsert": "true"})
+        get_supabase(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY).storage.from_(BUCKET).upload(filepath.name, f, {"cacheControl": "3600", "upsert": "true"})
     return f"{SUPABASE_URL}/storage/v1/object/public/{BUCKET}/{filepath.name}"
 
 def transcript_already_ingested(transcript_id):
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     result = supabase.table("document_metadata").select("id").eq("id", transcript_id).execute()
     return bool(result.data)
 
-def chunk_text(text):
-    tokens = tokenizer.encode(text)
-    chunks = []
-    start = 0
-    while start < len(tokens):
-        end = min(start + 800, len(tokens))
-        chunk = tokenizer.decode(tokens[start:end])
-        chunks.append((start, end, chunk))
-        start += 600
-    return chunks
-
-def embed_chunk(text):
-    for _ in range(3):
-        try:
-            res = client.embeddings.create(model="text-embedding-3-small", input=text)
-            return res.data[0].embedding
-        except Exception as e:
-            print("Retrying embedding:", e)
-            time.sleep(1)
-    raise RuntimeError("Embedding failed")
+def embed_chunks(texts):
+    # With OpenAI, packed into full requests sent concurrently; throttling and retries are handled there
+    return get_embedding_provider(EMBED_MODEL, OPENAI_API_KEY)(texts)
 
 def process_transcript(tid):
     if transcript_already_ingested(tid):
@@ -145,17 +118,19 @@ def process_transcript(tid):
         "url": url,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     supabase.table("document_metadata").insert(metadata_insert).execute()
     print(f"📝 Metadata inserted: {filename}")
 
-    chunks = chunk_text(md_text)
-    for i, (start, end, chunk) in enumerate(chunks):
-        embedding = embed_chunk(chunk)
+    chunks = chunk_text(md_text, get_tokenizer(EMBED_MODEL))
+    embeddings = embed_chunks([window[2] for window in chunks])
+    for i, ((start, end, chunk, char_start, char_end), embedding) in enumerate(zip(chunks, embeddings)):
         supabase.table("documents").insert({
             "title": full["title"],
             "content": chunk,
             "metadata": json.dumps({
                 "loc": {"from": start, "to": end},
+                "chars": {"from": char_start, "to": char_end},
                 "file": filename,
                 "chunk_index": i,
                 "metadata_id": full["id"]
@@ -0,0 +1,94 @@
+"""
+Single-pass, case-insensitive multi-phrase matching for chunk enrichment.
+
+All phrases are compiled into one regex whose alternation is laid out as a
+trie, so the regex engine walks each chunk once instead of running one
+substring scan per phrase, skipping ahead to characters that can start a
+phrase. Each search resumes one character after the previous hit, so
+overlapping phrases are all found. The longest phrase starting at a
+position wins the regex match. Every shorter phrase
+that matches there is a prefix of that one and is reported from a
+precomputed table, so the hits are exactly those of one `in` check per
+phrase, plus their positions.
+
+The pattern runs over `text.lower()`, which is several times faster than
+re.IGNORECASE. The case-insensitive pattern is only used for the rare text
+whose lowercase form has a different length (e.g. "İ"), where offsets into
+the lowered text would not line up with the original.
+"""
+import re
+
+
+def _trie_pattern(node):
+    """Regex for a trie node, preferring the longest continuation."""
+    terminal = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        # Greedy, so longer phrases are tried first and shorter ones are the fallback
+        return f"(?:{body})?"
+    return body
+
+
+def _overlapping(regex, text):
+    """Matches of `regex` at every position where one starts, including overlapping ones"""
+    search = regex.search
+    match = search(text)
+    while match:
+        yield match
+        match = search(text, match.start() + 1)
+
+
+class KeywordMatcher:
+    """
+    Finds the phrases of several categories in a text in one pass.
+
+    `categories` maps a category name to its phrases. A phrase may belong to
+    more than one category. Matching ignores case.
+    """
+
+    def __init__(self, categories):
+        self._categories = {}  # lowercased phrase -> category names
+        for category, phrases in categories.items():
+            for phrase in phrases:
+                if phrase:
+                    self._categories.setdefault(phrase.lower(), set()).add(category)
+        self.category_names = list(categories)
+
+        trie = {}
+        for phrase in self._categories:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        # Phrases that also match wherever a longer phrase matches
+        self._prefixes = {
+            phrase: [other for other in self._categories if phrase.startswith(other)]
+            for phrase in self._categories
+        }
+        pattern = _trie_pattern(trie)
+        self._regex = re.compile(pattern) if trie else None
+        self._regex_nocase = re.compile(pattern, re.IGNORECASE) if trie else None
+
+    def find(self, text):
+        """Return {category: [(phrase, start, end), ...]} with every hit in `text`, in text order."""
+        hits = {category: [] for category in self.category_names}
+        if self._regex is None:
+            return hits
+
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = _overlapping(self._regex, lowered)
+        else:
+            matches = _overlapping(self._regex_nocase, text)
+
+        for match in matches:
+            start = match.start()
+            longest = match.group().lower()
+            for phrase in self._prefixes.get(longest, ()):
+                for category in self._categories[phrase]:
+                    hits[category].append((phrase, start, start + len(phrase)))
+        return hits
@@ -8,17 +8,35 @@ import os
 import json
 import time
 import hashlib
+import io
+import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Tuple, Optional
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Tuple, Optional, Iterable, Iterator
 from pathlib import Path
 import re
-import tiktoken
-import numpy as np
 from dotenv import load_dotenv
-import requests
-from openai import OpenAI
-from supabase import create_client
 import logging
+from fireflies_transport import get_transport
+from registry import get_embedding_cache, get_embedding_provider, get_supabase, get_tokenizer
+from chunk_dedup import EmbeddingDedup
+from embeddings import embedding_settings
+from embedding_batcher import EmbeddingBatcher, MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST
+from chunk_records import ChunkBuffer, Group, format_group
+from keyword_matcher import KeywordMatcher
+from rate_limiter import execute_with_limit, get_limiter
+from transcript_listing import TranscriptLister, LISTING_CONCURRENCY, LISTING_PAGE_SIZE
+from transcript_cache import TranscriptCache, fields_fingerprint
+from transcript_fingerprint import SentenceHasher, compute_fingerprint, changed_components, stages_to_rerun
+from fireflies_queries import selection_set, transcript_query, bulk_transcript_query, project
+from transcript_stream import StreamedTranscript, parse_transcript_stream, stream_graphql_transcript
+from sync_state import load_watermark, save_watermark, advance_watermark, describe_watermark, to_graphql_datetime
+
+if TYPE_CHECKING:
+    from sentence_table import SentenceTable
 
 # Configure logging
 logging.basicConfig(
@@ -42,9 +60,10 @@ class Config:
     CHUNK_OVERLAP = 128  # Overlap between chunks
     MIN_CHUNK_SIZE = 100  # Minimum tokens for a chunk
     
-    # Embedding model
-    EMBEDDING_MODEL = "text-embedding-3-small"  # OpenAI's latest
-    EMBEDDING_DIMENSION = 1536  # For text-embedding-3-small
+    # Embedding model and vector size, shared with every uploader (EMBEDDING_MODEL, default
+    # text-embedding-ada-002, and EMBEDDING_DIMENSIONS, default native; 256/512/768 need
+    # sql/reduced_dimension_embeddings.sql)
+    EMBEDDING_MODEL, EMBEDDING_DIMENSION = embedding_settings()
     
     # Storage
     STORAGE_BUCKET = "meetings"
@@ -54,54 +73,87 @@ class Config:
     BATCH_SIZE = 10  # Process in batches
     MAX_RETRIES = 3
     RETRY_DELAY = 2
+    STREAM_TRANSCRIPTS = os.getenv("FIREFLIES_STREAM_TRANSCRIPTS", "").lower() in ("1", "true", "yes")
+    FETCH_CONCURRENCY = int(os.getenv("FIREFLIES_FETCH_CONCURRENCY", "4"))  # transcript requests in flight
+    LISTING_CONCURRENCY = LISTING_CONCURRENCY  # date windows listed in parallel
+    BULK_FETCH_SIZE = int(os.getenv("FIREFLIES_BULK_FETCH_SIZE", "5"))  # transcripts per aliased GraphQL query
+    TOKENIZER_BATCH_SIZE = 64  # semantic groups tokenized per encode_ordinary_batch call
+    TOKENIZER_THREADS = int(os.getenv("TOKENIZER_THREADS", "0")) or os.cpu_count() or 1
 
 
 class FirefliesClient:
     """Enhanced Fireflies API client"""
     
-    def __init__(self):
+    def __init__(self, offline: bool = False):
         self.api_key = Config.FIREFLIES_API_KEY
-        self.base_url = "https://api.fireflies.ai/graphql"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        self.transport = get_transport(self.api_key)
+        self._caches = {}
+        self._caches_lock = threading.Lock()
+        self.offline = offline  # serve transcripts and listings from the local cache only
+        self.last_listing_complete = True  # False if the last paginated listing stopped on an error
     
-    def fetch_transcript(self, transcript_id: str) -> Optional[Dict]:
-        """Fetch detailed transcript with all metadata"""
-        query = """
-        query GetTranscriptContent($id: String!) {
-            transcript(id: $id) {
-                title
-                id
-                transcript_url
-                duration
-                date
-                participants
-                sentences {
-                    text
-                    speaker_id
-                    start_time
-                    end_time
-                }
-                summary {
-                    keywords
-                    action_items
-                    outline
-                    shorthand_bullet
-                    overview
-                    notes
-                }
-            }
-        }
+    @property
+    def cache(self) -> TranscriptCache:
+        """Cache of full-profile transcripts"""
+        return self._cache("full")
+    
+    def _cache(self, profile: str) -> TranscriptCache:
+        with self._caches_lock:
+            if profile not in self._caches:
+                self._caches[profile] = TranscriptCache(fields_fingerprint(selection_set(profile)))
+            return self._caches[profile]
+    
+    def _cached(self, transcript_id: str, profile: str) -> Optional[Dict]:
+        """Cached transcript for a profile; a cached full transcript serves any narrower profile"""
+        transcript = self._cache(profile).get(transcript_id)
+        if transcript is None and profile != "full":
+            full = self._cache("full").get(transcript_id)
+            if full is not None:
+                transcript = project(full, profile)
+        return transcript
+    
+    def fetch_transcript(self, transcript_id: str, profile: str = "full") -> Optional[Dict]:
+        """Fetch a transcript with the fields of a query profile, from the local cache when possible"""
+        transcript = self._cached(transcript_id, profile)
+        if transcript is not None:
+            return transcript
+        if self.offline:
+            logger.error(f"Transcript {transcript_id} is not cached (offline mode)")
+            return None
+        
+        transcript = self._request_transcript(transcript_id, profile)
+        if transcript:
+            self._cache(profile).put(transcript)
+        return transcript
+    
+    def stream_transcript(self, transcript_id: str, profile: str = "full") -> Optional[StreamedTranscript]:
         """
+        Fetch a transcript whose sentences are parsed incrementally
         
+        Reads from the local cache when possible. Streamed API responses are
+        not written to the cache, since the full sentence list is never held.
+        """
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={"query": query, "variables": {"id": transcript_id}}
-            )
+            cached = self._cache(profile).open_stream(transcript_id)
+            if cached is None and profile != "full":
+                cached = self._cache("full").open_stream(transcript_id)
+            if cached is not None:
+                _, transcript = parse_transcript_stream(cached, source=cached)
+                return transcript
+            if self.offline:
+                logger.error(f"Transcript {transcript_id} is not cached (offline mode)")
+                return None
+            
+            return stream_graphql_transcript(self.transport, transcript_query(profile), {"id": transcript_id})
+            
+        except Exception as e:
+            logger.error(f"Error streaming transcript {transcript_id}: {e}")
+            return None
+    
+    def _request_transcript(self, transcript_id: str, profile: str = "full") -> Optional[Dict]:
+        """Fetch one transcript from the Fireflies API"""
+        try:
+            response = self.transport.post(transcript_query(profile), {"id": transcript_id})
             response.raise_for_status()
             
             data = response.json()
@@ -115,11 +167,109 @@ class FirefliesClient:
             logger.error(f"Error fetching transcript {transcript_id}: {e}")
             return None
     
-    def fetch_all_transcripts_paginated(self, batch_size=50):
-        """Fetch all transcripts using pagination"""
+    def fetch_transcripts_bulk(self, transcript_ids: List[str], batch_size: int = Config.BULK_FETCH_SIZE,
+                               profile: str = "full", refresh: bool = False) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch several transcripts with one aliased GraphQL query per batch
+        
+        Each batch is sent as `t0: transcript(id: $id0) {...} t1: ...`, so a
+        backfill makes len(ids) / batch_size round-trips instead of len(ids).
+        Returns {transcript_id: transcript or None}; a GraphQL error on one
+        alias only fails that transcript. `refresh` skips cached copies (they
+        are still updated), for callers looking for upstream changes.
+        """
+        results = {}
+        missing = []
+        for transcript_id in transcript_ids:
+            results[transcript_id] = None if refresh and not self.offline else self._cached(transcript_id, profile)
+            if results[transcript_id] is None:
+                missing.append(transcript_id)
+        
+        if self.offline:
+            if missing:
+                logger.error(f"{len(missing)} transcripts are not cached (offline mode): {missing}")
+            return results
+        
+        batch_size = max(1, batch_size)
+        for start in range(0, len(missing), batch_size):
+            fetched = self._fetch_transcript_batch(missing[start:start + batch_size], profile)
+            for transcript in fetched.values():
+                if transcript:
+                    self._cache(profile).put(transcript)
+            results.update(fetched)
+        return results
+    
+    def _fetch_transcript_batch(self, transcript_ids: List[str], profile: str = "full") -> Dict[str, Optional[Dict]]:
+        """Fetch one aliased batch and split the response back into per-ID results"""
+        if len(transcript_ids) == 1:
+            return {transcript_ids[0]: self._request_transcript(transcript_ids[0], profile)}
+        
+        aliases = {f"t{i}": transcript_id for i, transcript_id in enumerate(transcript_ids)}
+        query = bulk_transcript_query(profile, len(transcript_ids))
+        variables = {f"id{i}": transcript_id for i, transcript_id in enumerate(transcript_ids)}
+        
+        try:
+            response = self.transport.post(query, variables)
+            response.raise_for_status()
+            payload = response.json()
+        except Exception as e:
+            logger.error(f"Error fetching transcript batch {transcript_ids}: {e}")
+            return {transcript_id: None for transcript_id in transcript_ids}
+        
+        data = payload.get("data") or {}
+        failed_aliases = set()
+        for error in payload.get("errors") or []:
+            path = error.get("path") or []
+            alias = path[0] if path else None
+            if alias in aliases:
+                failed_aliases.add(alias)
+                logger.error(f"Error fetching transcript {aliases[alias]}: {error.get('message', error)}")
+            else:
+                # Not tied to one alias (e.g. query validation): the whole batch failed
+                logger.error(f"GraphQL errors: {error}")
+                failed_aliases.update(aliases)
+        
+        return {
+            transcript_id: None if alias in failed_aliases else data.get(alias)
+            for alias, transcript_id in aliases.items()
+        }
+    
+    def _list_cached(self, from_date: Optional[int] = None) -> List[Dict]:
+        """Cached transcripts of every profile with sentences (full, sentences_only), newest first"""
+        listed = {}
+        for profile in ("sentences_only", "full"):
+            for transcript in self._cache(profile).list_transcripts(from_date):
+                listed[transcript['id']] = transcript
+        return sorted(listed.values(), key=lambda t: t.get('date') or 0, reverse=True)
+    
+    def fetch_all_transcripts_paginated(self, batch_size=LISTING_PAGE_SIZE, from_date: Optional[int] = None):
+        """
+        Fetch all transcripts, optionally only those dated at or after `from_date` (ms)
+        
+        The date range is listed in concurrent fromDate/toDate windows (see
+        transcript_listing) rather than by walking skip offsets one by one.
+        """
+        if self.offline:
+            # The cache only knows what was fetched before, so never treat it as a complete listing
+            self.last_listing_complete = False
+            transcripts = self._list_cached(from_date)
+            logger.info(f"Listed {len(transcripts)} cached transcripts (offline mode)")
+            return transcripts
+        
+        lister = TranscriptLister(self.transport, page_size=batch_size, concurrency=Config.LISTING_CONCURRENCY)
+        all_transcripts = lister.list_all(from_date=from_date)
+        self.last_listing_complete = lister.complete
+        
+        for window, error in lister.errors:
+            logger.error(f"Error listing transcripts between {to_graphql_datetime(window[0])} and {to_graphql_datetime(window[1])}: {error}")
+        logger.info(f"Fetched {len(all_transcripts)} transcripts ({lister.describe()})")
+        return all_transcripts
+    
+    def fetch_recent_transcripts(self, limit: int = 1) -> List[Dict]:
+        """Fetch the newest `limit` transcripts with a single listing request"""
         query = """
-        query GetTranscripts($limit: Int, $skip: Int) {
-            transcripts(limit: $limit, skip: $skip) {
+        query GetRecentTranscripts($limit: Int) {
+            transcripts(limit: $limit) {
                 id
                 title
                 date
@@ -127,125 +277,185 @@ class FirefliesClient:
             }
         }
         """
-        
-        all_transcripts = []
-        skip = 0
-        
-        while True:
-            try:
-                response = requests.post(
-                    self.base_url,
-                    headers=self.headers,
-                    json={
-                        "query": query,
-                        "variables": {"limit": batch_size, "skip": skip}
-                    }
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                if "errors" in data:
-                    logger.error(f"GraphQL errors: {data['errors']}")
-                    break
-                
-                transcripts = data["data"]["transcripts"]
-                if not transcripts:
-                    break
-                
-                all_transcripts.extend(transcripts)
-                skip += batch_size
-                
-                logger.info(f"Fetched {len(all_transcripts)} transcripts so far...")
-                time.sleep(0.5)  # Rate limiting
-                
-            except Exception as e:
-                logger.error(f"Error fetching transcript batch at skip={skip}: {e}")
-                break
-        
-        return all_transcripts
+        try:
+            return self.transport.execute(query, {"limit": limit})["transcripts"] or []
+        except Exception as e:
+            logger.error(f"Error fetching recent transcripts: {e}")
+            return []
 
 
 class ChunkingStrategy:
     """Advanced chunking strategy for optimal RAG performance"""
     
+    ACTION_PHRASES = ["action", "todo", "will do", "next step", "follow up"]
+    DECISION_PHRASES = ["decided", "agree", "confirm", "approved", "rejected"]
+    
     def __init__(self):
-        self.tokenizer = tiktoken.encoding_for_model("gpt-4")
+        # Count tokens with the embedding model's encoding (cl100k_base, shared with every uploader)
+        self.tokenizer = get_tokenizer(Config.EMBEDDING_MODEL)
     
     def create_chunks(
         self, 
         transcript: Dict,
         chunk_size: int = Config.CHUNK_SIZE,
-        overlap: int = Config.CHUNK_OVERLAP
+        overlap: int = Config.CHUNK_OVERLAP,
+        sentences: Optional[Iterable[Dict]] = None
     ) -> List[Dict]:
         """
         Create overlapping chunks with rich metadata
         
+        `sentences` overrides transcript["sentences"]; it may be a one-shot
+        iterator, e.g. from a streamed transcript, or a SentenceTable.
+        
         Returns chunks with:
         - Text content
         - Speaker information
         - Temporal context
         - Semantic boundaries
         """
-        chunks = []
-        sentences = transcript.get("sentences", [])
+        return list(self.iter_chunks(transcript, chunk_size, overlap, sentences))
+    
+    @staticmethod
+    def sentence_table(transcript: Dict) -> "SentenceTable":
+        """Columnar sentences of a transcript; build once and pass to iter_chunks and the meeting stats"""
+        from sentence_table import SentenceTable
+        
+        return SentenceTable(transcript.get("sentences") or [])
+    
+    def iter_chunks(
+        self,
+        transcript: Dict,
+        chunk_size: int = Config.CHUNK_SIZE,
+        overlap: int = Config.CHUNK_OVERLAP,
+        sentences: Optional[Iterable[Dict]] = None
+    ) -> Iterator[Dict]:
+        """
+        Yield enriched chunks as soon as they close, instead of building the whole list
+        
+        Sentence lists (and SentenceTables) are grouped and packed
+        vectorized; streamed sentences are grouped one at a time.
+        
+        Chunks are yielded one behind the chunker, so a chunk's first/last
+        enrichment is already final when it is yielded. `position` needs
+        the total chunk count: it is patched into the metadata of every
+        chunk yielded so far just before the last chunk is yielded, so a
+        consumer holding the chunks sees final positions once it receives
+        the last one.
+        """
+        from sentence_table import SentenceTable
+        
+        if sentences is None:
+            sentences = transcript.get("sentences", [])
+        if isinstance(sentences, list):
+            sentences = SentenceTable(sentences)
         
         if not sentences:
-            return chunks
+            return
+        
+        keywords = (transcript.get("summary") or {}).get("keywords") or []
+        # One matcher per transcript finds action, decision and keyword hits in a single pass per chunk
+        matcher = KeywordMatcher({
+            "action": self.ACTION_PHRASES,
+            "decision": self.DECISION_PHRASES,
+            "keyword": keywords,
+        })
+        yielded_metadata = []
+        previous = None
+        
+        if isinstance(sentences, SentenceTable):
+            chunks = self._cut_table_chunks(sentences, chunk_size, overlap)
+        else:
+            chunks = self._cut_chunks(sentences, chunk_size, overlap)
+        
+        for chunk in chunks:
+            if previous is not None:
+                yield self._enrich_chunk(previous, keywords, matcher, is_last=False, yielded_metadata=yielded_metadata)
+            previous = chunk
+        
+        if previous is None:
+            return
+        last = self._enrich_chunk(previous, keywords, matcher, is_last=True, yielded_metadata=yielded_metadata)
+        total = len(yielded_metadata)
+        for i, metadata in enumerate(yielded_metadata):
+            metadata["position"] = f"{i+1}/{total}"
+        yield last
+    
+    def _cut_chunks(self, sentences: Iterable[Dict], chunk_size: int, overlap: int) -> Iterator[Dict]:
+        """Cut sentences into finalized chunks (without enrichment), yielding each as it closes"""
         
         # Group sentences by semantic boundaries (speaker changes, time gaps)
         semantic_groups = self._group_by_semantics(sentences)
         
-        # Create chunks from semantic groups
-        current_chunk = {
-            "text": "",
-            "sentences": [],
-            "speakers": set(),
-            "start_time": None,
-            "end_time": None,
-            "tokens": 0
-        }
+        # Create chunks from semantic groups. Each group is encoded exactly
+        # once (in batches, see _encode_groups) to size the chunks.
+        index = 0
+        current_chunk = ChunkBuffer()
         
-        for group in semantic_groups:
-            group_text = self._format_group(group)
-            group_tokens = len(self.tokenizer.encode(group_text))
+        for group, group_text, group_ids in self._encode_groups(semantic_groups):
+            group_tokens = len(group_ids)
             
             # Check if adding this group exceeds chunk size
-            if current_chunk["tokens"] + group_tokens > chunk_size and current_chunk["text"]:
+            if current_chunk.tokens + group_tokens > chunk_size and current_chunk.parts:
                 # Save current chunk
-                chunks.append(self._finalize_chunk(current_chunk, len(chunks)))
+                text = current_chunk.text()
+                yield self._finalize_chunk(index, text, current_chunk.speakers, current_chunk.start_time,
+                                           current_chunk.end_time, current_chunk.tokens)
+                index += 1
                 
                 # Start new chunk with overlap
-                overlap_text = self._get_overlap_text(current_chunk, overlap)
-                current_chunk = {
-                    "text": overlap_text,
-                    "sentences": [],
-                    "speakers": set(),
-                    "start_time": group[0].get("start_time", 0),
-                    "end_time": None,
-                    "tokens": len(self.tokenizer.encode(overlap_text))
-                }
+                overlap_text, overlap_tokens = self._get_overlap(text, reversed(current_chunk.group_starts), overlap)
+                current_chunk = ChunkBuffer.with_overlap(overlap_text, overlap_tokens, group.start_time)
             
             # Add group to current chunk
-            current_chunk["text"] += group_text + "\n"
-            current_chunk["sentences"].extend(group)
-            current_chunk["speakers"].update(s.get("speaker_id", 0) for s in group)
-            if current_chunk["start_time"] is None:
-                current_chunk["start_time"] = group[0].get("start_time", 0)
-            current_chunk["end_time"] = group[-1].get("end_time", 0)
-            current_chunk["tokens"] += group_tokens
+            current_chunk.add(group, group_text, group_tokens)
         
         # Don't forget the last chunk
-        if current_chunk["text"].strip():
-            chunks.append(self._finalize_chunk(current_chunk, len(chunks)))
+        text = current_chunk.text()
+        if text.strip():
+            yield self._finalize_chunk(index, text, current_chunk.speakers, current_chunk.start_time,
+                                       current_chunk.end_time, current_chunk.tokens)
+    
+    def _cut_table_chunks(self, table: "SentenceTable", chunk_size: int, overlap: int) -> Iterator[Dict]:
+        """
+        Cut a whole transcript into finalized chunks with vectorized grouping and packing
+        
+        Same chunks as _cut_chunks, but group boundaries come from the
+        sentence columns and each chunk's groups from one searchsorted
+        (see sentence_table), so Python loops per chunk rather than per
+        sentence or group.
+        """
+        from sentence_table import GroupPacker
         
-        # Add chunk metadata
-        return self._enrich_chunks(chunks, transcript)
+        first_sentences, end_sentences = table.group_bounds()
+        firsts, ends = first_sentences.tolist(), end_sentences.tolist()
+        speakers = [table.speakers[i] for i in firsts]
+        texts = list(map(format_group, speakers, table.group_texts(first_sentences, end_sentences)))
+        encoded = self.tokenizer.encode_ordinary_batch(texts, num_threads=Config.TOKENIZER_THREADS)
+        packer = GroupPacker(texts, encoded, "\n")
+        
+        head_text, head_tokens = "", 0
+        index = 0
+        first = 0
+        while first < packer.groups:
+            end = packer.next_end(first, head_tokens, chunk_size)
+            text = head_text + packer.text(first, end)
+            chunk = self._finalize_chunk(
+                index, text, set(speakers[first:end]), table.start_times[firsts[first]],
+                table.end_times[ends[end - 1] - 1], head_tokens + packer.tokens(first, end)
+            )
+            if end == packer.groups:
+                if text.strip():
+                    yield chunk
+                return
+            yield chunk
+            index += 1
+            
+            head_text, head_tokens = self._get_overlap(text, packer.tail_groups(first, end, len(head_text)), overlap)
+            first = end
     
-    def _group_by_semantics(self, sentences: List[Dict]) -> List[List[Dict]]:
-        """Group sentences by speaker and temporal proximity"""
-        groups = []
-        current_group = []
-        last_speaker = None
+    def _group_by_semantics(self, sentences: Iterable[Dict]) -> Iterator[Group]:
+        """Group sentences by speaker and temporal proximity, yielding each group as it closes"""
+        current_group = None
         last_time = 0
         
         for sentence in sentences:
@@ -253,108 +463,212 @@ class ChunkingStrategy:
             start_time = sentence.get("start_time", 0)
             
             # New group if speaker changes or large time gap (>5 seconds)
-            if (speaker != last_speaker or start_time - last_time > 5000) and current_group:
-                groups.append(current_group)
-                current_group = []
+            if current_group is not None and (speaker != current_group.speaker_id or start_time - last_time > 5000):
+                yield current_group
+                current_group = None
             
-            current_group.append(sentence)
-            last_speaker = speaker
+            if current_group is None:
+                current_group = Group(speaker, start_time, 0)
+            current_group.add(sentence.get("text"), sentence.get("end_time", 0))
             last_time = sentence.get("end_time", start_time)
         
-        if current_group:
-            groups.append(current_group)
+        if current_group is not None:
+            yield current_group
+    
+    def _encode_groups(self, groups: Iterable[Group]) -> Iterator[Tuple[Group, str, List[int]]]:
+        """
+        Yield (group, formatted text, token ids) for each group
         
-        return groups
+        Groups are tokenized Config.TOKENIZER_BATCH_SIZE at a time with
+        encode_ordinary_batch, which spreads them over tokenizer threads
+        while still consuming a streamed sentence iterator lazily.
+        """
+        groups = iter(groups)
+        while batch := list(islice(groups, Config.TOKENIZER_BATCH_SIZE)):
+            texts = [group.format() for group in batch]
+            encoded = self.tokenizer.encode_ordinary_batch(texts, num_threads=Config.TOKENIZER_THREADS)
+            yield from zip(batch, texts, encoded)
     
-    def _format_group(self, group: List[Dict]) -> str:
-        """Format a group of sentences with speaker labels"""
-        if not group:
-            return ""
+    def _get_overlap(self, text: str, tail_groups: Iterable[Tuple[int, int]], overlap_tokens: int) -> Tuple[str, int]:
+        """
+        Get overlap text and its token count from the end of a chunk
         
-        speaker_id = group[0].get("speaker_id", 0)
-        speaker_label = f"Speaker {speaker_id + 1}"
+        `tail_groups` gives the (character offset, token count) of the
+        chunk's groups, last group first. BPE merges across the group joins
+        (e.g. ".\n"), so the groups' own token ids do not give the token
+        boundaries of the joined text. A group starts a new pre-token ("["
+        after a newline), though, so encoding the text from there yields the
+        same trailing tokens as encoding the whole chunk. Only the last
+        groups covering the overlap are encoded, plus the overlap itself to
+        count it.
+        """
+        if not text or overlap_tokens <= 0:
+            return "", 0
         
-        texts = [s["text"] for s in group if s.get("text")]
-        return f"[{speaker_label}]: {' '.join(texts)}"
-    
-    def _get_overlap_text(self, chunk: Dict, overlap_tokens: int) -> str:
-        """Get overlap text from the end of a chunk"""
-        if not chunk["text"]:
-            return ""
+        covered = 0
+        for offset, group_tokens in tail_groups:
+            covered += group_tokens + 1  # the group and its separator, before merges
+            if covered <= overlap_tokens:
+                continue
+            tokens = self.tokenizer.encode_ordinary(text[offset:])
+            if len(tokens) > overlap_tokens:
+                overlap_text = self.tokenizer.decode(tokens[-overlap_tokens:])
+                return overlap_text, len(self.tokenizer.encode_ordinary(overlap_text))
         
-        tokens = self.tokenizer.encode(chunk["text"])
+        # The overlap reaches into the previous overlap at the start of the chunk
+        tokens = self.tokenizer.encode_ordinary(text)
         if len(tokens) <= overlap_tokens:
-            return chunk["text"]
+            return text, len(tokens)
         
-        overlap_tokens_list = tokens[-overlap_tokens:]
-        return self.tokenizer.decode(overlap_tokens_list)
+        overlap_text = self.tokenizer.decode(tokens[-overlap_tokens:])
+        return overlap_text, len(self.tokenizer.encode_ordinary(overlap_text))
     
-    def _finalize_chunk(self, chunk: Dict, index: int) -> Dict:
+    def _finalize_chunk(self, index: int, text: str, speakers: Iterable[int], start_time: Any, end_time: Any,
+                        tokens: int) -> Dict:
         """Finalize chunk with proper formatting"""
         return {
             "index": index,
-            "text": chunk["text"].strip(),
-            "speakers": list(chunk["speakers"]),
-            "start_time": chunk["start_time"],
-            "end_time": chunk["end_time"],
-            "token_count": chunk["tokens"]
+            "text": text.strip(),
+            "speakers": list(speakers),
+            "start_time": start_time,
+            "end_time": end_time,
+            "token_count": tokens
         }
     
-    def _enrich_chunks(self, chunks: List[Dict], transcript: Dict) -> List[Dict]:
-        """Add rich metadata to chunks for better retrieval"""
+    def _enrich_chunk(self, chunk: Dict, keywords: List[str], matcher: KeywordMatcher, is_last: bool,
+                      yielded_metadata: List[Dict]) -> Dict:
+        """
+        Add rich metadata to a chunk for better retrieval
         
-        # Extract entities and topics (you could use NER here)
-        summary = transcript.get("summary", {})
-        keywords = summary.get("keywords", [])
-        action_items = summary.get("action_items", [])
-        
-        for i, chunk in enumerate(chunks):
-            # Determine if chunk contains action items
-            chunk_lower = chunk["text"].lower()
-            has_actions = any(
-                keyword in chunk_lower 
-                for keyword in ["action", "todo", "will do", "next step", "follow up"]
-            )
-            
-            # Check for decisions
-            has_decisions = any(
-                keyword in chunk_lower 
-                for keyword in ["decided", "agree", "confirm", "approved", "rejected"]
-            )
-            
-            # Calculate importance score (simple heuristic)
-            importance = 0.5
-            if has_actions:
-                importance += 0.2
-            if has_decisions:
-                importance += 0.2
-            if i == 0 or i == len(chunks) - 1:  # Beginning and end often important
-                importance += 0.1
-            
-            # Add metadata
-            chunk["metadata"] = {
-                "chunk_type": "transcript",
-                "position": f"{i+1}/{len(chunks)}",
-                "has_action_items": has_actions,
-                "has_decisions": has_decisions,
-                "importance_score": min(importance, 1.0),
-                "keywords": [kw for kw in keywords if kw.lower() in chunk_lower][:5] if keywords else [],
-                "chunk_overlap": {
-                    "previous": Config.CHUNK_OVERLAP if i > 0 else 0,
-                    "next": Config.CHUNK_OVERLAP if i < len(chunks) - 1 else 0
-                }
+        `position` is left as None; iter_chunks fills it in once the total
+        chunk count is known. The metadata is appended to `yielded_metadata`
+        for that.
+        """
+        i = chunk["index"]
+        hits = matcher.find(chunk["text"])
+        
+        # Determine if chunk contains action items / decisions, and where
+        has_actions = bool(hits["action"])
+        has_decisions = bool(hits["decision"])
+        matched_keywords = {phrase for phrase, _, _ in hits["keyword"]}
+        
+        # Calculate importance score (simple heuristic)
+        importance = 0.5
+        if has_actions:
+            importance += 0.2
+        if has_decisions:
+            importance += 0.2
+        if i == 0 or is_last:  # Beginning and end often important
+            importance += 0.1
+        
+        # Add metadata
+        chunk["metadata"] = {
+            "chunk_type": "transcript",
+            "position": None,
+            "has_action_items": has_actions,
+            "has_decisions": has_decisions,
+            # Character spans within the chunk text
+            "action_item_spans": [(start, end) for _, start, end in hits["action"]],
+            "decision_spans": [(start, end) for _, start, end in hits["decision"]],
+            "importance_score": min(importance, 1.0),
+            "keywords": [kw for kw in keywords if kw and kw.lower() in matched_keywords][:5] if keywords else [],
+            "chunk_overlap": {
+                "previous": Config.CHUNK_OVERLAP if i > 0 else 0,
+                "next": Config.CHUNK_OVERLAP if not is_last else 0
             }
+        }
+        yielded_metadata.append(chunk["metadata"])
+        return chunk
+
+
+class TranscriptMarkdownWriter:
+    """Writes transcript markdown to a text stream one sentence at a time"""
+    
+    def __init__(self, out, transcript: Dict):
+        self.out = out
+        participants = transcript.get("participants", [])
+        date = datetime.fromtimestamp(transcript["date"] / 1000)
+        
+        # Build markdown
+        out.write(f"# {transcript['title']}\n\n")
+        out.write(f"**Date:** {date.strftime('%Y-%m-%d %H:%M')}\n")
+        out.write(f"**Duration:** {transcript.get('duration', 0)} minutes\n")
+        out.write(f"**Participants:** {', '.join(participants)}\n\n")
+        
+        # Add summary if available
+        summary = transcript.get("summary") or {}
+        if summary.get("overview"):
+            out.write("## Summary\n\n")
+            out.write(f"{summary['overview']}\n\n")
+        
+        if summary.get("action_items"):
+            out.write("## Action Items\n\n")
+            for item in summary["action_items"]:
+                out.write(f"- {item}\n")
+            out.write("\n")
+        
+        if summary.get("keywords"):
+            out.write(f"**Keywords:** {', '.join(summary['keywords'])}\n\n")
+        
+        # Add transcript
+        out.write("## Transcript\n\n")
+        
+        # Create speaker map
+        self.speaker_map = {}
+        for i, email in enumerate(participants[1:] if len(participants) > 1 else []):
+            name = email.split('@')[0].capitalize()
+            self.speaker_map[i] = name
         
-        return chunks
+        self.current_speaker = None
+        self.paragraph = []
+    
+    def add(self, sentence: Dict):
+        speaker_id = sentence.get("speaker_id", 0)
+        speaker = self.speaker_map.get(speaker_id, f"Speaker {speaker_id + 1}")
+        text = sentence.get("text", "").strip()
+        
+        if not text:
+            return
+        
+        if speaker != self.current_speaker:
+            self._flush()
+            self.current_speaker = speaker
+        self.paragraph.append(text)
+    
+    def close(self):
+        """Write the last paragraph"""
+        self._flush()
+    
+    def _flush(self):
+        if self.paragraph and self.current_speaker:
+            self.out.write(f"**{self.current_speaker}:** {' '.join(self.paragraph)}\n\n")
+        self.paragraph = []
 
 
 class SupabaseUploader:
     """Handles all Supabase operations with optimizations"""
     
     def __init__(self):
-        self.supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
-        self.openai = OpenAI(api_key=Config.OPENAI_API_KEY)
+        self.supabase = get_supabase(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
         self.chunker = ChunkingStrategy()
+        # Texts that miss the dedup cache go to the configured backend; with OpenAI as full
+        # requests, several in flight under the rate budget
+        self.embedder = get_embedding_provider(
+            Config.EMBEDDING_MODEL, Config.OPENAI_API_KEY, Config.EMBEDDING_DIMENSION
+        )
+        self.dedup = EmbeddingDedup(
+            self.supabase, self.embedder.model, self.embedder,
+            cache=get_embedding_cache(), dimensions=self.embedder.dimensions
+        )
+        self.dedup.check_column()
+        # Chunks of consecutive transcripts share requests inside batched_embeddings(); each batch
+        # holds enough for every concurrent request slot
+        self.batcher = EmbeddingBatcher(
+            lambda texts: list(zip(*self._generate_embeddings(texts))),
+            max_inputs=MAX_INPUTS_PER_REQUEST * self.embedder.max_concurrency,
+            max_tokens=MAX_TOKENS_PER_REQUEST * self.embedder.max_concurrency,
+        )
+        self._defer_flush = False
     
     def process_transcript(self, transcript: Dict) -> bool:
         """
@@ -364,52 +678,119 @@ class SupabaseUploader:
         1. Check if already processed
         2. Store meeting record
         3. Upload transcript to storage
-        4. Create and embed chunks
-        5. Generate summaries
+        4. Generate summaries
+        5. Create and embed chunks
+        6. Mark the meeting processed, once its chunks are stored (inside
+           batched_embeddings() that may be after this returns)
         """
         
         transcript_id = transcript["id"]
         
         try:
-            # Check if already processed using raw_metadata
-            existing = self.supabase.table("meetings").select("id, raw_metadata").execute()
-            
-            for meeting in existing.data:
-                metadata = meeting.get('raw_metadata', {})
-                if isinstance(metadata, str):
-                    import json
-                    try:
-                        metadata = json.loads(metadata)
-                    except:
-                        continue
-                
-                if metadata.get('fireflies_id') == transcript_id:
-                    logger.info(f"Transcript {transcript_id} already processed")
-                    return False
+            if self._is_processed(transcript_id):
+                logger.info(f"Transcript {transcript_id} already processed")
+                return False
             
             # 1. Create meeting record
-            meeting_id = self._store_meeting(transcript)
+            table = self.chunker.sentence_table(transcript)
+            meeting_id = self._store_meeting(transcript, table)
             if not meeting_id:
                 return False
             
             # 2. Upload transcript to storage
             storage_path = self._upload_to_storage(transcript, meeting_id)
             
-            # 3. Create chunks
-            chunks = self.chunker.create_chunks(transcript)
-            logger.info(f"Created {len(chunks)} chunks for transcript {transcript_id}")
+            # 3. Generate and store summaries
+            self._generate_summaries(meeting_id, transcript, [])
             
-            # 4. Generate embeddings and store chunks
-            self._store_chunks(meeting_id, chunks)
+            # 4-6. Create chunks and queue them for embedding; they are stored once embedded,
+            # and then the meeting record is updated
+            def finish(count):
+                logger.info(f"Stored {count} chunks for transcript {transcript_id}")
+                self.supabase.table("meetings").update({
+                    "processed_at": datetime.now(timezone.utc).isoformat(),
+                    "storage_bucket_path": storage_path
+                }).eq("id", meeting_id).execute()
             
-            # 5. Generate and store summaries
-            self._generate_summaries(meeting_id, transcript, chunks)
+            self._store_chunks(meeting_id, self.chunker.iter_chunks(transcript, sentences=table), on_stored=finish)
             
-            # 6. Update meeting record
-            self.supabase.table("meetings").update({
+            logger.info(f"Successfully processed transcript {transcript_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing transcript {transcript_id}: {e}")
+            return False
+    
+    def process_transcript_stream(self, streamed: StreamedTranscript) -> bool:
+        """
+        Same pipeline as process_transcript, but for a streamed transcript
+        
+        Sentences are consumed once: each one is written to the local
+        markdown file, counted for the meeting stats and fed to the chunker,
+        so the full sentence list is never held in memory. Word and speaker
+        counts are filled in on the final meeting update, which waits for the
+        chunks to be stored as well.
+        """
+        
+        transcript = streamed.metadata
+        transcript_id = transcript["id"]
+        
+        try:
+            if self._is_processed(transcript_id):
+                logger.info(f"Transcript {transcript_id} already processed")
+                return False
+            
+            meeting_id = self._store_meeting(transcript)
+            if not meeting_id:
+                return False
+            
+            local_path = self._local_markdown_path(transcript, meeting_id)
+            stats = {"words": 0, "speakers": set()}
+            hasher = SentenceHasher()
+            
+            # The meeting is marked processed once its chunks are stored and the rest is done, in either order
+            pending = {"chunks", "meeting"}
+            update = {}
+            
+            def finish(part):
+                pending.discard(part)
+                if not pending:
+                    self.supabase.table("meetings").update(update).eq("id", meeting_id).execute()
+            
+            def stored(count):
+                logger.info(f"Stored {count} chunks for transcript {transcript_id}")
+                finish("chunks")
+            
+            with local_path.open("w", encoding="utf-8") as out:
+                writer = TranscriptMarkdownWriter(out, transcript)
+                
+                def tap(sentences):
+                    for sentence in sentences:
+                        stats["words"] += len(sentence.get("text", "").split())
+                        stats["speakers"].add(sentence.get("speaker_id", 0))
+                        hasher.update(sentence)
+                        writer.add(sentence)
+                        yield sentence
+                
+                # Chunks are embedded while later sentences are still being parsed
+                self._store_chunks(
+                    meeting_id, self.chunker.iter_chunks(transcript, sentences=tap(streamed.sentences)),
+                    on_stored=stored
+                )
+                writer.close()
+            
+            storage_path = self._upload_markdown(local_path.name, meeting_id, local_path.read_bytes())
+            self._generate_summaries(meeting_id, transcript, [])
+            
+            fingerprint = compute_fingerprint(transcript, sentences_hash=hasher.hexdigest())
+            update.update({
                 "processed_at": datetime.now(timezone.utc).isoformat(),
-                "storage_bucket_path": storage_path
-            }).eq("id", meeting_id).execute()
+                "storage_bucket_path": storage_path,
+                "word_count": stats["words"],
+                "speaker_count": len(stats["speakers"]),
+                "raw_metadata": self._meeting_row(transcript, fingerprint)["raw_metadata"]
+            })
+            finish("meeting")
             
             logger.info(f"Successfully processed transcript {transcript_id}")
             return True
@@ -417,17 +798,173 @@ class SupabaseUploader:
         except Exception as e:
             logger.error(f"Error processing transcript {transcript_id}: {e}")
             return False
+        finally:
+            streamed.close()
+    
+    def _is_processed(self, transcript_id: str) -> bool:
+        """Check if a transcript already has a meeting record, using raw_metadata"""
+        existing = self.supabase.table("meetings").select("id, raw_metadata").execute()
+        
+        for meeting in existing.data:
+            metadata = meeting.get('raw_metadata', {})
+            if isinstance(metadata, str):
+                try:
+                    metadata = json.loads(metadata)
+                except:
+                    continue
+            
+            if metadata.get('fireflies_id') == transcript_id:
+                return True
+        return False
+    
+    def rechunk_transcript(self, transcript: Dict) -> bool:
+        """Replace the chunks of an already stored meeting using the current chunking strategy"""
+        
+        transcript_id = transcript["id"]
+        try:
+            meeting = self._find_meeting(transcript_id)
+            if not meeting:
+                logger.warning(f"No stored meeting for transcript {transcript_id}, skipping re-chunk")
+                return False
+            meeting_id = meeting["id"]
+            
+            # Transcripts fetched with the sentences_only profile carry no summary;
+            # chunk keywords come from the one stored with the meeting
+            if "summary" not in transcript:
+                transcript = {**transcript, "summary": (meeting.get("raw_metadata") or {}).get("summary") or {}}
+            
+            self._store_chunks(
+                meeting_id, self.chunker.iter_chunks(transcript), replace=True,
+                on_stored=lambda count: logger.info(f"Re-chunked transcript {transcript_id} into {count} chunks")
+            )
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error re-chunking transcript {transcript_id}: {e}")
+            return False
+    
+    def apply_changes(self, meeting: Dict, transcript: Dict, stages: List[str], fingerprint: Dict) -> bool:
+        """
+        Rerun only the given pipeline stages for a stored meeting
+        
+        The new fingerprint is written last, so a stage that fails is
+        detected again and retried by the next reconciliation. When chunks
+        are rerun that happens once the new chunks are stored, which inside
+        batched_embeddings() may be after this returns.
+        """
+        
+        transcript_id = transcript["id"]
+        meeting_id = meeting["id"]
+        try:
+            if "markdown" in stages:
+                self._replace_markdown(meeting, transcript)
+            
+            if "summaries" in stages:
+                self.supabase.table("meeting_summaries").delete().eq("meeting_id", meeting_id).eq(
+                    "generated_by", "fireflies"
+                ).execute()
+                self._generate_summaries(meeting_id, transcript, [])
+            
+            # The meeting row always carries the new fingerprint
+            table = self.chunker.sentence_table(transcript)
+            update = self._meeting_row(transcript, fingerprint, table)
+            update["raw_metadata"] = {**(meeting.get("raw_metadata") or {}), **update["raw_metadata"]}
+            if "meeting" not in stages:
+                update = {"raw_metadata": update["raw_metadata"]}
+            
+            def finish(_count=None):
+                self.supabase.table("meetings").update(update).eq("id", meeting_id).execute()
+                logger.info(f"Updated transcript {transcript_id}: reran {', '.join(stages) or 'no stages'}")
+            
+            if "chunks" in stages:
+                self._store_chunks(
+                    meeting_id, self.chunker.iter_chunks(transcript, sentences=table), replace=True, on_stored=finish
+                )
+            else:
+                finish()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error applying changes to transcript {transcript_id}: {e}")
+            return False
+    
+    def _replace_markdown(self, meeting: Dict, transcript: Dict):
+        """Overwrite the stored markdown copy of a meeting"""
+        markdown = self._convert_to_markdown(transcript)
+        storage_path = meeting.get("storage_bucket_path")
+        if not storage_path:
+            self._upload_to_storage(transcript, meeting["id"])
+            return
+        
+        self.supabase.storage.from_(Config.STORAGE_BUCKET).upload(
+            storage_path,
+            markdown.encode('utf-8'),
+            {"content-type": "text/markdown", "upsert": "true"}
+        )
+        logger.info(f"Replaced transcript in storage: {storage_path}")
+    
+    def refresh_summary(self, transcript: Dict) -> bool:
+        """Update a stored meeting's Fireflies summary, tags and executive summary"""
+        
+        transcript_id = transcript["id"]
+        summary = transcript.get("summary") or {}
+        try:
+            meeting = self._find_meeting(transcript_id)
+            if not meeting:
+                logger.warning(f"No stored meeting for transcript {transcript_id}, skipping summary refresh")
+                return False
+            
+            raw_metadata = {**(meeting.get("raw_metadata") or {}), "summary": summary}
+            self.supabase.table("meetings").update({
+                "raw_metadata": raw_metadata,
+                "tags": (summary.get("keywords") or [])[:10]
+            }).eq("id", meeting["id"]).execute()
+            
+            self.supabase.table("meeting_summaries").delete().eq("meeting_id", meeting["id"]).eq(
+                "generated_by", "fireflies"
+            ).execute()
+            self._generate_summaries(meeting["id"], transcript, [])
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error refreshing summary for transcript {transcript_id}: {e}")
+            return False
+    
+    def _find_meeting(self, transcript_id: str) -> Optional[Dict]:
+        """Stored meeting row (id, raw_metadata) for a Fireflies transcript ID"""
+        meeting = (
+            self.supabase.table("meetings")
+            .select("id, raw_metadata")
+            .eq("raw_metadata->>fireflies_id", transcript_id)
+            .limit(1)
+            .execute()
+        )
+        return meeting.data[0] if meeting.data else None
     
-    def _store_meeting(self, transcript: Dict) -> Optional[str]:
+    def _store_meeting(self, transcript: Dict, table: Optional["SentenceTable"] = None) -> Optional[str]:
         """Store meeting record in database"""
         
+        meeting_data = self._meeting_row(transcript, table=table)
+        
+        try:
+            result = self.supabase.table("meetings").insert(meeting_data).execute()
+            return result.data[0]["id"] if result.data else None
+        except Exception as e:
+            logger.error(f"Error storing meeting: {e}")
+            return None
+    
+    def _meeting_row(self, transcript: Dict, fingerprint: Optional[Dict] = None,
+                     table: Optional["SentenceTable"] = None) -> Dict:
+        """Meeting table fields derived from a transcript, including its change-detection fingerprint"""
+        
         meeting_date = datetime.fromtimestamp(transcript["date"] / 1000, tz=timezone.utc)
         participants = transcript.get("participants", [])
         
         # Calculate metadata
-        sentences = transcript.get("sentences", [])
-        word_count = sum(len(s.get("text", "").split()) for s in sentences)
-        speaker_count = len(set(s.get("speaker_id", 0) for s in sentences))
+        if table is None:
+            table = self.chunker.sentence_table(transcript)
+        word_count = table.word_count()
+        speaker_count = table.speaker_count()
         
         meeting_data = {
             "title": transcript["title"],
@@ -440,17 +977,12 @@ class SupabaseUploader:
             "raw_metadata": {
                 "fireflies_id": transcript["id"],
                 "summary": transcript.get("summary", {}),
-                "participant_count": len(participants)
+                "participant_count": len(participants),
+                "fingerprint": fingerprint or compute_fingerprint(transcript)
             },
             "tags": transcript.get("summary", {}).get("keywords", [])[:10] if transcript.get("summary") else []
         }
-        
-        try:
-            result = self.supabase.table("meetings").insert(meeting_data).execute()
-            return result.data[0]["id"] if result.data else None
-        except Exception as e:
-            logger.error(f"Error storing meeting: {e}")
-            return None
+        return meeting_data
     
     def _upload_to_storage(self, transcript: Dict, meeting_id: str) -> str:
         """Upload transcript as markdown to storage bucket"""
@@ -458,22 +990,26 @@ class SupabaseUploader:
         # Convert to markdown
         markdown = self._convert_to_markdown(transcript)
         
-        # Create filename
-        date_str = datetime.fromtimestamp(transcript["date"] / 1000).strftime("%Y-%m-%d")
-        safe_title = re.sub(r'[^\w\s-]', '', transcript["title"])[:50]
-        filename = f"{date_str}_{safe_title}_{meeting_id}.md"
-        
         # Save locally first
-        local_path = Config.LOCAL_TRANSCRIPT_DIR / filename
-        Config.LOCAL_TRANSCRIPT_DIR.mkdir(exist_ok=True)
+        local_path = self._local_markdown_path(transcript, meeting_id)
         local_path.write_text(markdown, encoding='utf-8')
         
-        # Upload to Supabase storage
+        return self._upload_markdown(local_path.name, meeting_id, markdown.encode('utf-8'))
+    
+    def _local_markdown_path(self, transcript: Dict, meeting_id: str) -> Path:
+        """Local file the markdown copy of a transcript is written to"""
+        date_str = datetime.fromtimestamp(transcript["date"] / 1000).strftime("%Y-%m-%d")
+        safe_title = re.sub(r'[^\w\s-]', '', transcript["title"])[:50]
+        Config.LOCAL_TRANSCRIPT_DIR.mkdir(exist_ok=True)
+        return Config.LOCAL_TRANSCRIPT_DIR / f"{date_str}_{safe_title}_{meeting_id}.md"
+    
+    def _upload_markdown(self, filename: str, meeting_id: str, markdown: bytes) -> str:
+        """Upload markdown to the storage bucket"""
         try:
             file_path = f"transcripts/{meeting_id}/{filename}"
             self.supabase.storage.from_(Config.STORAGE_BUCKET).upload(
                 file_path,
-                markdown.encode('utf-8'),
+                markdown,
                 {"content-type": "text/markdown"}
             )
             
@@ -487,104 +1023,123 @@ class SupabaseUploader:
     def _convert_to_markdown(self, transcript: Dict) -> str:
         """Convert transcript to well-formatted markdown"""
         
-        date = datetime.fromtimestamp(transcript["date"] / 1000)
-        participants = transcript.get("participants", [])
-        
-        # Build markdown
-        md = f"# {transcript['title']}\n\n"
-        md += f"**Date:** {date.strftime('%Y-%m-%d %H:%M')}\n"
-        md += f"**Duration:** {transcript.get('duration', 0)} minutes\n"
-        md += f"**Participants:** {', '.join(participants)}\n\n"
-        
-        # Add summary if available
-        summary = transcript.get("summary", {})
-        if summary.get("overview"):
-            md += "## Summary\n\n"
-            md += f"{summary['overview']}\n\n"
-        
-        if summary.get("action_items"):
-            md += "## Action Items\n\n"
-            for item in summary["action_items"]:
-                md += f"- {item}\n"
-            md += "\n"
-        
-        if summary.get("keywords"):
-            md += f"**Keywords:** {', '.join(summary['keywords'])}\n\n"
-        
-        # Add transcript
-        md += "## Transcript\n\n"
-        
-        # Create speaker map
-        speaker_map = {}
-        for i, email in enumerate(participants[1:] if len(participants) > 1 else []):
-            name = email.split('@')[0].capitalize()
-            speaker_map[i] = name
+        out = io.StringIO()
+        writer = TranscriptMarkdownWriter(out, transcript)
+        for sentence in transcript.get("sentences", []):
+            writer.add(sentence)
+        writer.close()
+        return out.getvalue()
+    
+    @contextmanager
+    def batched_embeddings(self):
+        """
+        Share embedding requests across every transcript stored inside the block
         
-        current_speaker = None
-        paragraph = []
+        Chunks queued by _store_chunks are sent once a full request's worth
+        has accumulated, across transcript boundaries, instead of at the end
+        of each transcript; whatever is left is embedded and stored on exit.
+        """
+        deferred = self._defer_flush
+        self._defer_flush = True
+        try:
+            yield
+        finally:
+            self._defer_flush = deferred
+            if not deferred:
+                self.batcher.flush()
+    
+    def _store_chunks(self, meeting_id: str, chunks: Iterable[Dict], replace: bool = False,
+                      on_stored: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Generate embeddings and store chunks; returns the number of chunks queued
         
-        for sentence in transcript.get("sentences", []):
-            speaker_id = sentence.get("speaker_id", 0)
-            speaker = speaker_map.get(speaker_id, f"Speaker {speaker_id + 1}")
-            text = sentence.get("text", "").strip()
-            
-            if not text:
-                continue
-            
-            if speaker != current_speaker:
-                if paragraph:
-                    md += f"**{current_speaker}:** {' '.join(paragraph)}\n\n"
-                current_speaker = speaker
-                paragraph = [text]
-            else:
-                paragraph.append(text)
+        `chunks` may be the lazy ChunkingStrategy.iter_chunks stream. Each
+        chunk is queued on the shared EmbeddingBatcher as soon as it is cut;
+        full requests are embedded on a background thread while cutting goes
+        on. The meeting's rows are inserted once all of its chunks are
+        embedded and the stream is exhausted, when the chunker has patched
+        in the final positions. With `replace`, the meeting's existing
+        chunks are deleted at that point too, so a failure while cutting
+        leaves them untouched. `on_stored(count)` runs after the insert.
         
-        # Don't forget the last paragraph
-        if paragraph and current_speaker:
-            md += f"**{current_speaker}:** {' '.join(paragraph)}\n\n"
+        Outside batched_embeddings() the queue is flushed before returning;
+        inside it the rows may be stored while a later transcript is being
+        chunked, or when the block exits.
+        """
         
-        return md
-    
-    def _store_chunks(self, meeting_id: str, chunks: List[Dict]):
-        """Generate embeddings and store chunks"""
+        queued = []
+        embedded = {}  # queue position -> (content hash, vector)
+        cut = False
         
-        batch_size = 10
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            
-            # Generate embeddings for batch
-            texts = [chunk["text"] for chunk in batch]
-            embeddings = self._generate_embeddings(texts)
+        def store():
+            if replace:
+                try:
+                    self.supabase.table("meeting_chunks").delete().eq("meeting_id", meeting_id).execute()
+                except Exception as e:
+                    logger.error(f"Error deleting old chunks of meeting {meeting_id}: {e}")
+                    return
             
-            # Store chunks
-            for chunk, embedding in zip(batch, embeddings):
-                chunk_data = {
+            rows = []
+            for position, chunk in enumerate(queued):
+                content_hash, embedding = embedded[position]
+                metadata = chunk["metadata"]
+                if content_hash:
+                    metadata = {**metadata, "content_hash": content_hash}
+                rows.append({
                     "meeting_id": meeting_id,
                     "chunk_index": chunk["index"],
                     "content": chunk["text"],
                     "embedding": embedding,
-                    "metadata": chunk["metadata"]
-                }
-                
+                    "metadata": metadata
+                })
+            queued.clear()
+            embedded.clear()
+            
+            for i in range(0, len(rows), Config.BATCH_SIZE):
+                batch = rows[i:i + Config.BATCH_SIZE]
                 try:
-                    self.supabase.table("meeting_chunks").insert(chunk_data).execute()
+                    execute_with_limit(self.supabase.table("meeting_chunks").insert(batch))
                 except Exception as e:
-                    logger.error(f"Error storing chunk {chunk['index']}: {e}")
+                    logger.error(f"Error storing chunks {batch[0]['chunk_index']}-{batch[-1]['chunk_index']}: {e}")
             
-            time.sleep(0.5)  # Rate limiting
+            if on_stored:
+                try:
+                    on_stored(len(rows))
+                except Exception as e:
+                    logger.error(f"Error finishing meeting {meeting_id} after storing its chunks: {e}")
+        
+        def received(position, result):
+            embedded[position] = result
+            if cut and len(embedded) == len(queued):
+                store()
+        
+        for chunk in chunks:
+            position = len(queued)
+            queued.append(chunk)
+            self.batcher.add(chunk["text"], lambda result, p=position: received(p, result), chunk["token_count"])
+        
+        cut = True
+        count = len(queued)
+        if len(embedded) == count:
+            store()
+        if not self._defer_flush:
+            self.batcher.flush()
+        return count
     
-    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings using OpenAI"""
+    def _generate_embeddings(self, texts: List[str]) -> Tuple[List[Optional[str]], List[List[float]]]:
+        """
+        Generate embeddings using OpenAI, skipping texts already embedded
+        
+        Returns the content hashes and the vectors. On failure the vectors
+        are zero placeholders and the hashes are None, so the placeholders
+        are never reused as another chunk's embedding.
+        """
         
         try:
-            response = self.openai.embeddings.create(
-                model=Config.EMBEDDING_MODEL,
-                input=texts
-            )
-            return [item.embedding for item in response.data]
+            return self.dedup.embed(texts)
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
-            return [[0] * Config.EMBEDDING_DIMENSION] * len(texts)
+            return [None] * len(texts), [[0] * Config.EMBEDDING_DIMENSION] * len(texts)
     
     def _generate_summaries(self, meeting_id: str, transcript: Dict, chunks: List[Dict]):
         """Generate and store various summaries"""
@@ -612,9 +1167,11 @@ class SupabaseUploader:
 class SyncPipeline:
     """Main sync pipeline orchestrator"""
     
-    def __init__(self):
-        self.fireflies = FirefliesClient()
+    def __init__(self, offline: bool = False, stream: bool = Config.STREAM_TRANSCRIPTS):
+        self.fireflies = FirefliesClient(offline=offline)
         self.uploader = SupabaseUploader()
+        self.stream = stream  # parse sentences incrementally instead of loading whole transcripts
+        self._existing_ids = set()
     
     def sync_transcript(self, transcript_id: str) -> bool:
         """Sync a single transcript"""
@@ -622,120 +1179,350 @@ class SyncPipeline:
         logger.info(f"Syncing transcript: {transcript_id}")
         
         # Fetch from Fireflies
-        transcript = self.fireflies.fetch_transcript(transcript_id)
+        if self.stream:
+            transcript = self.fireflies.stream_transcript(transcript_id)
+        else:
+            transcript = self.fireflies.fetch_transcript(transcript_id)
         if not transcript:
             logger.error(f"Failed to fetch transcript {transcript_id}")
             return False
         
         # Process and upload
-        return self.uploader.process_transcript(transcript)
+        return self._process(transcript)
     
-    def sync_all(self):
+    def sync_all(self, concurrency: int = Config.FETCH_CONCURRENCY, full_reconcile: bool = False,
+                 bulk_size: int = Config.BULK_FETCH_SIZE):
         """Sync all transcripts from Fireflies"""
         
         logger.info("Starting full sync of all transcripts...")
         
-        # Get all transcript IDs
-        all_transcripts = self.fireflies.fetch_all_transcripts_paginated()
-        logger.info(f"Found {len(all_transcripts)} total transcripts")
+        all_transcripts, new_transcripts, watermark = self._list_new_transcripts(full_reconcile)
+        logger.info(
+            f"Need to sync {len(new_transcripts)} new transcripts "
+            f"(concurrency={concurrency}, bulk size={bulk_size})"
+        )
         
-        # Check which ones are already synced
-        existing_ids = self._get_existing_transcript_ids()
-        logger.info(f"Found {len(existing_ids)} already synced")
-        
-        # Filter new ones
-        new_transcripts = [
-            t for t in all_transcripts 
-            if t['id'] not in existing_ids
-        ]
-        logger.info(f"Need to sync {len(new_transcripts)} new transcripts")
-        
-        # Sync in batches
+        # Fetch ahead while earlier transcripts are chunked and embedded
         success_count = 0
-        for i, transcript_summary in enumerate(new_transcripts):
-            logger.info(f"Processing {i+1}/{len(new_transcripts)}: {transcript_summary['title']}")
+        synced_ids = set()
+        fetch_times = []
+        started = time.monotonic()
+        with self.uploader.batched_embeddings():
+            fetched = self._iter_transcripts(new_transcripts, concurrency, fetch_times, bulk_size)
+            for i, (transcript_summary, full_transcript) in enumerate(fetched):
+                logger.info(f"Processing {i+1}/{len(new_transcripts)}: {transcript_summary['title']}")
             
-            try:
-                # Fetch full transcript
-                full_transcript = self.fireflies.fetch_transcript(transcript_summary['id'])
-                if full_transcript and self.uploader.process_transcript(full_transcript):
-                    success_count += 1
-                
-                # Rate limiting
-                if (i + 1) % 5 == 0:
-                    time.sleep(2)
+                try:
+                    if full_transcript and self._process(full_transcript):
+                        success_count += 1
+                        synced_ids.add(transcript_summary['id'])
                     
-            except Exception as e:
-                logger.error(f"Error syncing {transcript_summary['id']}: {e}")
+                except Exception as e:
+                    logger.error(f"Error syncing {transcript_summary['id']}: {e}")
         
+        if fetch_times:
+            fetch_elapsed = max(max(fetch_times) - started, 1e-6)
+            logger.info(
+                f"Fetched {len(fetch_times)} transcripts in {fetch_elapsed:.1f}s "
+                f"({len(fetch_times) / fetch_elapsed:.2f} fetches/sec)"
+            )
+        logger.info(self.fireflies.transport.describe_stats())
+        logger.info(self.fireflies.cache.describe())
+        logger.info(self.uploader.dedup.describe())
+        logger.info(self.uploader.embedder.describe())
+        logger.info(f"Rate limits - {get_limiter('openai').describe()}; {get_limiter('supabase').describe()}")
+        self._save_watermark(watermark, all_transcripts, new_transcripts, synced_ids)
         logger.info(f"Sync complete! Successfully synced {success_count}/{len(new_transcripts)} transcripts")
         return success_count
     
-    def sync_batch(self, batch_size: int):
-        """Sync a limited batch of transcripts from Fireflies"""
+    def _process(self, transcript) -> bool:
+        """Hand a fetched or streamed transcript to the matching uploader path"""
+        if isinstance(transcript, StreamedTranscript):
+            return self.uploader.process_transcript_stream(transcript)
+        return self.uploader.process_transcript(transcript)
+    
+    def _iter_transcripts(self, transcripts: List[Dict], concurrency: int, fetch_times: List[float],
+                          bulk_size: int = Config.BULK_FETCH_SIZE):
+        """
+        Yield (summary, transcript) pairs in listing order
         
-        logger.info(f"Starting batch sync of {batch_size} transcripts...")
+        In streaming mode each transcript is opened only when the previous
+        one has been consumed, so at most one response is held at a time;
+        otherwise transcripts are bulk-fetched ahead by _iter_fetched.
+        """
+        if not self.stream:
+            yield from self._iter_fetched(transcripts, concurrency, fetch_times, bulk_size)
+            return
+        
+        for summary in transcripts:
+            streamed = self.fireflies.stream_transcript(summary['id'])
+            fetch_times.append(time.monotonic())
+            try:
+                yield summary, streamed
+            finally:
+                if streamed is not None:
+                    streamed.close()
+    
+    def _iter_fetched(self, transcripts: List[Dict], concurrency: int, fetch_times: List[float],
+                      bulk_size: int = Config.BULK_FETCH_SIZE, profile: str = "full", refresh: bool = False):
+        """
+        Yield (summary, full transcript) pairs in listing order while keeping
+        up to `concurrency` bulk requests of `bulk_size` transcripts in flight.
         
-        # Get all transcript IDs
-        all_transcripts = self.fireflies.fetch_all_transcripts_paginated()
-        logger.info(f"Found {len(all_transcripts)} total transcripts")
+        The completion time of every fetched transcript is appended to
+        `fetch_times` so the caller can report achieved throughput.
+        """
+        concurrency = max(1, concurrency)
+        bulk_size = max(1, bulk_size)
+        batches = iter([transcripts[i:i + bulk_size] for i in range(0, len(transcripts), bulk_size)])
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fireflies-fetch") as executor:
+            def submit(batch):
+                future = executor.submit(
+                    self.fireflies.fetch_transcripts_bulk, [t['id'] for t in batch], bulk_size, profile, refresh
+                )
+                future.add_done_callback(lambda _: fetch_times.extend([time.monotonic()] * len(batch)))
+                pending.append((batch, future))
+            
+            for batch in batches:
+                submit(batch)
+                if len(pending) >= concurrency:
+                    break
+            
+            while pending:
+                batch, future = pending.popleft()
+                
+                # Refill the window before handing this batch to the caller
+                next_batch = next(batches, None)
+                if next_batch is not None:
+                    submit(next_batch)
+                
+                fetched = future.result()
+                for summary in batch:
+                    yield summary, fetched.get(summary['id'])
+    
+    def rechunk_all(self, concurrency: int = Config.FETCH_CONCURRENCY, bulk_size: int = Config.BULK_FETCH_SIZE):
+        """
+        Re-chunk and re-embed every stored meeting from the raw transcripts
+        
+        Only the sentences_only query profile is fetched, and cached full
+        transcripts are reused, so with `offline` set this makes no
+        Fireflies calls at all.
+        """
         
-        # Check which ones are already synced
         existing_ids = self._get_existing_transcript_ids()
-        logger.info(f"Found {len(existing_ids)} already synced")
+        listed = self.fireflies.fetch_all_transcripts_paginated()
+        transcripts = [t for t in listed if t['id'] in existing_ids]
+        logger.info(f"Re-chunking {len(transcripts)} stored transcripts")
         
-        # Filter new ones and limit to batch size
-        new_transcripts = [
-            t for t in all_transcripts 
-            if t['id'] not in existing_ids
-        ][:batch_size]  # Limit to batch size
+        success_count = 0
+        with self.uploader.batched_embeddings():
+            for i, (transcript_summary, full_transcript) in enumerate(
+                self._iter_fetched(transcripts, concurrency, [], bulk_size, profile="sentences_only")
+            ):
+                logger.info(f"Re-chunking {i+1}/{len(transcripts)}: {transcript_summary['title']}")
+                if full_transcript and self.uploader.rechunk_transcript(full_transcript):
+                    success_count += 1
+        
+        logger.info(self.fireflies.cache.describe())
+        logger.info(self.uploader.dedup.describe())
+        logger.info(self.uploader.embedder.describe())
+        logger.info(f"Re-chunk complete! Updated {success_count}/{len(transcripts)} transcripts")
+        return success_count
+    
+    def reconcile(self, concurrency: int = Config.FETCH_CONCURRENCY, bulk_size: int = Config.BULK_FETCH_SIZE):
+        """
+        Pick up Fireflies edits to already synced transcripts
+        
+        Every stored transcript is re-fetched and fingerprinted; only those
+        whose fingerprint changed are touched, and only the stages whose
+        inputs changed are rerun (see transcript_fingerprint). Meetings
+        stored before fingerprints existed get a baseline fingerprint
+        without reprocessing.
+        """
+        
+        existing = self._get_existing_meetings()
+        listed = self.fireflies.fetch_all_transcripts_paginated()
+        transcripts = [t for t in listed if t['id'] in existing]
+        logger.info(f"Reconciling {len(transcripts)} stored transcripts")
+        
+        counts = {"unchanged": 0, "updated": 0, "baselined": 0, "failed": 0}
+        stage_counts = {}
+        with self.uploader.batched_embeddings():
+            for transcript_summary, transcript in self._iter_fetched(
+                transcripts, concurrency, [], bulk_size, refresh=True
+            ):
+                if not transcript:
+                    counts["failed"] += 1
+                    continue
+            
+                meeting = existing[transcript_summary['id']]
+                fingerprint = compute_fingerprint(transcript)
+                changed = changed_components((meeting.get("raw_metadata") or {}).get("fingerprint"), fingerprint)
+            
+                if changed is None:
+                    stages = []
+                    outcome = "baselined"
+                elif not changed:
+                    counts["unchanged"] += 1
+                    continue
+                else:
+                    stages = stages_to_rerun(changed)
+                    outcome = "updated"
+                    logger.info(f"{transcript_summary['title']}: changed {', '.join(sorted(changed))}")
+            
+                if self.uploader.apply_changes(meeting, transcript, stages, fingerprint):
+                    counts[outcome] += 1
+                    for stage in stages:
+                        stage_counts[stage] = stage_counts.get(stage, 0) + 1
+                else:
+                    counts["failed"] += 1
+        
+        logger.info(self.uploader.dedup.describe())
+        logger.info(self.uploader.embedder.describe())
+        logger.info(
+            f"Reconcile complete! {counts['updated']} updated, {counts['unchanged']} unchanged, "
+            f"{counts['baselined']} baselined, {counts['failed']} failed; "
+            f"stages rerun: {stage_counts or 'none'}"
+        )
+        return counts
+    
+    def refresh_summaries(self, concurrency: int = Config.FETCH_CONCURRENCY, bulk_size: int = Config.BULK_FETCH_SIZE):
+        """Re-fetch only the Fireflies summary block for every stored meeting"""
+        
+        existing_ids = self._get_existing_transcript_ids()
+        listed = self.fireflies.fetch_all_transcripts_paginated()
+        transcripts = [t for t in listed if t['id'] in existing_ids]
+        logger.info(f"Refreshing summaries for {len(transcripts)} stored transcripts")
+        
+        success_count = 0
+        for transcript_summary, transcript in self._iter_fetched(
+            transcripts, concurrency, [], bulk_size, profile="summary_only"
+        ):
+            if transcript and self.uploader.refresh_summary(transcript):
+                success_count += 1
+        
+        logger.info(f"Summary refresh complete! Updated {success_count}/{len(transcripts)} transcripts")
+        return success_count
+    
+    def sync_batch(self, batch_size: int, full_reconcile: bool = False,
+                   bulk_size: int = Config.BULK_FETCH_SIZE):
+        """Sync a limited batch of transcripts from Fireflies"""
+        
+        logger.info(f"Starting batch sync of {batch_size} transcripts...")
+        
+        all_transcripts, new_transcripts, watermark = self._list_new_transcripts(full_reconcile)
+        new_transcripts = new_transcripts[:batch_size]  # Limit to batch size
         
         logger.info(f"Processing batch of {len(new_transcripts)} new transcripts")
         
         # Sync the batch
         success_count = 0
-        for i, transcript_summary in enumerate(new_transcripts):
-            logger.info(f"Processing {i+1}/{len(new_transcripts)}: {transcript_summary['title']}")
+        synced_ids = set()
+        with self.uploader.batched_embeddings():
+            fetched = self._iter_transcripts(new_transcripts, 1, [], bulk_size)
+            for i, (transcript_summary, full_transcript) in enumerate(fetched):
+                logger.info(f"Processing {i+1}/{len(new_transcripts)}: {transcript_summary['title']}")
             
-            try:
-                # Fetch full transcript
-                full_transcript = self.fireflies.fetch_transcript(transcript_summary['id'])
-                if full_transcript and self.uploader.process_transcript(full_transcript):
-                    success_count += 1
-                
-                # Rate limiting - slower for small batches
-                time.sleep(3)  # 3 second delay between requests
+                try:
+                    if full_transcript and self._process(full_transcript):
+                        success_count += 1
+                        synced_ids.add(transcript_summary['id'])
                     
-            except Exception as e:
-                logger.error(f"Error syncing {transcript_summary['id']}: {e}")
+                except Exception as e:
+                    logger.error(f"Error syncing {transcript_summary['id']}: {e}")
         
+        self._save_watermark(watermark, all_transcripts, new_transcripts, synced_ids)
+        logger.info(self.uploader.dedup.describe())
+        logger.info(self.uploader.embedder.describe())
         logger.info(f"Batch sync complete! Successfully synced {success_count}/{len(new_transcripts)} transcripts")
         return success_count
     
+    def _list_new_transcripts(self, full_reconcile: bool = False) -> Tuple[List[Dict], List[Dict], Optional[Dict]]:
+        """
+        List transcripts that still need syncing
+        
+        Incremental by default: only transcripts at or after the stored
+        high-water mark are listed. `full_reconcile` pages through the whole
+        Fireflies history instead.
+        
+        Returns (listed transcripts, new transcripts, watermark used)
+        """
+        watermark = None
+        if not full_reconcile:
+            try:
+                watermark = load_watermark(self.uploader.supabase)
+            except Exception as e:
+                logger.error(f"Error loading sync watermark, falling back to full listing: {e}")
+        logger.info(f"Listing transcripts since watermark: {describe_watermark(watermark)}")
+        
+        all_transcripts = self.fireflies.fetch_all_transcripts_paginated(
+            from_date=watermark["date"] if watermark else None
+        )
+        logger.info(f"Found {len(all_transcripts)} listed transcripts")
+        
+        # Check which ones are already synced
+        existing_ids = self._get_existing_transcript_ids()
+        logger.info(f"Found {len(existing_ids)} already synced")
+        self._existing_ids = existing_ids
+        
+        new_transcripts = [
+            t for t in all_transcripts 
+            if t['id'] not in existing_ids
+        ]
+        return all_transcripts, new_transcripts, watermark
+    
+    def _save_watermark(self, watermark: Optional[Dict], all_transcripts: List[Dict],
+                        new_transcripts: List[Dict], synced_ids: set):
+        """Advance the high-water mark past everything that is now in Supabase"""
+        
+        failed = len(new_transcripts) - len(synced_ids)
+        if self.fireflies.last_listing_complete:
+            new_watermark = advance_watermark(watermark, all_transcripts, self._existing_ids | synced_ids)
+        else:
+            # A partial listing may have skipped older transcripts; keep the old mark
+            logger.warning("Transcript listing was incomplete; not advancing the sync watermark")
+            new_watermark = watermark
+        
+        try:
+            save_watermark(
+                self.uploader.supabase,
+                new_watermark,
+                status="completed" if failed == 0 else "failed",
+                error_message=f"{failed} transcripts failed to sync" if failed else None
+            )
+            logger.info(f"Sync watermark: {describe_watermark(new_watermark)}")
+        except Exception as e:
+            logger.error(f"Error saving sync watermark: {e}")
+    
     def _get_existing_transcript_ids(self) -> set:
         """Get set of already synced transcript IDs"""
+        return set(self._get_existing_meetings())
+    
+    def _get_existing_meetings(self) -> Dict[str, Dict]:
+        """Map of Fireflies ID -> stored meeting row (id, raw_metadata, storage_bucket_path)"""
         try:
-            supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
-            meetings = supabase.table("meetings").select("raw_metadata").execute()
+            supabase = get_supabase(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+            meetings = supabase.table("meetings").select("id, raw_metadata, storage_bucket_path").execute()
             
-            existing_ids = set()
+            existing = {}
             for meeting in meetings.data:
                 metadata = meeting.get('raw_metadata', {})
                 if isinstance(metadata, str):
-                    import json
                     try:
                         metadata = json.loads(metadata)
                     except:
                         continue
                 
-                fireflies_id = metadata.get('fireflies_id')
+                fireflies_id = (metadata or {}).get('fireflies_id')
                 if fireflies_id:
-                    existing_ids.add(fireflies_id)
+                    existing[fireflies_id] = {**meeting, "raw_metadata": metadata}
             
-            return existing_ids
+            return existing
         except Exception as e:
             logger.error(f"Error getting existing IDs: {e}")
-            return set()
+            return {}
 
 
 # CLI interface
@@ -747,22 +1534,45 @@ if __name__ == "__main__":
     parser.add_argument('--sync-batch', type=int, help='Sync a limited batch of transcripts (specify number)')
     parser.add_argument('--sync-id', type=str, help='Sync a specific transcript by ID')
     parser.add_argument('--test', action='store_true', help='Test the pipeline with one transcript')
+    parser.add_argument('--full-reconcile', action='store_true',
+                        help='List the entire Fireflies history instead of only transcripts since the last watermark')
+    parser.add_argument('--concurrency', type=int, default=Config.FETCH_CONCURRENCY,
+                        help=f'Transcript fetches kept in flight during --sync-all (default: {Config.FETCH_CONCURRENCY})')
+    parser.add_argument('--bulk-size', type=int, default=Config.BULK_FETCH_SIZE,
+                        help=f'Transcripts fetched per aliased GraphQL query (default: {Config.BULK_FETCH_SIZE})')
+    parser.add_argument('--stream', action='store_true', default=Config.STREAM_TRANSCRIPTS,
+                        help='Parse transcript sentences incrementally to keep memory flat on very long meetings (needs ijson)')
+    parser.add_argument('--reconcile', action='store_true',
+                        help='Re-fetch stored transcripts and rerun only the stages whose inputs changed in Fireflies')
+    parser.add_argument('--refresh-summaries', action='store_true',
+                        help='Re-fetch only the Fireflies summaries of stored meetings (summary_only query profile)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Read transcripts and listings only from the local transcript cache (no Fireflies calls)')
+    parser.add_argument('--rechunk', action='store_true',
+                        help='Re-chunk and re-embed already stored meetings from cached raw transcripts')
     
     args = parser.parse_args()
     
-    pipeline = SyncPipeline()
+    pipeline = SyncPipeline(offline=args.offline, stream=args.stream)
     
-    if args.sync_all:
-        pipeline.sync_all()
+    if args.rechunk:
+        pipeline.rechunk_all(concurrency=args.concurrency, bulk_size=args.bulk_size)
+    elif args.reconcile:
+        pipeline.reconcile(concurrency=args.concurrency, bulk_size=args.bulk_size)
+    elif args.refresh_summaries:
+        pipeline.refresh_summaries(concurrency=args.concurrency, bulk_size=args.bulk_size)
+    elif args.sync_all:
+        pipeline.sync_all(concurrency=args.concurrency, full_reconcile=args.full_reconcile,
+                          bulk_size=args.bulk_size)
     elif args.sync_batch:
-        pipeline.sync_batch(args.sync_batch)
+        pipeline.sync_batch(args.sync_batch, full_reconcile=args.full_reconcile, bulk_size=args.bulk_size)
     elif args.sync_id:
         success = pipeline.sync_transcript(args.sync_id)
         print(f"Sync {'successful' if success else 'failed'} for transcript {args.sync_id}")
     elif args.test:
         # Test with fetching one transcript
         client = FirefliesClient()
-        transcripts = client.fetch_all_transcripts_paginated(batch_size=1)
+        transcripts = client.fetch_recent_transcripts(limit=1)
         if transcripts:
             test_id = transcripts[0]['id']
             print(f"Testing with transcript: {test_id}")
@@ -774,3 +1584,6 @@ if __name__ == "__main__":
         print("Use --sync-all to sync all transcripts, or --sync-id <id> to sync a specific one")
         print("Use --sync-batch <number> to sync a limited batch of transcripts")
         print("Use --test to test the pipeline with one transcript")
+        print("Use --rechunk [--offline] to re-chunk stored meetings from the local transcript cache")
+        print("Use --reconcile to pick up Fireflies edits to already synced transcripts")
+        print("Use --refresh-summaries to update stored meetings with the latest Fireflies summaries")
@@ -0,0 +1,194 @@
+"""
+Adaptive token-bucket rate limiting shared by every sync script.
+
+There is one bucket per upstream service (Fireflies, OpenAI, Supabase).
+Callers take a token before each request instead of sleeping for a fixed
+time. The bucket refills at its current rate, which creeps up while requests
+succeed and is halved on a 429. Retry-After and rate-limit headers pause the
+bucket until the server says capacity is back.
+"""
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# name -> (initial requests/sec, burst, max requests/sec); override with <NAME>_RATE_LIMIT etc.
+DEFAULT_LIMITS = {
+    "fireflies": (1.0, 5, 4.0),
+    "openai": (20.0, 20, 80.0),
+    "supabase": (20.0, 40, 100.0),
+}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value):
+    """Seconds from OpenAI-style reset headers such as "1s", "6m0s" or "20ms"."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+class AdaptiveTokenBucket:
+    """Thread-safe token bucket whose refill rate adapts to server feedback."""
+
+    def __init__(self, name, rate, burst, max_rate=None, min_rate=None):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_rate = float(max_rate or rate)
+        self.min_rate = float(min_rate or min(rate, 0.1))
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.throttled_count = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.wait_seconds += waited
+                    return waited
+                else:
+                    delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self):
+        """Additive increase towards max_rate after a request went through."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.01)
+
+    def on_throttled(self, retry_after=None):
+        """Multiplicative decrease, and pause the bucket for Retry-After seconds."""
+        with self._lock:
+            self.throttled_count += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def pause(self, seconds):
+        """Hold all requests for `seconds` without changing the rate."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def observe_headers(self, headers):
+        """Honour Retry-After and remaining/reset rate-limit headers from a successful response."""
+        if not headers:
+            return
+
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if retry_after:
+            self.pause(retry_after)
+            return
+
+        for remaining_key, reset_key in (
+            ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("x-ratelimit-remaining", "x-ratelimit-reset"),
+        ):
+            remaining = headers.get(remaining_key)
+            if remaining is None:
+                continue
+            try:
+                exhausted = int(float(remaining)) <= 0
+            except ValueError:
+                continue
+            if exhausted:
+                reset = parse_reset_duration(headers.get(reset_key))
+                self.pause(reset if reset is not None else 1.0 / self.rate)
+            return
+
+    def observe(self, status_code, headers=None):
+        """Feed back the outcome of a request: 429 throttles, anything else may speed up."""
+        if status_code == 429:
+            self.on_throttled(parse_retry_after((headers or {}).get("retry-after")))
+        else:
+            self.observe_headers(headers)
+            if status_code < 400:
+                self.on_success()
+
+    def describe(self):
+        return (
+            f"{self.name}: {self.rate:.2f} req/s, throttled {self.throttled_count}x, "
+            f"waited {self.wait_seconds:.1f}s"
+        )
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name):
+    """Return the process-wide bucket for a service, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            rate, burst, max_rate = DEFAULT_LIMITS.get(name, (5.0, 5, 20.0))
+            prefix = name.upper()
+            limiter = _limiters[name] = AdaptiveTokenBucket(
+                name,
+                rate=float(os.getenv(f"{prefix}_RATE_LIMIT", rate)),
+                burst=float(os.getenv(f"{prefix}_RATE_BURST", burst)),
+                max_rate=float(os.getenv(f"{prefix}_RATE_LIMIT_MAX", max_rate)),
+            )
+        return limiter
+
+
+def execute_with_limit(query, limiter_name="supabase", retries=3):
+    """Run a Supabase query builder's execute() through a bucket, backing off on 429s."""
+    limiter = get_limiter(limiter_name)
+    for attempt in range(retries):
+        limiter.acquire()
+        try:
+            result = query.execute()
+        except Exception as e:
+            code = str(getattr(e, "code", "") or "")
+            if attempt < retries - 1 and (code == "429" or "429" in str(e) or "rate limit" in str(e).lower()):
+                limiter.on_throttled()
+                continue
+            raise
+        limiter.on_success()
+        return result
@@ -0,0 +1,135 @@
+"""
+Process-wide lazy registry of tokenizers, API clients and embedding helpers.
+
+Tokenizers, the OpenAI/Supabase clients, the embedding backends and the local
+embedding cache are built on first use and shared afterwards, so importing a
+module (or running `--help`) does not load the heavy SDKs or the BPE ranks.
+Every tokenizer is keyed by its tiktoken encoding, so `gpt-4`,
+`text-embedding-3-small` and `text-embedding-ada-002` share a single
+cl100k_base encoder.
+
+BPE files are read from TIKTOKEN_CACHE_DIR (default `.cache/tiktoken`) and are
+only downloaded when they are missing there. CI restores that directory from
+its cache, so cold runners do not download them.
+"""
+import os
+import threading
+from pathlib import Path
+
+TOKENIZER_CACHE_DIR = Path(os.getenv("TIKTOKEN_CACHE_DIR", ".cache/tiktoken"))
+
+_lock = threading.Lock()
+_instances = {}
+
+
+def _get(key, factory):
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = _instances[key] = factory()
+    return instance
+
+
+def encoding_name(model_or_encoding):
+    """tiktoken encoding name for a model name, or the name itself if it already is an encoding."""
+    import tiktoken.model
+
+    try:
+        return tiktoken.model.encoding_name_for_model(model_or_encoding)
+    except KeyError:
+        return model_or_encoding
+
+
+def get_tokenizer(model_or_encoding="text-embedding-3-small"):
+    """Shared tiktoken encoder for a model or encoding name."""
+    name = encoding_name(model_or_encoding)
+
+    def build():
+        # tiktoken reads the cache location when the ranks are first loaded
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(TOKENIZER_CACHE_DIR))
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+
+    return _get(("tokenizer", name), build)
+
+
+def get_openai(api_key=None):
+    """Shared OpenAI client; the key defaults to OPENAI_API_KEY."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+    def build():
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key)
+
+    return _get(("openai", api_key), build)
+
+
+def get_supabase(url=None, key=None):
+    """Shared Supabase client; defaults to SUPABASE_URL and the service key."""
+    url = url or os.getenv("SUPABASE_URL")
+    key = key or os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+    def build():
+        from supabase import create_client
+
+        return create_client(url, key)
+
+    return _get(("supabase", url, key), build)
+
+
+def get_embedding_service(model, api_key=None, dimensions=None):
+    """Shared EmbeddingService for a model and vector size, so every caller draws on one rate budget."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+    def build():
+        from embedding_service import EmbeddingService
+
+        return EmbeddingService(model, api_key, dimensions)
+
+    return _get(("embedding_service", model, api_key, dimensions), build)
+
+
+def get_embedding_provider(model=None, api_key=None, dimensions=None):
+    """
+    Shared embedding backend chosen by EMBEDDING_PROVIDER (openai, local or hashing)
+
+    `model` and `dimensions` describe the vectors the caller stores, by
+    default those of embeddings.embedding_settings(). The OpenAI backend
+    embeds with them, the hashing backend produces vectors of that size,
+    and a local model must already have the requested size.
+    """
+    from embedding_providers import EMBEDDING_LOCAL_MODEL, EMBEDDING_PROVIDER, HashingEmbedder, LocalEmbedder
+    from embeddings import embedding_settings, native_dimensions
+
+    if model is None:
+        model, configured = embedding_settings()
+        dimensions = dimensions or configured
+
+    if EMBEDDING_PROVIDER == "openai":
+        return get_embedding_service(model, api_key, dimensions)
+    if EMBEDDING_PROVIDER == "hashing":
+        size = dimensions or native_dimensions(model)
+        return _get(("embedding_provider", "hashing", size), lambda: HashingEmbedder(size))
+    if EMBEDDING_PROVIDER == "local":
+        provider = _get(("embedding_provider", "local", EMBEDDING_LOCAL_MODEL), LocalEmbedder)
+        if dimensions and provider.dimensions != dimensions:
+            raise ValueError(
+                f"{provider.model} returns {provider.dimensions}-dimension vectors, not {dimensions} "
+                f"(set EMBEDDING_DIMENSIONS={provider.dimensions} and use a schema of that size)"
+            )
+        return provider
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER {EMBEDDING_PROVIDER!r} (use openai, local or hashing)")
+
+
+def get_embedding_cache(path=None):
+    """Shared local embedding cache, or None when EMBEDDING_CACHE_MAX_MB is 0."""
+    from embedding_cache import CACHE_MAX_BYTES, CACHE_PATH, EmbeddingCache
+
+    if CACHE_MAX_BYTES <= 0:
+        return None
+    path = Path(path or CACHE_PATH)
+    return _get(("embedding_cache", str(path.resolve())), lambda: EmbeddingCache(path))
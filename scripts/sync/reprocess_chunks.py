@@ -2,12 +2,14 @@
 Reprocess existing meetings to add chunks with embeddings
 """
 import os
-import json
 from datetime import datetime
 from dotenv import load_dotenv
-from supabase import create_client
-from openai import OpenAI
-import tiktoken
+from registry import get_embedding_cache, get_embedding_provider, get_supabase
+from chunk_dedup import EmbeddingDedup
+from batch_backfill import BatchBackfill
+from embedding_batcher import EmbeddingBatcher, MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST
+from bulk_chunking import ChunkingStats, iter_chunked_texts
+from rate_limiter import execute_with_limit
 
 load_dotenv()
 
@@ -15,55 +17,41 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai_client = OpenAI(api_key=OPENAI_KEY)
-tokenizer = tiktoken.encoding_for_model("text-embedding-ada-002")
 
+def embed_batch(dedup, texts, defer=False):
+    """
+    (content hash, vector) per text, or (None, None) for all of them if embedding fails.
 
-def chunk_text(text, chunk_size=800, overlap=200):
-    """Split text into overlapping chunks."""
-    tokens = tokenizer.encode(text)
-    chunks = []
-    start = 0
-    
-    while start < len(tokens):
-        end = min(start + chunk_size, len(tokens))
-        chunk = tokenizer.decode(tokens[start:end])
-        chunks.append((start, end, chunk))
-        start += (chunk_size - overlap)
-    
-    return chunks
-
-
-def embed_text(text):
-    """Generate embedding for text."""
-    response = openai_client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=text
-    )
-    return response.data[0].embedding
+    With `defer`, texts without a known vector are not embedded and get None.
+    """
+    try:
+        return list(zip(*(dedup.lookup(texts) if defer else dedup.embed(texts))))
+    except Exception as e:
+        print(f"\n   ⚠️  Embedding failed for {len(texts)} chunks: {str(e)[:100]}")
+        return [(None, None)] * len(texts)
 
 
-def process_meeting(meeting):
-    """Process a single meeting to add chunks."""
+def load_meeting(meeting):
+    """
+    Markdown of a meeting that has no chunks yet, or None if it has chunks or cannot be read.
+    """
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
     meeting_id = meeting['id']
-    title = meeting['title']
-    project_id = meeting.get('project_id')
     
-    print(f"\n📄 Processing: {title}")
+    print(f"\n📄 Processing: {meeting['title']}")
     print(f"   ID: {meeting_id[:8]}...")
     
     # Check if chunks already exist
     existing_chunks = supabase.table("meeting_chunks").select("id").eq("meeting_id", meeting_id).execute()
     if existing_chunks.data:
         print(f"   ⏩ Already has {len(existing_chunks.data)} chunks, skipping")
-        return False
+        return None
     
     # Get the markdown file from storage
     storage_path = meeting.get('storage_bucket_path')
     if not storage_path:
         print("   ❌ No storage path found")
-        return False
+        return None
     
     try:
         # Download the file from storage
@@ -73,59 +61,118 @@ def process_meeting(meeting):
         # Decode the markdown content
         markdown_content = file_data.decode('utf-8')
         print(f"   📏 File size: {len(markdown_content)} characters")
+        return markdown_content
+        
+    except Exception as e:
+        print(f"   ❌ Error: {str(e)}")
+        return None
+
+
+def process_meeting(meeting, chunks, batcher):
+    """
+    Queue a chunked meeting's chunks for embedding.
+    
+    The chunks share embedding requests with the meetings queued before and
+    after it; they are stored once all of them are embedded, which may be
+    while a later meeting is processed or on the final batcher.flush().
+    """
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    meeting_id = meeting['id']
+    title = meeting['title']
+    project_id = meeting.get('project_id')
+    
+    print(f"   🔪 {title}: created {len(chunks)} chunks, queued for embedding")
+    
+    try:
+        embedded = {}  # chunk index -> (content hash, vector)
         
-        # Chunk the text
-        chunks = chunk_text(markdown_content)
-        print(f"   🔪 Created {len(chunks)} chunks")
+        def store_chunks():
+            stored = 0
+            for i, (start, end, chunk_content, char_start, char_end) in enumerate(chunks):
+                content_hash, embedding = embedded[i]
+                if content_hash is None:
+                    print(f"   ⚠️  No embedding for chunk {i} of {title}")
+                    continue
+                try:
+                    chunk_data = {
+                        "meeting_id": meeting_id,
+                        "chunk_index": i,
+                        "content": chunk_content,
+                        "embedding": embedding,
+                        "metadata": {
+                            "token_range": {"start": start, "end": end},
+                            "char_range": {"start": char_start, "end": char_end},
+                            "chunk_number": i + 1,
+                            "total_chunks": len(chunks),
+                            "project_id": project_id,
+                            "meeting_title": title,
+                            "content_hash": content_hash
+                        }
+                    }
+                    
+                    execute_with_limit(supabase.table("meeting_chunks").insert(chunk_data))
+                    stored += 1
+                    
+                except Exception as e:
+                    print(f"   ⚠️  Error on chunk {i} of {title}: {str(e)[:100]}")
+            
+            deferred = sum(1 for _, embedding in embedded.values() if embedding is None)
+            if deferred:
+                print(f"   ✅ Stored {stored}/{len(chunks)} chunks for {title}, {deferred} awaiting the Batch API")
+            else:
+                print(f"   ✅ Stored {stored}/{len(chunks)} chunks with embeddings for {title}")
         
-        # Process each chunk
-        stored = 0
-        for i, (start, end, chunk_content) in enumerate(chunks):
-            try:
-                print(f"   🧮 Processing chunk {i+1}/{len(chunks)}...", end="\r")
-                
-                # Generate embedding
-                embedding = embed_text(chunk_content)
-                
-                # Store chunk
-                chunk_data = {
-                    "meeting_id": meeting_id,
-                    "chunk_index": i,
-                    "content": chunk_content,
-                    "embedding": embedding,
-                    "metadata": json.dumps({
-                        "token_range": {"start": start, "end": end},
-                        "chunk_number": i + 1,
-                        "total_chunks": len(chunks),
-                        "project_id": project_id,
-                        "meeting_title": title
-                    })
-                }
-                
-                supabase.table("meeting_chunks").insert(chunk_data).execute()
-                stored += 1
-                
-            except Exception as e:
-                print(f"\n   ⚠️  Error on chunk {i}: {str(e)[:100]}")
+        def received(i, result):
+            embedded[i] = result
+            if len(embedded) == len(chunks):
+                store_chunks()
         
-        print(f"\n   ✅ Stored {stored}/{len(chunks)} chunks with embeddings")
-        return stored > 0
+        # Generate embeddings (reusing those of identical chunks) packed with other meetings' chunks
+        for i, (start, end, chunk_content, _, _) in enumerate(chunks):
+            batcher.add(chunk_content, lambda result, i=i: received(i, result), end - start)
+        return bool(chunks)
         
     except Exception as e:
         print(f"   ❌ Error: {str(e)}")
         return False
 
 
-def main():
-    """Process all meetings that don't have chunks yet."""
+def main(batch_api=False):
+    """
+    Process all meetings that don't have chunks yet.
+
+    With `batch_api`, chunks whose text has no known vector are stored
+    without one and embedded afterwards through the OpenAI Batch API
+    (see batch_backfill.py), at half the price.
+    """
     print("🚀 Reprocessing meetings to add chunks with embeddings...")
     print(f"📅 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Test OpenAI connection
-    print("\n🔑 Testing OpenAI API...")
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    # Identical chunks (recurring meetings, re-ingests) reuse a cached or stored embedding;
+    # the rest are packed, across meetings, into requests as large as the API allows,
+    # several of them in flight at once. Model and size come from EMBEDDING_MODEL/EMBEDDING_DIMENSIONS.
+    embedder = get_embedding_provider(api_key=OPENAI_KEY)
+    dedup = EmbeddingDedup(
+        supabase, embedder.model, embedder, cache=get_embedding_cache(), dimensions=embedder.dimensions
+    )
     try:
-        test_embedding = embed_text("test")
-        print(f"✅ OpenAI API working! Embedding dimension: {len(test_embedding)}")
+        dedup.check_column()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    backfill = BatchBackfill(supabase, dedup) if batch_api else None
+    batcher = EmbeddingBatcher(
+        lambda texts: embed_batch(dedup, texts, defer=batch_api),
+        max_inputs=MAX_INPUTS_PER_REQUEST * embedder.max_concurrency,
+        max_tokens=MAX_TOKENS_PER_REQUEST * embedder.max_concurrency,
+    )
+    
+    # Test embeddings (served from the local cache after the first run)
+    print("\n🔑 Testing embeddings...")
+    try:
+        _, test_embedding = dedup.embed_one("test")
+        print(f"✅ Embeddings working! Embedding dimension: {len(test_embedding)}")
     except Exception as e:
         print(f"❌ OpenAI API error: {e}")
         return
@@ -141,14 +188,29 @@ def main():
     skipped = 0
     errors = 0
     
-    for meeting in meetings.data:
-        result = process_meeting(meeting)
-        if result:
+    def readable():
+        nonlocal errors
+        for meeting in meetings.data:
+            markdown = load_meeting(meeting)
+            if markdown is None:
+                errors += 1
+            else:
+                yield meeting, markdown
+    
+    # Meetings are windowed in batches on every core while the next ones download
+    chunking = ChunkingStats()
+    for meeting, chunks in iter_chunked_texts(readable(), stats=chunking):
+        if process_meeting(meeting, chunks, batcher):
             processed += 1
-        elif result is False:
-            errors += 1
         else:
-            skipped += 1
+            errors += 1
+    
+    # Embed and store whatever is still queued
+    batcher.flush()
+    
+    if batch_api:
+        print("\n📦 Embedding the new chunks through the Batch API...")
+        backfill.run()
     
     # Summary
     print(f"\n{'='*60}")
@@ -157,6 +219,11 @@ def main():
     print(f"   ⏩ Skipped: {skipped}")
     print(f"   ❌ Errors: {errors}")
     print(f"   📋 Total: {len(meetings.data)}")
+    print(f"   🔪 Chunked {chunking.describe()}")
+    print(f"   ♻️  {dedup.describe()}")
+    print(f"   📦 {embedder.describe()}")
+    if batch_api:
+        print(f"   📦 {backfill.describe()}")
     
     # Verify chunks
     print(f"\n🔍 Verifying chunks in database...")
@@ -171,7 +238,7 @@ def main():
             sample = supabase.table("meeting_chunks").select("content").limit(1).execute()
             if sample.data:
                 test_text = sample.data[0]['content'][:100]
-                test_embedding = embed_text(test_text)
+                _, test_embedding = dedup.embed_one(test_text)
                 
                 # Try to search (this might fail if the function doesn't exist)
                 print("✅ Vector embeddings are ready for search!")
@@ -182,4 +249,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Chunk and embed meetings that have no chunks yet")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="Embed new chunks through the OpenAI Batch API (half price, results within 24h)")
+    
+    main(batch_api=parser.parse_args().batch_api)
\ No newline at end of file
@@ -7,6 +7,7 @@ Usage:
     python3 run_sync.py --all        # Sync ALL transcripts (try larger limits)
     python3 run_sync.py --continuous # Run continuously every 30 minutes
     python3 run_sync.py -c -i 60    # Run continuously every 60 minutes
+    python3 run_sync.py --full-reconcile  # List the whole Fireflies history, not just since the watermark
 """
 import sys
 import argparse
@@ -25,6 +26,7 @@ Examples:
   python3 run_sync.py --all            # Fetch ALL available transcripts
   python3 run_sync.py --continuous     # Run every 30 minutes
   python3 run_sync.py -c --interval 60 # Run every 60 minutes
+  python3 run_sync.py --full-reconcile # Re-list the entire Fireflies history
   
 Note: Press Ctrl+C to stop continuous mode gracefully.
         """
@@ -36,17 +38,20 @@ Note: Press Ctrl+C to stop continuous mode gracefully.
                         help='Run continuously with scheduled syncs')
     parser.add_argument('--interval', '-i', type=int, default=30,
                         help='Minutes between syncs in continuous mode (default: 30)')
+    parser.add_argument('--full-reconcile', action='store_true',
+                        help='List the entire Fireflies history instead of only transcripts since the last watermark')
     
     args = parser.parse_args()
     
     if args.continuous:
         print(f"🔄 Starting continuous sync (every {args.interval} minutes)")
         print("   Press Ctrl+C to stop gracefully\n")
-        sync_all_transcripts(continuous=True, interval_minutes=args.interval)
+        sync_all_transcripts(continuous=True, interval_minutes=args.interval,
+                             full_reconcile=args.full_reconcile)
     else:
         if args.all:
             print("🚀 Starting sync of ALL available transcripts")
             print("   Will try increasing limits to fetch all transcripts\n")
         else:
             print("🚀 Starting one-time sync of new transcripts\n")
-        sync_all_transcripts(continuous=False)
+        sync_all_transcripts(continuous=False, full_reconcile=args.full_reconcile)
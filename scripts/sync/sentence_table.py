@@ -0,0 +1,140 @@
+"""
+Columnar form of a transcript's sentences for vectorized grouping and packing.
+
+`SentenceTable` converts the sentence dicts once into NumPy columns
+(speaker_id, start_time, end_time) and joins every non-empty sentence text
+into one buffer with per-sentence offsets. Group boundaries (speaker changes
+and pauses over GROUP_GAP_MS) come from one `np.diff` pass, a group's text is
+a single slice of the buffer, and the meeting stats are a split of the
+buffer and an `np.unique`.
+
+`GroupPacker` packs encoded groups into chunks: the token counts are
+cumsummed once and each chunk's last group is a binary search in them, so
+Python only loops once per chunk instead of once per group. The overlap is
+cut from an encode of the chunk's last groups only (see `tail_groups`), as
+in the incremental path.
+
+Results are identical to ChunkingStrategy's incremental path, which is still
+used for streamed sentences, since those cannot be converted up front.
+Output values (times, speaker ids) are taken from the original Python values,
+never from the NumPy columns, so they serialize exactly as before.
+"""
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+GROUP_GAP_MS = 5000  # pause that starts a new group even without a speaker change
+
+# ASCII bytes str.split() treats as whitespace
+_ASCII_SPACE = np.zeros(256, dtype=bool)
+_ASCII_SPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+
+class SentenceTable:
+    """Sentence columns of one transcript"""
+
+    def __init__(self, sentences: Sequence[Dict]):
+        n = len(sentences)
+        self.speakers = [s.get("speaker_id", 0) for s in sentences]
+        self.start_times = [s.get("start_time", 0) for s in sentences]
+        end_times = [s.get("end_time") for s in sentences]
+        texts = [s.get("text") or "" for s in sentences]
+
+        self.end_times = [e if e is not None else 0 for e in end_times]
+        self.speaker_id = np.array(self.speakers, dtype=np.int64)
+        self.start_time = np.array(self.start_times, dtype=np.float64)
+        self.end_time = np.array(self.end_times, dtype=np.float64)
+        # A sentence without an end time ends, for gap detection, where it starts
+        has_end = np.array([e is not None for e in end_times], dtype=bool)
+        self._last_time = np.where(has_end, self.end_time, self.start_time)
+
+        # Non-empty texts joined by single spaces; sentence i owns texts [_text_rank[i], _text_rank[i+1])
+        nonempty = [t for t in texts if t]
+        self.text = " ".join(nonempty)
+        lengths = np.fromiter(map(len, nonempty), dtype=np.int64, count=len(nonempty))
+        self._text_start = np.concatenate(([0], np.cumsum(lengths + 1)))[:-1]
+        self._text_end = self._text_start + lengths
+        self._text_rank = np.concatenate(([0], np.cumsum(np.fromiter(map(bool, texts), dtype=np.int64, count=n))))
+
+    def __len__(self):
+        return len(self.speakers)
+
+    def word_count(self) -> int:
+        """Total of len(text.split()) over all sentences"""
+        # Texts are joined by spaces, so no word spans two sentences
+        if not self.text.isascii():
+            return len(self.text.split())
+        # A word starts at every non-space byte that follows a space (or opens the buffer)
+        space = _ASCII_SPACE[np.frombuffer(self.text.encode("ascii"), dtype=np.uint8)]
+        if not len(space):
+            return 0
+        return int(not space[0]) + int(np.count_nonzero(space[:-1] & ~space[1:]))
+
+    def speaker_count(self) -> int:
+        return len(np.unique(self.speaker_id))
+
+    def group_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(first, end) sentence index arrays of the groups, end exclusive"""
+        n = len(self)
+        if not n:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        new_group = np.ones(n, dtype=bool)
+        new_group[1:] = (np.diff(self.speaker_id) != 0) | (self.start_time[1:] - self._last_time[:-1] > GROUP_GAP_MS)
+        first = np.flatnonzero(new_group)
+        return first, np.append(first[1:], n)
+
+    def group_texts(self, first: np.ndarray, end: np.ndarray) -> List[str]:
+        """Space-joined non-empty texts of the sentence ranges [first, end)"""
+        if not len(self._text_start):
+            return [""] * len(first)
+        lo, hi = self._text_rank[first], self._text_rank[end]
+        has_text = hi > lo
+        # Clipped indexes are only read for ranges without text, which np.where then discards
+        starts = np.where(has_text, self._text_start[np.minimum(lo, len(self._text_start) - 1)], 0)
+        stops = np.where(has_text, self._text_end[np.maximum(hi - 1, 0)], 0)
+        text = self.text
+        return [text[a:b] for a, b in zip(starts.tolist(), stops.tolist())]
+
+
+class GroupPacker:
+    """Text and token counts of encoded groups, each followed by a separator"""
+
+    def __init__(self, texts: List[str], encoded: List[List[int]], separator: str):
+        self.groups = len(texts)
+        counts = np.fromiter(map(len, encoded), dtype=np.int64, count=self.groups)
+        # Cumulative token counts without separators; a chunk's end is one binary search in it
+        self._cum = np.concatenate(([0], np.cumsum(counts))).tolist()
+        self._text = separator.join(texts) + separator if texts else ""
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=self.groups)
+        self._text_offsets = np.concatenate(([0], np.cumsum(lengths + len(separator)))).tolist()
+
+    def next_end(self, first: int, head_tokens: int, chunk_size: int) -> int:
+        """
+        End (exclusive) of the chunk starting at group `first` with `head_tokens` of overlap
+
+        The first group is always taken; later ones while the chunk stays
+        within chunk_size.
+        """
+        limit = self._cum[first] + chunk_size - head_tokens
+        overflow = bisect_right(self._cum, limit)  # first prefix past the limit
+        return min(max(overflow, first + 2) - 1, self.groups)
+
+    def tokens(self, first: int, end: int) -> int:
+        """Tokens of groups [first, end) without separators"""
+        return self._cum[end] - self._cum[first]
+
+    def text(self, first: int, end: int) -> str:
+        """Text of groups [first, end) with separators"""
+        return self._text[self._text_offsets[first]:self._text_offsets[end]]
+
+    def tail_groups(self, first: int, end: int, shift: int) -> Iterator[Tuple[int, int]]:
+        """
+        (character offset, token count) of groups [first, end), last group first
+
+        Offsets are into a chunk text holding `shift` characters (the
+        overlap) before group `first`.
+        """
+        base = shift - self._text_offsets[first]
+        for g in range(end - 1, first - 1, -1):
+            yield base + self._text_offsets[g], self._cum[g + 1] - self._cum[g]
@@ -12,13 +12,13 @@ from datetime import datetime, timezone
 from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 import re
-import tiktoken
 import numpy as np
 from dotenv import load_dotenv
-import requests
-from openai import OpenAI
-from supabase import create_client
 import logging
+from fireflies_transport import get_transport
+from embeddings import create_embeddings, embedding_settings, request_dimensions
+from registry import get_openai, get_supabase, get_tokenizer
+from rate_limiter import execute_with_limit
 
 # Configure logging
 logging.basicConfig(
@@ -43,8 +43,7 @@ class Config:
     MIN_CHUNK_SIZE = 100  # Minimum tokens for a chunk
     
     # Embedding model
-    EMBEDDING_MODEL = "text-embedding-3-small"  # OpenAI's latest
-    EMBEDDING_DIMENSION = 1536  # For text-embedding-3-small
+    EMBEDDING_MODEL, EMBEDDING_DIMENSION = embedding_settings()  # EMBEDDING_MODEL/EMBEDDING_DIMENSIONS
     
     # Storage
     STORAGE_BUCKET = "meetings"
@@ -61,11 +60,7 @@ class FirefliesClient:
     
     def __init__(self):
         self.api_key = Config.FIREFLIES_API_KEY
-        self.base_url = "https://api.fireflies.ai/graphql"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        self.transport = get_transport(self.api_key)
     
     def fetch_transcript(self, transcript_id: str) -> Optional[Dict]:
         """Fetch detailed transcript with all metadata"""
@@ -97,11 +92,7 @@ class FirefliesClient:
         """
         
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={"query": query, "variables": {"id": transcript_id}}
-            )
+            response = self.transport.post(query, {"id": transcript_id})
             response.raise_for_status()
             
             data = response.json()
@@ -120,7 +111,7 @@ class ChunkingStrategy:
     """Advanced chunking strategy for optimal RAG performance"""
     
     def __init__(self):
-        self.tokenizer = tiktoken.encoding_for_model("gpt-4")
+        self.tokenizer = get_tokenizer(Config.EMBEDDING_MODEL)
     
     def create_chunks(
         self, 
@@ -303,8 +294,8 @@ class SupabaseUploader:
     """Handles all Supabase operations with optimizations"""
     
     def __init__(self):
-        self.supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
-        self.openai = OpenAI(api_key=Config.OPENAI_API_KEY)
+        self.supabase = get_supabase(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+        self.openai = get_openai(Config.OPENAI_API_KEY)
         self.chunker = ChunkingStrategy()
     
     def process_transcript(self, transcript: Dict) -> bool:
@@ -512,21 +503,17 @@ class SupabaseUploader:
                 }
                 
                 try:
-                    self.supabase.table("meeting_chunks").insert(chunk_data).execute()
+                    execute_with_limit(self.supabase.table("meeting_chunks").insert(chunk_data))
                 except Exception as e:
                     logger.error(f"Error storing chunk {chunk['index']}: {e}")
-            
-            time.sleep(0.5)  # Rate limiting
     
     def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using OpenAI"""
         
         try:
-            response = self.openai.embeddings.create(
-                model=Config.EMBEDDING_MODEL,
-                input=texts
-            )
-            return [item.embedding for item in response.data]
+            reduced = request_dimensions(Config.EMBEDDING_MODEL, Config.EMBEDDING_DIMENSION)
+            options = {"dimensions": reduced} if reduced else {}
+            return create_embeddings(self.openai, texts, Config.EMBEDDING_MODEL, **options)
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             return [[0] * Config.EMBEDDING_DIMENSION] * len(texts)
@@ -612,7 +599,6 @@ class SyncPipeline:
             try:
                 if self.sync_transcript(tid):
                     success_count += 1
-                time.sleep(2)  # Rate limiting
             except Exception as e:
                 logger.error(f"Error syncing {tid}: {e}")
         
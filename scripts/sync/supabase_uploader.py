@@ -3,13 +3,12 @@ Supabase integration for storing documents and embeddings.
 """
 import os
 import json
-import time
-import tiktoken
 from datetime import datetime, timezone
 from pathlib import Path
-from openai import OpenAI
-from supabase import create_client
 from dotenv import load_dotenv
+from registry import get_embedding_cache, get_embedding_provider, get_supabase, get_tokenizer
+from chunk_dedup import EmbeddingDedup
+from text_windows import chunk_text
 
 load_dotenv()
 
@@ -20,9 +19,13 @@ class SupabaseUploader:
         self.supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         self.openai_key = os.getenv("OPENAI_API_KEY")
         
-        self.supabase = create_client(self.supabase_url, self.supabase_key)
-        self.openai_client = OpenAI(api_key=self.openai_key)
-        self.tokenizer = tiktoken.encoding_for_model("text-embedding-3-small")
+        self.supabase = get_supabase(self.supabase_url, self.supabase_key)
+        self.tokenizer = get_tokenizer("text-embedding-3-small")
+        self.embedder = get_embedding_provider("text-embedding-3-small", self.openai_key)
+        # Chunks go to `documents`, not meeting_chunks, so only the run and the local cache are searched
+        self.dedup = EmbeddingDedup(
+            None, self.embedder.model, self.embedder, cache=get_embedding_cache(), dimensions=self.embedder.dimensions
+        )
         self.bucket = bucket_name
     
     def upload_to_storage(self, filepath):
@@ -43,33 +46,11 @@ class SupabaseUploader:
     
     def chunk_text(self, text, chunk_size=800, overlap=200):
         """Split text into overlapping chunks based on token count."""
-        tokens = self.tokenizer.encode(text)
-        chunks = []
-        start = 0
-        
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunk = self.tokenizer.decode(tokens[start:end])
-            chunks.append((start, end, chunk))
-            start += (chunk_size - overlap)
-        
-        return chunks
+        return chunk_text(text, self.tokenizer, chunk_size, overlap)
     
-    def embed_chunk(self, text, retries=3):
-        """Generate embedding for text chunk with retry logic."""
-        for attempt in range(retries):
-            try:
-                res = self.openai_client.embeddings.create(
-                    model="text-embedding-3-small", 
-                    input=text
-                )
-                return res.data[0].embedding
-            except Exception as e:
-                if attempt < retries - 1:
-                    print(f"Retrying embedding (attempt {attempt + 1}): {e}")
-                    time.sleep(1)
-                else:
-                    raise RuntimeError(f"Embedding failed after {retries} attempts: {e}")
+    def embed_chunk(self, text):
+        """Generate embedding for a text chunk, reusing a cached one."""
+        return self.dedup.embed_one(text)[1]
     
     def store_document_metadata(self, transcript_id, title, url):
         """Store document metadata in Supabase."""
@@ -84,14 +65,15 @@ class SupabaseUploader:
     
     def store_document_chunks(self, transcript_id, title, filename, chunks):
         """Store document chunks with embeddings in Supabase."""
-        for i, (start, end, chunk) in enumerate(chunks):
-            embedding = self.embed_chunk(chunk)
-            
+        # Every chunk not embedded before goes out in one concurrent, packed call
+        _, embeddings = self.dedup.embed([window[2] for window in chunks])
+        for i, ((start, end, chunk, char_start, char_end), embedding) in enumerate(zip(chunks, embeddings)):
             self.supabase.table("documents").insert({
                 "title": title,
                 "content": chunk,
                 "metadata": json.dumps({
                     "loc": {"from": start, "to": end},
+                    "chars": {"from": char_start, "to": char_end},
                     "file": filename,
                     "chunk_index": i,
                     "metadata_id": transcript_id
@@ -100,7 +82,7 @@ class SupabaseUploader:
                 "created_at": datetime.now(timezone.utc).isoformat()
             }).execute()
         
-        print(f"✅ {len(chunks)} chunks stored for {title}")
+        print(f"✅ {len(chunks)} chunks stored for {title} ({self.dedup.describe()})")
     
     def process_and_store(self, transcript, markdown_text, filepath):
         """Complete pipeline to store document and its embeddings."""
@@ -3,30 +3,77 @@ Adapter for the existing meetings table schema.
 Works with the current schema while the full migration happens.
 """
 import os
-import json
-import time
-import tiktoken
 from datetime import datetime, timezone
 from pathlib import Path
-from openai import OpenAI
-from supabase import create_client
 from dotenv import load_dotenv
+from registry import get_embedding_cache, get_embedding_provider, get_supabase, get_tokenizer
+from chunk_dedup import EmbeddingDedup
+from text_windows import chunk_text
+from rate_limiter import execute_with_limit
 
 load_dotenv()
 
+CHUNK_INSERT_BATCH_SIZE = 100  # meeting_chunks rows per insert
+
+
+def chunk_embeddings(supabase, openai_key):
+    """
+    (embedding backend, EmbeddingDedup) for an uploader writing meeting_chunks
+
+    Model and size come from EMBEDDING_MODEL/EMBEDDING_DIMENSIONS, and a
+    column holding vectors of another model or size stops the uploader here.
+    """
+    embedder = get_embedding_provider(api_key=openai_key)
+    dedup = EmbeddingDedup(
+        supabase, embedder.model, embedder, cache=get_embedding_cache(), dimensions=embedder.dimensions
+    )
+    dedup.check_column()
+    return embedder, dedup
+
+
+def store_chunk_rows(supabase, dedup, rows, defer=False):
+    """
+    Embed the rows' content and insert them into meeting_chunks; returns (stored, deferred) counts
+
+    Identical chunks reuse a cached or stored embedding; the rest go to the
+    configured backend (with OpenAI, all of the meeting's chunks packed into
+    as few requests as possible, sent concurrently under the shared rate
+    budget). Each row gets its `embedding` and `metadata.content_hash`. With
+    `defer`, chunks never embedded before are stored without a vector, for
+    batch_backfill.py to fill in. Embedding errors are raised; inserts that
+    fail are reported and skipped.
+    """
+    hashes, embeddings = (dedup.lookup if defer else dedup.embed)([row["content"] for row in rows])
+    for row, content_hash, embedding in zip(rows, hashes, embeddings):
+        row["embedding"] = embedding
+        row["metadata"] = {**row.get("metadata", {}), "content_hash": content_hash}
+
+    stored = 0
+    for i in range(0, len(rows), CHUNK_INSERT_BATCH_SIZE):
+        batch = rows[i:i + CHUNK_INSERT_BATCH_SIZE]
+        try:
+            execute_with_limit(supabase.table("meeting_chunks").insert(batch))
+            stored += len(batch)
+        except Exception as e:
+            print(f"\n   ⚠️  Error storing chunks {batch[0]['chunk_index']}-{batch[-1]['chunk_index']}: {str(e)[:100]}")
+    return stored, sum(1 for embedding in embeddings if embedding is None)
+
 
 class SupabaseUploaderAdapter:
     """Adapter that works with the existing meetings table schema"""
     
+    # Store chunks never embedded before without a vector, for batch_backfill.py to fill in
+    defer_embeddings = False
+    
     def __init__(self):
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         self.openai_key = os.getenv("OPENAI_API_KEY")
         
-        self.supabase = create_client(self.supabase_url, self.supabase_key)
-        self.openai_client = OpenAI(api_key=self.openai_key)
-        self.tokenizer = tiktoken.encoding_for_model("text-embedding-ada-002")
+        self.supabase = get_supabase(self.supabase_url, self.supabase_key)
+        self.tokenizer = get_tokenizer("text-embedding-ada-002")
         self.bucket = "meetings"  # Use existing bucket
+        self.embedder, self.dedup = chunk_embeddings(self.supabase, self.openai_key)
     
     def ensure_storage_bucket(self):
         """Ensure the storage bucket exists."""
@@ -100,63 +147,41 @@ class SupabaseUploaderAdapter:
     
     def chunk_text(self, text, chunk_size=800, overlap=200):
         """Simple text chunking."""
-        tokens = self.tokenizer.encode(text)
-        chunks = []
-        start = 0
-        
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunk = self.tokenizer.decode(tokens[start:end])
-            chunks.append((start, end, chunk))
-            start += (chunk_size - overlap)
-        
-        return chunks
+        return chunk_text(text, self.tokenizer, chunk_size, overlap)
     
-    def embed_text(self, text, retries=3):
-        """Generate embedding for text with retry logic."""
-        for attempt in range(retries):
-            try:
-                res = self.openai_client.embeddings.create(
-                    model="text-embedding-ada-002",
-                    input=text
-                )
-                return res.data[0].embedding
-            except Exception as e:
-                if attempt < retries - 1:
-                    print(f"   Retrying embedding (attempt {attempt + 1}): {e}")
-                    time.sleep(1)
-                else:
-                    raise RuntimeError(f"Embedding failed after {retries} attempts: {e}")
+    def embed_text(self, text):
+        """Generate embedding for text, reusing a cached or stored one."""
+        return self.dedup.embed_one(text)[1]
     
     def store_meeting_chunks(self, meeting_id, project_id, chunks, title):
         """Store meeting chunks in the meeting_chunks table."""
-        stored = 0
-        
-        for i, (start, end, chunk_text) in enumerate(chunks):
-            try:
-                print(f"   📊 Processing chunk {i+1}/{len(chunks)}...", end="\r")
-                embedding = self.embed_text(chunk_text)
-                
-                chunk_data = {
-                    "meeting_id": meeting_id,
-                    "project_id": project_id,
-                    "chunk_index": i,
-                    "content": chunk_text,
-                    "embedding": embedding,
-                    "metadata": json.dumps({
-                        "token_range": {"start": start, "end": end},
-                        "chunk_number": i + 1,
-                        "total_chunks": len(chunks)
-                    })
+        rows = [
+            {
+                "meeting_id": meeting_id,
+                "project_id": project_id,
+                "chunk_index": i,
+                "content": chunk_text,
+                "metadata": {
+                    "token_range": {"start": start, "end": end},
+                    "char_range": {"start": char_start, "end": char_end},
+                    "chunk_number": i + 1,
+                    "total_chunks": len(chunks),
+                    "meeting_title": title
                 }
-                
-                self.supabase.table("meeting_chunks").insert(chunk_data).execute()
-                stored += 1
-                
-            except Exception as e:
-                print(f"\n   ⚠️  Error storing chunk {i}: {str(e)[:100]}")
+            }
+            for i, (start, end, chunk_text, char_start, char_end) in enumerate(chunks)
+        ]
+        
+        try:
+            stored, deferred = store_chunk_rows(self.supabase, self.dedup, rows, self.defer_embeddings)
+        except Exception as e:
+            print(f"   ⚠️  Error embedding chunks: {str(e)[:100]}")
+            return False
         
-        print(f"\n   ✅ {stored}/{len(chunks)} chunks stored with embeddings")
+        if deferred:
+            print(f"\n   ✅ {stored}/{len(chunks)} chunks stored, {deferred} awaiting the Batch API")
+        else:
+            print(f"\n   ✅ {stored}/{len(chunks)} chunks stored with embeddings")
         return stored > 0
     
     def process_and_store(self, transcript, markdown_text, filepath):
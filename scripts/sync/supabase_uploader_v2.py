@@ -8,13 +8,12 @@ This version:
 """
 import os
 import json
-import time
-import tiktoken
 from datetime import datetime, timezone
 from pathlib import Path
-from openai import OpenAI
-from supabase import create_client
 from dotenv import load_dotenv
+from registry import get_supabase, get_tokenizer
+from supabase_uploader_adapter import chunk_embeddings, store_chunk_rows
+from text_windows import chunk_text
 import numpy as np
 
 load_dotenv()
@@ -26,10 +25,10 @@ class SupabaseUploaderV2:
         self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         self.openai_key = os.getenv("OPENAI_API_KEY")
         
-        self.supabase = create_client(self.supabase_url, self.supabase_key)
-        self.openai_client = OpenAI(api_key=self.openai_key)
-        self.tokenizer = tiktoken.encoding_for_model("text-embedding-ada-002")
+        self.supabase = get_supabase(self.supabase_url, self.supabase_key)
+        self.tokenizer = get_tokenizer("text-embedding-ada-002")
         self.bucket = "fireflies-transcripts"  # Updated bucket name
+        self.embedder, self.dedup = chunk_embeddings(self.supabase, self.openai_key)
     
     def ensure_storage_bucket(self):
         """Ensure the storage bucket exists."""
@@ -197,30 +196,17 @@ class SupabaseUploaderV2:
         
         return chunks
     
-    def embed_text(self, text, retries=3):
-        """Generate embedding for text with retry logic."""
-        for attempt in range(retries):
-            try:
-                res = self.openai_client.embeddings.create(
-                    model="text-embedding-ada-002",  # Using ada-002 for 1536 dimensions
-                    input=text
-                )
-                return res.data[0].embedding
-            except Exception as e:
-                if attempt < retries - 1:
-                    print(f"Retrying embedding (attempt {attempt + 1}): {e}")
-                    time.sleep(1)
-                else:
-                    raise RuntimeError(f"Embedding failed after {retries} attempts: {e}")
+    def embed_text(self, text):
+        """Generate embedding for text, reusing a cached or stored one."""
+        return self.dedup.embed_one(text)[1]
     
     def store_meeting_chunks(self, meeting_id, project_id, chunks, participants):
         """Store meeting chunks with embeddings in the meeting_chunks table."""
         # Create speaker map
         speaker_map = {i: email.split("@")[0] for i, email in enumerate(participants[1:])}
         
+        rows = []
         for i, chunk in enumerate(chunks):
-            embedding = self.embed_text(chunk["text"])
-            
             # Map speaker IDs to names
             speaker_names = [speaker_map.get(sid, f"Speaker {sid}") for sid in chunk["speakers"]]
             
@@ -229,23 +215,22 @@ class SupabaseUploaderV2:
                 "project_id": project_id,
                 "chunk_index": i,
                 "content": chunk["text"],
-                "embedding": embedding,
                 "speaker_info": json.dumps({
                     "speakers": speaker_names,
                     "speaker_ids": chunk["speakers"]
                 }),
                 "start_timestamp": chunk["start_time"],
                 "end_timestamp": chunk["end_time"],
-                "metadata": json.dumps({
+                "metadata": {
                     "sentence_count": chunk["sentence_count"],
                     "chunk_number": i + 1,
                     "total_chunks": len(chunks)
-                })
+                }
             }
-            
-            self.supabase.table("meeting_chunks").insert(chunk_data).execute()
+            rows.append(chunk_data)
         
-        print(f"✅ {len(chunks)} chunks stored with embeddings")
+        stored, _ = store_chunk_rows(self.supabase, self.dedup, rows)
+        print(f"✅ {stored}/{len(chunks)} chunks stored with embeddings ({self.dedup.describe()})")
     
     def process_and_store(self, transcript, markdown_text, filepath):
         """Complete pipeline to store meeting and its chunks with embeddings."""
@@ -285,17 +270,7 @@ class SupabaseUploaderV2:
     
     def chunk_text(self, text, chunk_size=800, overlap=200):
         """Simple text chunking fallback (when no sentence data available)."""
-        tokens = self.tokenizer.encode(text)
-        chunks = []
-        start = 0
-        
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunk = self.tokenizer.decode(tokens[start:end])
-            chunks.append((start, end, chunk))
-            start += (chunk_size - overlap)
-        
-        return chunks
+        return chunk_text(text, self.tokenizer, chunk_size, overlap)
 
 
 # Quick test function
@@ -4,7 +4,6 @@ Processes from most recent to oldest
 """
 import os
 import sys
-import time
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -27,54 +26,6 @@ class FullSyncUploader(SupabaseUploaderAdapter):
         self.processed_count = 0
         self.skip_count = 0
         self.error_count = 0
-        
-    def embed_text(self, text, retries=3):
-        """Generate embedding for text with retry logic."""
-        for attempt in range(retries):
-            try:
-                res = self.openai_client.embeddings.create(
-                    model="text-embedding-ada-002",
-                    input=text
-                )
-                return res.data[0].embedding
-            except Exception as e:
-                if attempt < retries - 1:
-                    print(f"   Retrying embedding (attempt {attempt + 1}): {str(e)[:50]}")
-                    time.sleep(1)
-                else:
-                    raise RuntimeError(f"Embedding failed after {retries} attempts: {e}")
-    
-    def store_meeting_chunks(self, meeting_id, project_id, chunks, title):
-        """Store meeting chunks with embeddings"""
-        stored = 0
-        
-        for i, (start, end, chunk_text) in enumerate(chunks):
-            try:
-                print(f"   📊 Processing chunk {i+1}/{len(chunks)}...", end="\r")
-                embedding = self.embed_text(chunk_text)
-                
-                chunk_data = {
-                    "meeting_id": meeting_id,
-                    "chunk_index": i,
-                    "content": chunk_text,
-                    "embedding": embedding,
-                    "metadata": {
-                        "token_range": {"start": start, "end": end},
-                        "chunk_number": i + 1,
-                        "total_chunks": len(chunks),
-                        "project_id": project_id,
-                        "meeting_title": title
-                    }
-                }
-                
-                self.supabase.table("meeting_chunks").insert(chunk_data).execute()
-                stored += 1
-                
-            except Exception as e:
-                print(f"\n   ⚠️  Error storing chunk {i}: {str(e)[:100]}")
-        
-        print(f"\n   ✅ {stored}/{len(chunks)} chunks stored with embeddings")
-        return stored > 0
     
     def get_stats(self):
         """Get processing statistics"""
@@ -238,11 +189,6 @@ def sync_all_transcripts(limit=None, skip_existing=True):
             else:
                 uploader.skip_count += 1
                 print("   ⏩ Skipped (already exists)")
-            
-            # Rate limiting
-            if i % 5 == 0:
-                print("\n⏸️  Pausing for rate limit...")
-                time.sleep(2)
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Sync interrupted by user")
@@ -266,6 +212,9 @@ def sync_all_transcripts(limit=None, skip_existing=True):
     print(f"   ⏩ Skipped: {stats['skipped']}")
     print(f"   ❌ Errors: {stats['errors']}")
     print(f"   📋 Total attempted: {len(transcripts_to_process)}")
+    print(f"   🔌 {fireflies.transport.describe_stats()}")
+    print(f"   ♻️  {uploader.dedup.describe()}")
+    print(f"   📦 {uploader.embedder.describe()}")
     
     # Verify in database
     print("\n🔍 Verifying database...")
@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sync.fireflies_client import FirefliesClient
 from sync.markdown_converter import MarkdownConverter
 from sync.supabase_uploader_adapter import SupabaseUploaderAdapter
+from sync.sync_state import load_watermark, save_watermark, advance_watermark, describe_watermark
 from supabase import create_client
 from openai import OpenAI
 import tiktoken
@@ -37,10 +38,10 @@ signal.signal(signal.SIGTERM, signal_handler)
 class EnhancedFirefliesClient(FirefliesClient):
     """Enhanced client that can fetch all available transcripts"""
     
-    def fetch_all_transcripts(self, batch_size=50):
-        """Fetch ALL available transcripts using proper pagination"""
+    def fetch_all_transcripts(self, batch_size=50, from_date=None):
+        """Fetch ALL available transcripts (or all since from_date) using proper pagination"""
         # Use the new paginated method
-        return self.fetch_all_transcripts_paginated(batch_size=batch_size)
+        return self.fetch_all_transcripts_paginated(batch_size=batch_size, from_date=from_date)
 
 
 class FullSyncUploader(SupabaseUploaderAdapter):
@@ -51,54 +52,6 @@ class FullSyncUploader(SupabaseUploaderAdapter):
         self.processed_count = 0
         self.skip_count = 0
         self.error_count = 0
-        
-    def embed_text(self, text, retries=3):
-        """Generate embedding for text with retry logic."""
-        for attempt in range(retries):
-            try:
-                res = self.openai_client.embeddings.create(
-                    model="text-embedding-ada-002",
-                    input=text
-                )
-                return res.data[0].embedding
-            except Exception as e:
-                if attempt < retries - 1:
-                    print(f"   Retrying embedding (attempt {attempt + 1}): {str(e)[:50]}")
-                    time.sleep(1)
-                else:
-                    raise RuntimeError(f"Embedding failed after {retries} attempts: {e}")
-    
-    def store_meeting_chunks(self, meeting_id, project_id, chunks, title):
-        """Store meeting chunks with embeddings"""
-        stored = 0
-        
-        for i, (start, end, chunk_text) in enumerate(chunks):
-            try:
-                print(f"   📊 Processing chunk {i+1}/{len(chunks)}...", end="\r")
-                embedding = self.embed_text(chunk_text)
-                
-                chunk_data = {
-                    "meeting_id": meeting_id,
-                    "chunk_index": i,
-                    "content": chunk_text,
-                    "embedding": embedding,
-                    "metadata": {
-                        "token_range": {"start": start, "end": end},
-                        "chunk_number": i + 1,
-                        "total_chunks": len(chunks),
-                        "project_id": project_id,
-                        "meeting_title": title
-                    }
-                }
-                
-                self.supabase.table("meeting_chunks").insert(chunk_data).execute()
-                stored += 1
-                
-            except Exception as e:
-                print(f"\n   ⚠️  Error storing chunk {i}: {str(e)[:100]}")
-        
-        print(f"\n   ✅ {stored}/{len(chunks)} chunks stored with embeddings")
-        return stored > 0
 
 
 def get_existing_transcript_ids():
@@ -126,13 +79,32 @@ def get_existing_transcript_ids():
     return existing_ids
 
 
-def sync_all_transcripts(continuous=False, interval_minutes=30):
+def store_watermark(uploader, fireflies, watermark, listed_transcripts, synced_ids, errors):
+    """Advance the watermark past the oldest run of synced transcripts and record the run"""
+    if fireflies.last_listing_complete:
+        new_watermark = advance_watermark(watermark, listed_transcripts, synced_ids)
+    else:
+        print("   ⚠️  Listing was incomplete; keeping the previous watermark")
+        new_watermark = watermark
+    
+    save_watermark(
+        uploader.supabase,
+        new_watermark,
+        status="completed" if errors == 0 else "failed",
+        error_message=f"{errors} transcripts failed to sync" if errors else None
+    )
+    print(f"   📍 Watermark: {describe_watermark(new_watermark)}")
+
+
+def sync_all_transcripts(continuous=False, interval_minutes=30, full_reconcile=False):
     """
     Sync all transcripts from Fireflies to Supabase
     
     Args:
         continuous: If True, run continuously every interval_minutes
         interval_minutes: Minutes between syncs (default 30)
+        full_reconcile: If True, list the entire Fireflies history on the first
+            run instead of only transcripts since the stored watermark
     """
     global keep_running
     
@@ -162,12 +134,22 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
             existing_ids = get_existing_transcript_ids()
             print(f"📊 Found {len(existing_ids)} transcripts already in database")
             
-            # Fetch ALL transcripts
-            print("\n📥 Fetching ALL transcripts from Fireflies...")
-            all_transcripts = fireflies.fetch_all_transcripts()
+            # Only list what is newer than the watermark unless reconciling
+            watermark = None
+            if not full_reconcile:
+                watermark = load_watermark(uploader.supabase)
+            print(f"📍 Watermark: {describe_watermark(watermark)}")
+            
+            print("\n📥 Fetching transcripts from Fireflies...")
+            all_transcripts = fireflies.fetch_all_transcripts(
+                from_date=watermark["date"] if watermark else None
+            )
             
             if not all_transcripts:
-                print("❌ No transcripts retrieved from Fireflies")
+                if watermark and fireflies.last_listing_complete:
+                    print("✅ No new transcripts since the watermark")
+                else:
+                    print("❌ No transcripts retrieved from Fireflies")
                 if continuous:
                     print(f"\n⏰ Waiting {interval_minutes} minutes until next sync...")
                     time.sleep(interval_minutes * 60)
@@ -175,7 +157,7 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
                 else:
                     return
             
-            print(f"\n📊 Fireflies has {len(all_transcripts)} total transcripts")
+            print(f"\n📊 Fireflies listed {len(all_transcripts)} transcripts")
             
             # Sort by date (most recent first)
             all_transcripts.sort(key=lambda x: x['date'], reverse=True)
@@ -187,6 +169,8 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
             
             if not new_transcripts:
                 print("✅ All transcripts are already synced!")
+                store_watermark(uploader, fireflies, watermark, all_transcripts, existing_ids, 0)
+                full_reconcile = False
                 if continuous:
                     print(f"\n⏰ Waiting {interval_minutes} minutes until next sync...")
                     time.sleep(interval_minutes * 60)
@@ -198,6 +182,7 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
             processed = 0
             skipped = 0
             errors = 0
+            synced_ids = set(existing_ids)
             
             for i, transcript_summary in enumerate(new_transcripts, 1):
                 if not keep_running:
@@ -242,11 +227,7 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
                     else:
                         skipped += 1
                         print("   ⏩ Skipped (already exists)")
-                    
-                    # Rate limiting
-                    if i % 5 == 0 and i < len(new_transcripts):
-                        print("\n⏸️  Rate limit pause (2 seconds)...")
-                        time.sleep(2)
+                    synced_ids.add(transcript_id)
                         
                 except KeyboardInterrupt:
                     keep_running = False
@@ -263,6 +244,13 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
             print(f"   ⏩ Skipped: {skipped}")
             print(f"   ❌ Errors: {errors}")
             print(f"   📋 Total attempted: {len(new_transcripts)}")
+            print(f"   🔌 {fireflies.transport.describe_stats()}")
+            print(f"   ♻️  {uploader.dedup.describe()}")
+            print(f"   📦 {uploader.embedder.describe()}")
+            uploader.dedup.reset_counts()
+            uploader.embedder.reset_counts()
+            store_watermark(uploader, fireflies, watermark, all_transcripts, synced_ids, errors)
+            full_reconcile = False
             
             # Verify totals
             supabase_url = os.getenv("SUPABASE_URL")
@@ -276,8 +264,9 @@ def sync_all_transcripts(continuous=False, interval_minutes=30):
             print(f"   Meetings: {meetings_count.count}")
             print(f"   Chunks: {chunks_count.count}")
             
-            completion_rate = (meetings_count.count / len(all_transcripts) * 100) if all_transcripts else 100
-            print(f"   Sync completion: {completion_rate:.1f}%")
+            if watermark is None:
+                completion_rate = (meetings_count.count / len(all_transcripts) * 100) if all_transcripts else 100
+                print(f"   Sync completion: {completion_rate:.1f}%")
             
         except Exception as e:
             print(f"\n❌ Sync error: {str(e)}")
@@ -307,13 +296,16 @@ if __name__ == "__main__":
                         help='Minutes between syncs in continuous mode (default: 30)')
     parser.add_argument('--once', action='store_true', default=True,
                         help='Run once and exit (default)')
+    parser.add_argument('--full-reconcile', action='store_true',
+                        help='List the entire Fireflies history instead of only transcripts since the last watermark')
     
     args = parser.parse_args()
     
     if args.continuous:
         print(f"🔄 Starting continuous sync (every {args.interval} minutes)")
         print("   Press Ctrl+C to stop gracefully")
-        sync_all_transcripts(continuous=True, interval_minutes=args.interval)
+        sync_all_transcripts(continuous=True, interval_minutes=args.interval,
+                             full_reconcile=args.full_reconcile)
     else:
         print("🚀 Starting one-time sync of ALL transcripts")
-        sync_all_transcripts(continuous=False)
\ No newline at end of file
+        sync_all_transcripts(continuous=False, full_reconcile=args.full_reconcile)
\ No newline at end of file
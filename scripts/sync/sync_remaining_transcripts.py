@@ -5,7 +5,6 @@ Designed to handle 500+ transcripts efficiently
 """
 import os
 import sys
-import time
 import signal
 from datetime import datetime
 
@@ -19,6 +18,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from fireflies_client import FirefliesClient
 from markdown_converter import MarkdownConverter
 from supabase_uploader_adapter import SupabaseUploaderAdapter
+from batch_backfill import BatchBackfill
+from sync_state import load_watermark, save_watermark, advance_watermark, describe_watermark
 from supabase import create_client
 
 # Global flag for graceful shutdown
@@ -42,21 +43,6 @@ class EfficientSyncUploader(SupabaseUploaderAdapter):
         self.processed_count = 0
         self.skip_count = 0
         self.error_count = 0
-        
-    def embed_text(self, text, retries=2):
-        """Generate embedding with fewer retries for speed"""
-        for attempt in range(retries):
-            try:
-                res = self.openai_client.embeddings.create(
-                    model="text-embedding-ada-002",
-                    input=text
-                )
-                return res.data[0].embedding
-            except Exception as e:
-                if attempt < retries - 1:
-                    time.sleep(0.5)
-                else:
-                    raise RuntimeError(f"Embedding failed: {e}")
 
 
 def get_synced_ids():
@@ -90,13 +76,17 @@ def get_synced_ids():
     return existing_ids
 
 
-def sync_remaining(start_from=0, batch_size=10):
+def sync_remaining(start_from=0, batch_size=10, full_reconcile=False, batch_api=False):
     """
     Sync remaining transcripts with ability to start from specific index
     
     Args:
         start_from: Index to start from (for resuming)
         batch_size: Number to process before saving progress
+        full_reconcile: List the entire Fireflies history instead of only
+            transcripts since the stored watermark
+        batch_api: Store new chunks without embeddings and embed them
+            through the OpenAI Batch API at the end (half price)
     """
     global keep_running
     
@@ -107,15 +97,25 @@ def sync_remaining(start_from=0, batch_size=10):
     fireflies = FirefliesClient()
     converter = MarkdownConverter()
     uploader = EfficientSyncUploader()
+    backfill = None
+    if batch_api:
+        backfill = BatchBackfill(uploader.supabase, uploader.dedup)
+        uploader.defer_embeddings = True
     
     # Get existing IDs
     existing_ids = get_synced_ids()
     print(f"📊 Found {len(existing_ids)} already synced transcripts\n")
     
-    # Fetch all transcripts using pagination
-    print("📥 Fetching all transcripts from Fireflies...")
-    all_transcripts = fireflies.fetch_all_transcripts_paginated(batch_size=50)
-    print(f"✅ Found {len(all_transcripts)} total transcripts\n")
+    # Only list what is newer than the watermark unless reconciling
+    watermark = None if full_reconcile else load_watermark(uploader.supabase)
+    print(f"📍 Watermark: {describe_watermark(watermark)}")
+    
+    print("📥 Fetching transcripts from Fireflies...")
+    all_transcripts = fireflies.fetch_all_transcripts_paginated(
+        batch_size=50,
+        from_date=watermark["date"] if watermark else None
+    )
+    print(f"✅ Found {len(all_transcripts)} listed transcripts\n")
     
     # Sort by date (most recent first)
     all_transcripts.sort(key=lambda x: x['date'], reverse=True)
@@ -127,7 +127,7 @@ def sync_remaining(start_from=0, batch_size=10):
             new_transcripts.append(t)
     
     print(f"📊 Summary:")
-    print(f"   Total in Fireflies: {len(all_transcripts)}")
+    print(f"   Listed from Fireflies: {len(all_transcripts)}")
     print(f"   Already synced: {len(existing_ids)}")
     print(f"   To be synced: {len(new_transcripts)}")
     
@@ -137,6 +137,8 @@ def sync_remaining(start_from=0, batch_size=10):
     
     if not new_transcripts:
         print("\n✅ All transcripts are already synced!")
+        if fireflies.last_listing_complete:
+            save_watermark(uploader.supabase, advance_watermark(watermark, all_transcripts, existing_ids))
         return
     
     print(f"\n🔄 Processing {len(new_transcripts)} transcripts...\n")
@@ -144,6 +146,7 @@ def sync_remaining(start_from=0, batch_size=10):
     # Process in batches
     processed_in_batch = 0
     total_processed = start_from
+    synced_ids = set(existing_ids)
     
     for i, transcript_summary in enumerate(new_transcripts):
         if not keep_running:
@@ -155,7 +158,7 @@ def sync_remaining(start_from=0, batch_size=10):
         date = datetime.fromtimestamp(transcript_summary["date"] / 1000).strftime("%Y-%m-%d")
         
         current_index = start_from + i + 1
-        total_remaining = len(all_transcripts) - len(existing_ids)
+        total_remaining = start_from + len(new_transcripts)
         
         print(f"{'='*60}")
         print(f"🔄 [{current_index}/{total_remaining}] {title[:50]}...")
@@ -181,6 +184,7 @@ def sync_remaining(start_from=0, batch_size=10):
             else:
                 uploader.skip_count += 1
                 print(" | ⏩ Skipped")
+            synced_ids.add(transcript_id)
             
             processed_in_batch += 1
             total_processed += 1
@@ -191,9 +195,6 @@ def sync_remaining(start_from=0, batch_size=10):
                 print(f"   Continue from index {total_processed} if interrupted\n")
                 processed_in_batch = 0
                 
-                # Brief pause to avoid rate limits
-                time.sleep(1)
-                
         except KeyboardInterrupt:
             keep_running = False
             break
@@ -207,6 +208,11 @@ def sync_remaining(start_from=0, batch_size=10):
                 print(f"\n⚠️  Multiple errors. Current index: {total_processed}")
                 print("   Consider resuming from this index\n")
     
+    if backfill:
+        # A shutdown signal stops the waiting; the batches finish with batch_backfill.py
+        print(f"\n📦 Embedding the new chunks through the Batch API...")
+        backfill.run(keep_waiting=lambda: keep_running)
+    
     # Final summary
     print(f"\n{'='*60}")
     print(f"📊 Sync Summary:")
@@ -214,6 +220,23 @@ def sync_remaining(start_from=0, batch_size=10):
     print(f"   ⏩ Skipped: {uploader.skip_count}")
     print(f"   ❌ Errors: {uploader.error_count}")
     print(f"   📍 Last index: {total_processed}")
+    print(f"   🔌 {fireflies.transport.describe_stats()}")
+    if backfill:
+        print(f"   📦 {backfill.describe()}")
+    
+    # Advance the watermark past the oldest run of synced transcripts
+    if fireflies.last_listing_complete:
+        new_watermark = advance_watermark(watermark, all_transcripts, synced_ids)
+    else:
+        print("   ⚠️  Listing was incomplete; keeping the previous watermark")
+        new_watermark = watermark
+    save_watermark(
+        uploader.supabase,
+        new_watermark,
+        status="completed" if uploader.error_count == 0 else "failed",
+        error_message=f"{uploader.error_count} transcripts failed to sync" if uploader.error_count else None
+    )
+    print(f"   📍 Watermark: {describe_watermark(new_watermark)}")
     
     if total_processed < len(new_transcripts):
         print(f"\n💡 To resume, run:")
@@ -230,7 +253,12 @@ if __name__ == "__main__":
                         help='Index to start from (for resuming)')
     parser.add_argument('--batch', type=int, default=10,
                         help='Number to process before checkpoint (default: 10)')
+    parser.add_argument('--full-reconcile', action='store_true',
+                        help='List the entire Fireflies history instead of only transcripts since the last watermark')
+    parser.add_argument('--batch-api', action='store_true',
+                        help='Embed new chunks through the OpenAI Batch API (half price, results within 24h)')
     
     args = parser.parse_args()
     
-    sync_remaining(start_from=args.start, batch_size=args.batch)
\ No newline at end of file
+    sync_remaining(start_from=args.start, batch_size=args.batch, full_reconcile=args.full_reconcile,
+                   batch_api=args.batch_api)
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+High-water mark bookkeeping for incremental Fireflies syncs.
+
+The mark is the latest (meeting date, Fireflies ID) up to which every listed
+transcript is known to be in Supabase. It lives in the `sync_status` table
+(`metadata.watermark`) so each run only asks Fireflies for transcripts whose
+`date` is at or after the mark, via the `fromDate` filter.
+"""
+from datetime import datetime, timezone
+
+SYNC_TYPE = "fireflies"
+
+
+def to_graphql_datetime(date_ms):
+    """Format a Fireflies millisecond timestamp for DateTime filters such as fromDate."""
+    moment = datetime.fromtimestamp(date_ms / 1000, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _get_status_row(supabase, sync_type):
+    result = (
+        supabase.table("sync_status")
+        .select("id, metadata")
+        .eq("sync_type", sync_type)
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
+def load_watermark(supabase, sync_type=SYNC_TYPE):
+    """Return the stored {"date": ms, "id": str} mark, or None if there is none yet."""
+    row = _get_status_row(supabase, sync_type)
+    if not row:
+        return None
+
+    watermark = (row.get("metadata") or {}).get("watermark")
+    if not watermark or watermark.get("date") is None:
+        return None
+    return watermark
+
+
+def save_watermark(supabase, watermark, sync_type=SYNC_TYPE, status="completed", error_message=None):
+    """Persist the mark and the outcome of the run that produced it."""
+    now = datetime.now(timezone.utc).isoformat()
+    row = _get_status_row(supabase, sync_type)
+
+    metadata = dict((row or {}).get("metadata") or {})
+    if watermark:
+        metadata["watermark"] = watermark
+
+    update = {
+        "last_sync_at": now,
+        "status": status,
+        "error_message": error_message,
+        "metadata": metadata,
+    }
+    if status == "completed":
+        update["last_successful_sync_at"] = now
+
+    if row:
+        supabase.table("sync_status").update(update).eq("id", row["id"]).execute()
+    else:
+        supabase.table("sync_status").insert({"sync_type": sync_type, **update}).execute()
+
+
+def advance_watermark(current, listed_transcripts, synced_ids):
+    """
+    Move the mark forward over the oldest listed transcripts that are synced.
+
+    Stops at the first listed transcript that is still missing, so a failed
+    transcript is listed again on the next incremental run.
+    """
+    watermark = current
+    for transcript in sorted(listed_transcripts, key=lambda t: (t["date"], t["id"])):
+        if transcript["id"] not in synced_ids:
+            break
+        if watermark is None or (transcript["date"], transcript["id"]) > (watermark["date"], watermark["id"]):
+            watermark = {"date": transcript["date"], "id": transcript["id"]}
+    return watermark
+
+
+def describe_watermark(watermark):
+    if not watermark:
+        return "none (full listing)"
+    return f"{to_graphql_datetime(watermark['date'])} ({watermark['id']})"
@@ -0,0 +1,84 @@
+"""
+Fixed-size, overlapping token windows over a text.
+
+The text is tokenized once and window boundaries are mapped to character
+offsets from the token byte lengths, so each window is a slice of the
+original string rather than a decode of its tokens. Windows carry both the
+token range (the `loc` stored in chunk metadata) and the character range,
+which points at the exact source position of the chunk for highlighting.
+
+`chunk_texts` windows many texts in one call for corpus-wide jobs; see
+bulk_chunking for spreading that over a process pool.
+"""
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from itertools import accumulate
+
+# Five fields: unpack as `start, end, text, char_start, char_end`, or read `.text` etc. by name
+TextWindow = namedtuple("TextWindow", ["start", "end", "text", "char_start", "char_end"])
+
+
+def token_byte_offsets(tokenizer, tokens):
+    """UTF-8 byte offset of every token boundary: `offsets[i]` is where token i starts, `offsets[-1]` the total."""
+    return list(accumulate(map(len, tokenizer.decode_tokens_bytes(tokens)), initial=0))
+
+
+class _CharIndex:
+    """Maps UTF-8 byte offsets in a text to character offsets."""
+
+    def __init__(self, text):
+        # ASCII text (most transcripts) has one byte per character
+        self._char_bytes = None if text.isascii() else list(
+            accumulate((len(char.encode("utf-8")) for char in text), initial=0)
+        )
+
+    def start(self, byte_offset):
+        """Index of the character containing `byte_offset`."""
+        if self._char_bytes is None:
+            return byte_offset
+        return bisect_right(self._char_bytes, byte_offset) - 1
+
+    def end(self, byte_offset):
+        """Index just past the last character that starts before `byte_offset`."""
+        if self._char_bytes is None:
+            return byte_offset
+        return bisect_left(self._char_bytes, byte_offset)
+
+
+def chunk_text(text, tokenizer, chunk_size=800, overlap=200):
+    """Split text into overlapping windows of `chunk_size` tokens, sliced from `text`."""
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    # encode_ordinary, like chunk_texts: both paths tokenize alike, and text such as "<|endoftext|>" is plain text
+    return _windows(text, tokenizer.encode_ordinary(text), tokenizer, chunk_size, overlap)
+
+
+def chunk_texts(texts, tokenizer, chunk_size=800, overlap=200, num_threads=8):
+    """
+    Window many texts at once; returns one list of windows per text.
+
+    The texts are tokenized together with `encode_ordinary_batch`, which
+    spreads the work over `num_threads` tokenizer threads.
+    """
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    texts = list(texts)
+    encoded = tokenizer.encode_ordinary_batch(texts, num_threads=num_threads)
+    return [_windows(text, tokens, tokenizer, chunk_size, overlap) for text, tokens in zip(texts, encoded)]
+
+
+def _windows(text, tokens, tokenizer, chunk_size, overlap):
+    # A character split across two tokens is included by the windows on both sides of the split
+    offsets = token_byte_offsets(tokenizer, tokens)
+    chars = _CharIndex(text)
+
+    windows = []
+    start = 0
+    while start < len(tokens):
+        end = min(start + chunk_size, len(tokens))
+        char_start, char_end = chars.start(offsets[start]), chars.end(offsets[end])
+        windows.append(TextWindow(start, end, text[char_start:char_end], char_start, char_end))
+        start += chunk_size - overlap
+    return windows
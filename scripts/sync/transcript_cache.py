@@ -0,0 +1,208 @@
+"""
+Local compressed cache of raw Fireflies `transcript` responses.
+
+Entries are content-addressed by the Fireflies ID plus a fingerprint of the
+GraphQL fields that were fetched, so changing the query never serves stale
+shapes. Files are zstd-compressed when the `zstandard` package is installed
+and gzip-compressed otherwise. When the cache grows past its size cap, the
+least recently used entries (oldest mtime) are evicted.
+
+Re-chunking or re-embedding the corpus can then read transcripts from disk
+instead of calling Fireflies again (see `--offline` in optimized_pipeline).
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_DIR = Path(os.getenv("FIREFLIES_CACHE_DIR", ".cache/fireflies"))
+CACHE_MAX_BYTES = int(float(os.getenv("FIREFLIES_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+
+ZSTD_SUFFIX = ".json.zst"
+GZIP_SUFFIX = ".json.gz"
+
+
+def fields_fingerprint(selection_set):
+    """Short stable hash of a GraphQL selection set, ignoring whitespace."""
+    normalized = re.sub(r"\s+", " ", selection_set).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(transcript_id, fingerprint):
+    return hashlib.sha256(f"{transcript_id}:{fingerprint}".encode("utf-8")).hexdigest()
+
+
+def _compress(raw):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(raw), ZSTD_SUFFIX
+    return gzip.compress(raw, compresslevel=6), GZIP_SUFFIX
+
+
+def _decompress(data, suffix):
+    if suffix == ZSTD_SUFFIX:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst cache entries")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class TranscriptCache:
+    """On-disk LRU cache of raw transcript JSON for one query fingerprint."""
+
+    def __init__(self, fingerprint, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.fingerprint = fingerprint
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # One index per fingerprint, so caches for different query profiles can share a directory
+        self._index_path = self.cache_dir / f"index-{fingerprint}.json"
+        self._index = self._load_index()
+        # Running size of the entries in the directory, so a put does not stat every file
+        self._total_bytes = sum(size for _, size, _ in self._scan())
+
+        self.hits = 0
+        self.misses = 0
+
+    def _load_index(self):
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        tmp_path = self._index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._index), encoding="utf-8")
+        os.replace(tmp_path, self._index_path)
+
+    def _entry_paths(self, key):
+        return [self.cache_dir / f"{key}{suffix}" for suffix in (ZSTD_SUFFIX, GZIP_SUFFIX)]
+
+    def get(self, transcript_id):
+        """Return the cached transcript dict, or None on a miss."""
+        key = cache_key(transcript_id, self.fingerprint)
+        for path in self._entry_paths(key):
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            try:
+                transcript = json.loads(_decompress(data, ZSTD_SUFFIX if path.name.endswith(ZSTD_SUFFIX) else GZIP_SUFFIX))
+            except Exception:
+                # Truncated or unreadable entry: drop it and refetch
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    self._total_bytes -= len(data)
+                continue
+            os.utime(path)  # mark as recently used
+            with self._lock:
+                self.hits += 1
+            return transcript
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def open_stream(self, transcript_id):
+        """Return a decompressing binary file object for a cached transcript, or None on a miss."""
+        key = cache_key(transcript_id, self.fingerprint)
+        for path in self._entry_paths(key):
+            try:
+                raw = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            os.utime(path)
+            with self._lock:
+                self.hits += 1
+            if path.name.endswith(ZSTD_SUFFIX):
+                if zstandard is None:
+                    raw.close()
+                    raise RuntimeError("zstandard is required to read .zst cache entries")
+                return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            return gzip.GzipFile(fileobj=raw, mode="rb")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, transcript):
+        """Store a raw transcript response, evicting old entries past the size cap."""
+        key = cache_key(transcript["id"], self.fingerprint)
+        data, suffix = _compress(json.dumps(transcript, separators=(",", ":")).encode("utf-8"))
+
+        path = self.cache_dir / f"{key}{suffix}"
+        tmp_path = path.with_name(path.name + f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += len(data) - replaced
+            self._index[key] = {
+                "id": transcript["id"],
+                "title": transcript.get("title"),
+                "date": transcript.get("date"),
+                "duration": transcript.get("duration"),
+                "fingerprint": self.fingerprint,
+            }
+            self._evict()
+            self._write_index()
+
+    def _scan(self):
+        """(mtime, size, path) of every entry in the cache directory."""
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith((ZSTD_SUFFIX, GZIP_SUFFIX)):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # Only now scan the directory, which also picks up what other caches sharing it wrote.
+        # Trim to 90% of the cap so every put does not trigger another scan
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._index.pop(path.name.split(".", 1)[0], None)
+            total -= size
+        self._total_bytes = total
+
+    def list_transcripts(self, from_date=None):
+        """Listing-shaped dicts (id, title, date, duration) for every cached transcript, newest first."""
+        listed = []
+        for key, entry in self._index.items():
+            if entry.get("fingerprint") != self.fingerprint:
+                continue
+            if not any(path.exists() for path in self._entry_paths(key)):
+                continue
+            if from_date is not None and (entry.get("date") or 0) < from_date:
+                continue
+            listed.append({k: entry.get(k) for k in ("id", "title", "date", "duration")})
+        return sorted(listed, key=lambda t: t.get("date") or 0, reverse=True)
+
+    def describe(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0.0
+        return f"transcript cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate)"
@@ -0,0 +1,82 @@
+"""
+Content fingerprints for change detection on already synced transcripts.
+
+A fingerprint is a small dict of hashes, one per input that feeds a pipeline
+stage (sentences, summary, participants, basic meeting fields). It is stored
+in `meetings.raw_metadata["fingerprint"]`. Comparing a fresh fingerprint with
+the stored one shows which inputs changed, and `stages_to_rerun` maps that
+onto the stages that must be redone, so an edited summary does not re-embed
+the transcript and an unchanged transcript is not touched at all.
+"""
+import hashlib
+import json
+
+# Bump when the hashing scheme changes so old fingerprints count as baselines
+FINGERPRINT_VERSION = 1
+
+# stage -> fingerprint components it depends on
+STAGE_INPUTS = {
+    "meeting": {"details", "participants", "sentences", "summary"},  # row fields, counts, tags
+    "markdown": {"details", "participants", "sentences", "summary"},  # storage copy
+    "chunks": {"sentences"},  # chunks and embeddings
+    "summaries": {"summary"},  # meeting_summaries rows
+}
+
+
+def _digest(value):
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class SentenceHasher:
+    """Incremental hash of a sentence sequence, for transcripts that are streamed."""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+
+    def update(self, sentence):
+        canonical = json.dumps(sentence, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        self._hash.update(canonical.encode("utf-8"))
+        self._hash.update(b"\n")
+
+    def hexdigest(self):
+        return self._hash.hexdigest()[:16]
+
+
+def compute_fingerprint(transcript, sentences_hash=None):
+    """
+    Fingerprint a transcript dict.
+
+    Pass `sentences_hash` (from SentenceHasher) when the sentences were
+    streamed and are no longer available on the dict.
+    """
+    if sentences_hash is None:
+        hasher = SentenceHasher()
+        for sentence in transcript.get("sentences") or []:
+            hasher.update(sentence)
+        sentences_hash = hasher.hexdigest()
+
+    return {
+        "version": FINGERPRINT_VERSION,
+        "sentences": sentences_hash,
+        "summary": _digest(transcript.get("summary") or {}),
+        "participants": _digest(transcript.get("participants") or []),
+        "details": _digest({
+            "title": transcript.get("title"),
+            "date": transcript.get("date"),
+            "duration": transcript.get("duration"),
+            "transcript_url": transcript.get("transcript_url"),
+        }),
+    }
+
+
+def changed_components(stored, current):
+    """Names of the fingerprint components that differ; None if there is no comparable stored fingerprint."""
+    if not stored or stored.get("version") != current.get("version"):
+        return None
+    return {key for key in current if key != "version" and stored.get(key) != current[key]}
+
+
+def stages_to_rerun(changed):
+    """Pipeline stages whose inputs are among the changed components, in pipeline order."""
+    return [stage for stage, inputs in STAGE_INPUTS.items() if inputs & changed]
@@ -0,0 +1,146 @@
+"""
+Parallel, date-partitioned listing of Fireflies transcripts.
+
+Walking `skip` offsets is strictly sequential. Instead, the requested date
+range is split into windows that are listed concurrently with
+`fromDate`/`toDate`. When a window returns a full page, the transcripts it
+returned are kept and the part of the window older than that page is split
+in two and listed again, recursively. Results from all windows are merged and
+de-duplicated by ID.
+
+Every request still goes through the shared Fireflies transport, so the
+Fireflies token bucket bounds the actual request rate.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from sync_state import to_graphql_datetime
+from fireflies_queries import selection_set
+
+LISTING_CONCURRENCY = int(os.getenv("FIREFLIES_LISTING_CONCURRENCY", "4"))
+LISTING_PAGE_SIZE = int(os.getenv("FIREFLIES_LISTING_PAGE_SIZE", "50"))  # Fireflies caps `limit` at 50
+# Earliest date that is searched when no fromDate is given
+HISTORY_START = os.getenv("FIREFLIES_HISTORY_START", "2016-01-01")
+
+MIN_WINDOW_MS = 1000  # below this, page through the window with skip instead of splitting it
+
+
+def _history_start_ms():
+    start = datetime.fromisoformat(HISTORY_START).replace(tzinfo=timezone.utc)
+    return int(start.timestamp() * 1000)
+
+
+class TranscriptLister:
+    """Lists transcripts across date windows concurrently."""
+
+    def __init__(self, transport, profile="listing", page_size=LISTING_PAGE_SIZE,
+                 concurrency=LISTING_CONCURRENCY):
+        self.transport = transport
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.query = f"""
+        query ListTranscripts($limit: Int, $skip: Int, $fromDate: DateTime, $toDate: DateTime) {{
+            transcripts(limit: $limit, skip: $skip, fromDate: $fromDate, toDate: $toDate) {{{selection_set(profile)}}}
+        }}
+        """
+
+        self._lock = threading.Lock()
+        self.complete = True
+        self.request_count = 0
+        self.window_count = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    def _fetch_page(self, from_ms, to_ms, skip=0):
+        with self._lock:
+            self.request_count += 1
+        data = self.transport.execute(self.query, {
+            "limit": self.page_size,
+            "skip": skip,
+            "fromDate": to_graphql_datetime(from_ms),
+            "toDate": to_graphql_datetime(to_ms),
+        }, timeout=30)
+        return data["transcripts"] or []
+
+    def _list_window(self, from_ms, to_ms):
+        """
+        List one window; returns (transcripts, sub-windows still to list).
+
+        A full page that is ordered newest first covers everything from its
+        oldest date up to `to_ms`, so only [from_ms, oldest] is split again.
+        """
+        with self._lock:
+            self.window_count += 1
+        page = self._fetch_page(from_ms, to_ms)
+        if len(page) < self.page_size:
+            return page, []
+
+        dates = [t["date"] for t in page]
+        newest_first = all(a >= b for a, b in zip(dates, dates[1:]))
+        remaining_to = dates[-1] if newest_first else to_ms
+
+        if remaining_to - from_ms < MIN_WINDOW_MS or remaining_to >= to_ms:
+            # Too many transcripts at one instant to split further
+            return page + self._page_with_skip(from_ms, to_ms), []
+
+        middle = from_ms + (remaining_to - from_ms) // 2
+        return page, [(from_ms, middle), (middle, remaining_to)]
+
+    def _page_with_skip(self, from_ms, to_ms):
+        transcripts = []
+        skip = self.page_size
+        while True:
+            page = self._fetch_page(from_ms, to_ms, skip=skip)
+            transcripts.extend(page)
+            if len(page) < self.page_size:
+                return transcripts
+            skip += self.page_size
+
+    def list_all(self, from_date=None, to_date=None):
+        """
+        Return every transcript dated in [from_date, to_date] (ms timestamps), newest first.
+
+        `complete` is False afterwards if any window failed, in which case the
+        result may be missing transcripts.
+        """
+        started = time.monotonic()
+        from_ms = from_date if from_date is not None else _history_start_ms()
+        to_ms = to_date if to_date is not None else int(time.time() * 1000) + 24 * 3600 * 1000
+
+        # Start with a couple of windows per worker; dense ones split themselves
+        initial = self.concurrency * 2
+        step = max((to_ms - from_ms) // initial, 1)
+        bounds = [from_ms + i * step for i in range(initial)] + [to_ms]
+        windows = [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+        self.complete = True
+        self.errors = []
+        by_id = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fireflies-list") as executor:
+            pending = {executor.submit(self._list_window, a, b): (a, b) for a, b in windows}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = pending.pop(future)
+                    try:
+                        transcripts, sub_windows = future.result()
+                    except Exception as e:
+                        self.complete = False
+                        self.errors.append((window, e))
+                        continue
+                    for transcript in transcripts:
+                        by_id[transcript["id"]] = transcript
+                    for a, b in sub_windows:
+                        pending[executor.submit(self._list_window, a, b)] = (a, b)
+
+        self.elapsed = time.monotonic() - started
+        return sorted(by_id.values(), key=lambda t: t.get("date") or 0, reverse=True)
+
+    def describe(self):
+        return (
+            f"listed over {self.window_count} date windows with {self.request_count} requests "
+            f"in {self.elapsed:.1f}s{'' if self.complete else f' ({len(self.errors)} windows failed)'}"
+        )
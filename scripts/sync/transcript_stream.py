@@ -0,0 +1,139 @@
+"""
+Incremental parsing of Fireflies transcript responses.
+
+A multi-hour meeting is tens of MB of `sentences` dicts once `response.json()`
+has materialized it. Here the response body is parsed with ijson instead:
+everything except `sentences` is built into a normal dict, and the sentences
+are handed out one at a time through a generator, so callers can write
+markdown, count words and chunk in a single pass with flat memory use.
+
+`sentences` has to be the last field in the selection set; any fields after
+it only appear in `metadata` once the generator has been exhausted.
+Without ijson installed the body is parsed with `json` and the sentences are
+iterated from the resulting list, so the API stays the same.
+"""
+import json
+from fireflies_transport import FirefliesGraphQLError
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class StreamedTranscript:
+    """Transcript metadata plus a one-shot iterator over its sentences."""
+
+    def __init__(self, metadata, sentences, source=None):
+        self.metadata = metadata
+        self.sentences = sentences
+        self._source = source
+
+    @property
+    def id(self):
+        return self.metadata["id"]
+
+    def close(self):
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+
+def _iter_sentence_objects(events, array_prefix):
+    """Build each sentence from the event stream until the array closes."""
+    item_prefix = f"{array_prefix}.item"
+    builder = None
+    for prefix, event, value in events:
+        if prefix == array_prefix and event == "end_array":
+            return
+        if prefix == item_prefix and event == "start_map":
+            builder = ijson.ObjectBuilder()
+        if builder is not None:
+            builder.event(event, value)
+        if prefix == item_prefix and event == "end_map":
+            yield builder.value
+            builder = None
+
+
+def _parse_events(events, root_prefix):
+    """
+    Consume events up to the sentences array and return (document, sentences).
+
+    `document` is the parsed JSON minus the sentences subtree; keys after
+    `sentences` are added to it while the sentences generator is drained.
+    """
+    sentences_prefix = f"{root_prefix}.sentences" if root_prefix else "sentences"
+    document = ijson.ObjectBuilder()
+
+    for prefix, event, value in events:
+        if prefix == root_prefix and event == "map_key" and value == "sentences":
+            continue
+        if prefix == sentences_prefix:
+            if event == "start_array":
+                break
+            continue  # sentences: null
+        document.event(event, value)
+    else:
+        return document.value, iter(())
+
+    def sentences():
+        yield from _iter_sentence_objects(events, sentences_prefix)
+        # Pick up whatever follows the sentences (closing braces, trailing keys, errors)
+        for _, event, value in events:
+            document.event(event, value)
+
+    return document.value, sentences()
+
+
+def _lookup(document, root_prefix):
+    node = document
+    for key in filter(None, root_prefix.split(".")):
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def parse_transcript_stream(fp, root_prefix="", source=None):
+    """
+    Parse a transcript from a binary file-like object.
+
+    `root_prefix` is the dotted path of the transcript object, e.g.
+    "data.transcript" for a GraphQL response or "" for a cached transcript.
+    Returns (document, StreamedTranscript or None).
+    """
+    if ijson is None:
+        document = json.load(fp)
+        if source is not None:
+            source.close()
+        transcript = _lookup(document, root_prefix)
+        if not transcript:
+            return document, None
+        sentences = transcript.pop("sentences", None) or []
+        return document, StreamedTranscript(transcript, iter(sentences))
+
+    events = ijson.parse(fp, use_float=True)
+    document, sentences = _parse_events(events, root_prefix)
+    transcript = _lookup(document, root_prefix)
+    if not transcript:
+        if source is not None:
+            source.close()
+        return document, None
+    return document, StreamedTranscript(transcript, sentences, source=source or fp)
+
+
+def stream_graphql_transcript(transport, query, variables, root_field="transcript", timeout=None):
+    """
+    POST a transcript query with a streamed response body and parse it incrementally.
+
+    Raises FirefliesGraphQLError when the transcript is missing, otherwise
+    returns a StreamedTranscript that the caller must drain or close.
+    """
+    response = transport.post(query, variables, timeout=timeout, stream=True)
+    response.raise_for_status()
+    response.raw.decode_content = True  # let urllib3 undo gzip/brotli
+
+    document, transcript = parse_transcript_stream(response.raw, f"data.{root_field}", source=response)
+    if transcript is None:
+        raise FirefliesGraphQLError((document or {}).get("errors") or [{"message": f"No {root_field} in response"}])
+    return transcript
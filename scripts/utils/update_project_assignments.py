@@ -2,19 +2,23 @@
 Update project assignments for meetings based on title matching
 """
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
-from supabase import create_client
+
+# Shared lazy client registry lives with the sync scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "sync"))
+from registry import get_supabase
 
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 
 def show_current_assignments():
     """Show current meeting-project assignments"""
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
     
     print("📊 Current Meeting Assignments:\n")
     
@@ -30,6 +34,7 @@ def show_current_assignments():
 
 def suggest_better_assignments():
     """Suggest better project assignments based on title matching"""
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
     
     print("\n🔍 Analyzing for better assignments...\n")
     
@@ -125,6 +130,7 @@ def suggest_better_assignments():
 
 def manual_assignment():
     """Manually assign a meeting to a project"""
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
     
     print("\n📝 Manual Assignment\n")
     
@@ -37,6 +37,9 @@ BEGIN
 END;
 $$;
 
+-- Index the chunk content hash used to reuse embeddings of identical chunks
+CREATE INDEX IF NOT EXISTS idx_chunks_content_hash ON meeting_chunks((metadata->>'content_hash'));
+
 -- Grant permissions
 GRANT EXECUTE ON FUNCTION search_chunks TO authenticated;
 GRANT EXECUTE ON FUNCTION search_chunks TO service_role;
@@ -0,0 +1,110 @@
+-- Reduced-dimension chunk embeddings (text-embedding-3 models)
+-- Run this in Supabase SQL Editor to move meeting_chunks.embedding and
+-- search_chunks from 1536 to 512 dimensions, then set EMBEDDING_DIMENSIONS=512
+-- for the pipeline. For 256 or 768 dimensions, replace every 512 below.
+--
+-- text-embedding-3 vectors can be shortened after the fact: dropping the tail
+-- and re-normalizing gives what the API returns for the smaller `dimensions`.
+-- Only rows whose metadata.content_hash proves they were embedded with
+-- text-embedding-3-small at full size are shortened; every other embedding
+-- (ada-002 vectors, rows without a hash) is cleared. Every row is then
+-- re-hashed for text-embedding-3-small at 512 dimensions, so the shortened
+-- vectors keep being reused and the cleared rows are re-embedded by
+--
+--     python3 scripts/sync/batch_backfill.py --model text-embedding-3-small --dimensions 512
+--
+-- which fills every NULL embedding with that hash, whichever uploader stored
+-- the row. Before syncing again, set EMBEDDING_MODEL=text-embedding-3-small and
+-- EMBEDDING_DIMENSIONS=512 for every uploader; they refuse to start while the
+-- column holds vectors of another size.
+-- Rows whose metadata older uploaders stored as a JSON-encoded string are
+-- converted to objects first, so their content_hash counts too.
+-- Going back to 1536 dimensions means re-embedding everything.
+--
+-- Requires pgvector 0.7 or later (subvector, l2_normalize).
+
+BEGIN;
+
+-- Same hash as chunk_dedup.content_hash: model tag, newline, whitespace-collapsed text
+CREATE FUNCTION pg_temp.chunk_hash(content TEXT, model_tag TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT encode(sha256(convert_to(
+        model_tag || E'\n' || regexp_replace(regexp_replace(content, '^\s+|\s+$', '', 'g'), '\s+', ' ', 'g'),
+        'UTF8'
+    )), 'hex');
+$$;
+
+-- Older uploaders stored metadata as a JSON-encoded string; turn those into objects
+-- so their content_hash can be read and set below
+UPDATE meeting_chunks
+SET metadata = (metadata #>> '{}')::jsonb
+WHERE jsonb_typeof(metadata) = 'string';
+
+-- The index is rebuilt for the new size below
+DROP INDEX IF EXISTS idx_chunks_embedding;
+
+-- Shorten the full-size text-embedding-3-small vectors; clear the ones from other models or without a hash
+ALTER TABLE meeting_chunks
+    ALTER COLUMN embedding TYPE vector(512)
+    USING CASE
+        WHEN metadata->>'content_hash' = pg_temp.chunk_hash(content, 'text-embedding-3-small')
+            THEN l2_normalize(subvector(embedding, 1, 512))::vector(512)
+    END;
+
+-- Every row now holds, or awaits from batch_backfill.py, a 512-dimension text-embedding-3-small vector
+UPDATE meeting_chunks
+SET metadata = jsonb_set(
+    COALESCE(metadata, '{}'::jsonb), '{content_hash}', to_jsonb(pg_temp.chunk_hash(content, 'text-embedding-3-small:512'))
+)
+WHERE metadata IS NULL OR jsonb_typeof(metadata) = 'object';
+
+COMMENT ON COLUMN meeting_chunks.embedding IS 'OpenAI text-embedding-3-small embeddings, 512 dimensions';
+
+-- A third of the 1536-dimension index's size
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON meeting_chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+
+-- Vector search takes query embeddings of the new size
+DROP FUNCTION IF EXISTS search_chunks(vector, INT, UUID);
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding vector(512),
+    match_count INT DEFAULT 10,
+    filter_project_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    meeting_id UUID,
+    project_id UUID,
+    content TEXT,
+    similarity FLOAT,
+    metadata JSONB
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        mc.id AS chunk_id,
+        mc.meeting_id,
+        mc.project_id,
+        mc.content,
+        1 - (mc.embedding <=> query_embedding) AS similarity,
+        mc.metadata
+    FROM meeting_chunks mc
+    WHERE (filter_project_id IS NULL OR mc.project_id = filter_project_id)
+        AND mc.embedding IS NOT NULL
+    ORDER BY mc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_chunks TO authenticated;
+GRANT EXECUTE ON FUNCTION search_chunks TO service_role;
+
+COMMIT;
+
+-- Verify the new size
+SELECT 'meeting_chunks.embedding is now ' || format_type(atttypid, atttypmod) AS message
+FROM pg_attribute
+WHERE attrelid = 'meeting_chunks'::regclass AND attname = 'embedding';
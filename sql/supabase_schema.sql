@@ -42,7 +42,7 @@ CREATE TABLE IF NOT EXISTS meeting_chunks (
     project_id UUID REFERENCES projects(id) ON DELETE SET NULL,
     chunk_index INTEGER NOT NULL,
     content TEXT NOT NULL,
-    embedding vector(1536), -- OpenAI ada-002 embeddings
+    embedding vector(1536), -- EMBEDDING_MODEL vectors (default text-embedding-ada-002); size = EMBEDDING_DIMENSIONS, see reduced_dimension_embeddings.sql
     speaker_info JSONB, -- Speaker details for this chunk
     start_timestamp INTEGER, -- Start time in seconds
     end_timestamp INTEGER, -- End time in seconds
@@ -150,7 +150,7 @@ CREATE TABLE IF NOT EXISTS sync_status (
     last_successful_sync_at TIMESTAMPTZ,
     status TEXT DEFAULT 'idle' CHECK (status IN ('idle', 'running', 'failed', 'completed')),
     error_message TEXT,
-    metadata JSONB, -- Store last processed ID, count, etc.
+    metadata JSONB, -- Store last processed ID, count, and the incremental watermark: {"watermark": {"date": <ms>, "id": "<fireflies id>"}}
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -164,6 +164,7 @@ CREATE INDEX IF NOT EXISTS idx_meetings_needs_review ON meetings(needs_review) W
 CREATE INDEX IF NOT EXISTS idx_chunks_meeting_id ON meeting_chunks(meeting_id);
 CREATE INDEX IF NOT EXISTS idx_chunks_project_id ON meeting_chunks(project_id);
 CREATE INDEX IF NOT EXISTS idx_chunks_content_trgm ON meeting_chunks USING gin(content gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_chunks_content_hash ON meeting_chunks((metadata->>'content_hash')); -- embedding reuse lookups
 
 CREATE INDEX IF NOT EXISTS idx_insights_project_id ON project_insights(project_id);
 CREATE INDEX IF NOT EXISTS idx_insights_meeting_id ON project_insights(meeting_id);
@@ -176,6 +177,7 @@ CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON project_tasks(due_date) WHERE s
 
 CREATE INDEX IF NOT EXISTS idx_sentiment_project_date ON sentiment_analysis(project_id, analysis_date DESC);
 CREATE INDEX IF NOT EXISTS idx_feedback_entity ON user_feedback(entity_id, feedback_type);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_status_type ON sync_status(sync_type);
 
 -- Create vector similarity search index
 CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON meeting_chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the OpenAI Files, Batches and Embeddings endpoints
+
+Lets the Batch API backfill (scripts/sync/batch_backfill.py) run end to end
+without an API key or cost. Uploaded batches complete after `--polls` status
+checks; their vectors are deterministic hash embeddings (see
+embedding_providers.hash_embedding) of the requested size. `--fail-every N`
+sends every Nth request of a batch to the error file instead.
+
+    python3 tests/batch_api_stub.py --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub \\
+        python3 scripts/sync/reprocess_chunks.py --batch-api
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "sync"))
+
+from embedding_providers import hash_embedding
+
+DEFAULT_DIMENSIONS = 1536
+
+files = {}  # file id -> (metadata, content bytes)
+batches = {}  # batch id -> batch object
+polls = {}  # batch id -> status checks so far
+lock = threading.RLock()
+
+
+def new_id(prefix, table):
+    return f"{prefix}-{len(table) + 1:06d}"
+
+
+def add_file(filename, content, purpose):
+    with lock:
+        file_id = new_id("file", files)
+        meta = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        files[file_id] = (meta, content)
+    return meta
+
+
+def embedding_response(body):
+    """The /v1/embeddings response body for a request body"""
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    dimensions = body.get("dimensions") or DEFAULT_DIMENSIONS
+    tokens = sum(len(text.split()) for text in inputs)
+    return {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "index": i, "embedding": hash_embedding(text, dimensions)}
+            for i, text in enumerate(inputs)
+        ],
+        "model": body["model"],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+def complete(batch, fail_every):
+    """Run a batch's requests and attach its output and error files"""
+    _, content = files[batch["input_file_id"]]
+    output, errors = [], []
+    for n, line in enumerate(content.decode("utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        result = {"id": f"batch_req_{n}", "custom_id": request["custom_id"], "error": None}
+        if fail_every and n % fail_every == 0:
+            result["response"] = {
+                "status_code": 400,
+                "request_id": f"req_{n}",
+                "body": {"error": {"message": "stub failure", "type": "invalid_request_error"}},
+            }
+            errors.append(result)
+        else:
+            result["response"] = {"status_code": 200, "request_id": f"req_{n}", "body": embedding_response(request["body"])}
+            output.append(result)
+
+    def jsonl(results):
+        return "".join(json.dumps(result) + "\n" for result in results).encode("utf-8")
+
+    if output:
+        batch["output_file_id"] = add_file(f"{batch['id']}_output.jsonl", jsonl(output), "batch_output")["id"]
+    if errors:
+        batch["error_file_id"] = add_file(f"{batch['id']}_error.jsonl", jsonl(errors), "batch_output")["id"]
+    batch["status"] = "completed"
+    batch["completed_at"] = int(time.time())
+    batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output), "failed": len(errors)}
+
+
+class Handler(BaseHTTPRequestHandler):
+    polls_needed = 1
+    fail_every = 0
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def not_found(self):
+        self.send_json({"error": {"message": f"No route for {self.command} {self.path}", "type": "invalid_request_error"}}, 404)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        if path == "/v1/files":
+            # multipart/form-data with "purpose" and "file" parts
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + self.read_body()
+            )
+            fields = {}
+            for part in message.iter_parts():
+                fields[part.get_param("name", header="content-disposition")] = part
+            upload = fields["file"]
+            meta = add_file(upload.get_filename(), upload.get_payload(decode=True), fields["purpose"].get_content().strip())
+            self.send_json(meta)
+        elif path == "/v1/batches":
+            body = json.loads(self.read_body())
+            if body["input_file_id"] not in files:
+                self.send_json({"error": {"message": "No such file", "type": "invalid_request_error"}}, 400)
+                return
+            with lock:
+                batch_id = new_id("batch", batches)
+                batches[batch_id] = {
+                    "id": batch_id,
+                    "object": "batch",
+                    "endpoint": body["endpoint"],
+                    "input_file_id": body["input_file_id"],
+                    "completion_window": body["completion_window"],
+                    "status": "validating",
+                    "created_at": int(time.time()),
+                    "metadata": body.get("metadata"),
+                    "output_file_id": None,
+                    "error_file_id": None,
+                    "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                }
+                polls[batch_id] = 0
+            self.send_json(batches[batch_id])
+        elif path == "/v1/embeddings":
+            self.send_json(embedding_response(json.loads(self.read_body())))
+        else:
+            self.not_found()
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if parts[:2] == ["v1", "files"] and len(parts) >= 3 and parts[2] in files:
+            meta, content = files[parts[2]]
+            if parts[3:] == ["content"]:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            else:
+                self.send_json(meta)
+        elif parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in batches:
+            with lock:
+                batch = batches[parts[2]]
+                polls[batch["id"]] += 1
+                if batch["status"] != "completed":
+                    if polls[batch["id"]] >= self.polls_needed:
+                        complete(batch, self.fail_every)
+                    else:
+                        batch["status"] = "in_progress"
+            self.send_json(batch)
+        else:
+            self.not_found()
+
+    def log_message(self, format, *args):
+        print(f"   {self.command} {self.path} -> {args[1] if len(args) > 1 else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI Batch API")
+    parser.add_argument("--port", type=int, default=8089, help="Port to listen on (default: 8089)")
+    parser.add_argument("--polls", type=int, default=1, help="Status checks before a batch completes (default: 1)")
+    parser.add_argument("--fail-every", type=int, default=0, help="Fail every Nth request of a batch (default: none)")
+    args = parser.parse_args()
+
+    Handler.polls_needed = args.polls
+    Handler.fail_every = args.fail_every
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"🧪 Batch API stub on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
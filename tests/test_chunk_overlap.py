@@ -0,0 +1,125 @@
+"""
+Chunk overlaps under a BPE vocabulary that merges across group joins
+
+Each chunk's overlap is cut from the tokens of the joined chunk text. With
+merges such as ".\n" (a group's closing period plus the separator newline)
+those differ from the groups' own tokens, so both ChunkingStrategy paths are
+compared against the original algorithm: encode the whole chunk and decode
+its last `overlap` tokens. No API keys or network needed.
+"""
+import os
+import random
+import sys
+import threading
+
+import pytest
+import tiktoken
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "sync"))
+
+import optimized_pipeline
+from optimized_pipeline import ChunkingStrategy
+
+# cl100k_base's pre-tokenizer: punctuation and the newlines after it form one piece
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]++[\r\n]*"""
+    r"""|\s*[\r\n]|\s+(?!\S)|\s+"""
+)
+MERGES = [b".\n", b"s.", b"s.\n", b"]:", b" t", b"he", b" the", b"es"]
+WORDS = ["yes.", "the plans.", "tests.", "we agree", "ok", "the", "notes.", "follow up"]
+
+
+def merging_encoding():
+    """Byte-level BPE with a few merges, some of which span a group and its separator"""
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in MERGES:
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding("merging-test", pat_str=CL100K_PATTERN, mergeable_ranks=ranks, special_tokens={})
+
+
+def make_sentences(seed, count=300):
+    rng = random.Random(seed)
+    sentences = []
+    time = 0
+    for _ in range(count):
+        time += rng.choice([500, 1000, 8000])
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+        sentences.append({"speaker_id": rng.randint(0, 2), "text": text, "start_time": time, "end_time": time + 400})
+    return sentences
+
+
+def reference_chunks(encoding, sentences, chunk_size, overlap):
+    """(text, token count) of each chunk, cut the way ChunkingStrategy originally did"""
+    groups = []
+    last_speaker, last_time = None, 0
+    for sentence in sentences:
+        if not groups or sentence["speaker_id"] != last_speaker or sentence["start_time"] - last_time > 5000:
+            groups.append((sentence["speaker_id"], []))
+        groups[-1][1].append(sentence["text"])
+        last_speaker, last_time = sentence["speaker_id"], sentence["end_time"]
+
+    chunks = []
+    text, tokens = "", 0
+    for speaker_id, texts in groups:
+        group_text = f"[Speaker {speaker_id + 1}]: {' '.join(texts)}"
+        group_tokens = len(encoding.encode_ordinary(group_text))
+        if tokens + group_tokens > chunk_size and text:
+            chunks.append((text.strip(), tokens))
+            ids = encoding.encode_ordinary(text)
+            if len(ids) > overlap:
+                text = encoding.decode(ids[-overlap:])
+            tokens = len(encoding.encode_ordinary(text))
+        text += group_text + "\n"
+        tokens += group_tokens
+    if text.strip():
+        chunks.append((text.strip(), tokens))
+    return chunks
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    encoding = merging_encoding()
+    monkeypatch.setattr(optimized_pipeline, "get_tokenizer", lambda model: encoding)
+    return encoding
+
+
+def test_encoding_merges_across_joins(encoding):
+    joined = encoding.encode_ordinary("tests.\n")
+    assert len(joined) < len(encoding.encode_ordinary("tests.")) + len(encoding.encode_ordinary("\n"))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("chunk_size,overlap", [(60, 20), (25, 10), (200, 50), (40, 39)])
+def test_overlap_matches_joined_text_encoding(encoding, seed, chunk_size, overlap):
+    sentences = make_sentences(seed)
+    transcript = {"sentences": sentences}
+    expected = reference_chunks(encoding, sentences, chunk_size, overlap)
+
+    chunker = ChunkingStrategy()
+    table_chunks = chunker.create_chunks(transcript, chunk_size, overlap)
+    streamed_chunks = chunker.create_chunks(transcript, chunk_size, overlap, sentences=iter(sentences))
+
+    assert [(chunk["text"], chunk["token_count"]) for chunk in table_chunks] == expected
+    assert [(chunk["text"], chunk["token_count"]) for chunk in streamed_chunks] == expected
+
+
+def test_overlap_encodes_only_the_last_groups(encoding, monkeypatch):
+    sentences = make_sentences(0)
+    chunks = ChunkingStrategy().create_chunks({"sentences": sentences}, 200, 20)
+
+    # Groups are encoded on encode_ordinary_batch's worker threads; the overlap on this one
+    encoded = []
+    encode_ordinary = encoding.encode_ordinary
+
+    def record(text):
+        if threading.current_thread() is threading.main_thread():
+            encoded.append(text)
+        return encode_ordinary(text)
+
+    monkeypatch.setattr(encoding, "encode_ordinary", record)
+    ChunkingStrategy().create_chunks({"sentences": sentences}, 200, 20)
+    ChunkingStrategy().create_chunks({"sentences": sentences}, 200, 20, sentences=iter(sentences))
+
+    assert encoded
+    # Re-encoding every chunk would take at least the chunk texts once per path, twice here
+    assert sum(map(len, encoded)) < sum(len(chunk["text"]) for chunk in chunks)
@@ -1,6 +1,7 @@
 """
-Test script to process Fireflies meetings WITHOUT embeddings
-This version uploads meetings and chunks but skips embedding generation
+Test script to process Fireflies meetings WITHOUT OpenAI embeddings
+Chunks are stored with a NULL embedding and their content hash, so
+scripts/sync/batch_backfill.py can embed them later
 """
 import os
 import sys
@@ -15,46 +16,6 @@ from supabase_uploader_adapter import SupabaseUploaderAdapter
 load_dotenv()
 
 
-class NoEmbeddingUploader(SupabaseUploaderAdapter):
-    """Modified uploader that skips embedding generation"""
-    
-    def embed_text(self, text, retries=3):
-        """Return None instead of embedding"""
-        return None
-    
-    def store_meeting_chunks(self, meeting_id, project_id, chunks, title):
-        """Store chunks without embeddings"""
-        stored = 0
-        
-        for i, (start, end, chunk_text) in enumerate(chunks):
-            try:
-                print(f"   📊 Processing chunk {i+1}/{len(chunks)} (no embedding)...", end="\r")
-                
-                chunk_data = {
-                    "meeting_id": meeting_id,
-                    # Skip project_id - not in the actual schema
-                    "chunk_index": i,
-                    "content": chunk_text,
-                    # Skip embedding field - it's nullable in the schema
-                    "metadata": {
-                        "token_range": {"start": start, "end": end},
-                        "chunk_number": i + 1,
-                        "total_chunks": len(chunks),
-                        "no_embedding": True,  # Flag for later processing
-                        "project_id": project_id  # Store in metadata instead
-                    }
-                }
-                
-                self.supabase.table("meeting_chunks").insert(chunk_data).execute()
-                stored += 1
-                
-            except Exception as e:
-                print(f"\n   ⚠️  Error storing chunk {i}: {str(e)[:100]}")
-        
-        print(f"\n   ✅ {stored}/{len(chunks)} chunks stored (without embeddings)")
-        return stored > 0
-
-
 def test_pipeline(limit=10):
     """Test the pipeline with a limited number of meetings."""
     
@@ -65,7 +26,9 @@ def test_pipeline(limit=10):
     try:
         fireflies = FirefliesClient()
         converter = MarkdownConverter()
-        uploader = NoEmbeddingUploader()  # Use modified uploader
+        uploader = SupabaseUploaderAdapter()
+        # Leave embeddings NULL for the batch backfill instead of calling OpenAI
+        uploader.defer_embeddings = True
         
         # Test storage bucket first
         print("🪣 Checking storage bucket...")
@@ -157,7 +120,8 @@ def test_pipeline(limit=10):
     print(f"   ⏩ Skipped: {skipped}")
     print(f"   ❌ Errors: {errors}")
     print(f"   📋 Total: {len(transcripts)}")
-    print(f"\n⚠️  Note: Embeddings were NOT generated due to API key issues")
+    print(f"   📦 {uploader.dedup.describe()}")
+    print(f"\n⚠️  Note: Embeddings were NOT generated; run scripts/sync/batch_backfill.py to fill them")
     print(f"📅 Test completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Verify in database